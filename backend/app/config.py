@@ -0,0 +1,95 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    # .env 에서 '10485760  # 10MB' 처럼 주석이 붙은 값도 허용
+    return int(value.split("#", 1)[0].strip())
+
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+
+# 운영 실행(start.py --production)의 주소, 포트와 서버 프로세스 수 (0 이면 CPU 코어 수).
+# start.py 가 정한 프로세스 수를 다시 넣어 서버 프로세스들이 읽음
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = _env_int("SERVER_PORT", 8000)
+SERVER_WORKERS = _env_int("SERVER_WORKERS", 0)
+
+
+def per_server_process(workers: int) -> int:
+    """서버 프로세스마다 만드는 프로세스 풀 크기. 0 이면 CPU 코어 수를 서버 프로세스 수로 나눈 값 (최소 1)"""
+    if workers:
+        return workers
+    return max(1, (os.cpu_count() or 1) // max(1, SERVER_WORKERS))
+
+
+# 서버 프로세스가 요청을 받기 전에 미리 분석/컴파일할 템플릿("sample", file_id 또는 xlsx 경로를
+# 쉼표로 구분, 비우면 하지 않음)과 분석 엔진
+WARMUP_TEMPLATES = os.getenv("WARMUP_TEMPLATES", "sample")
+WARMUP_ENGINES = os.getenv("WARMUP_ENGINES", "openpyxl,stream")
+
+# 원본/결과 파일 저장소: local(UPLOAD_DIR), memory, s3. s3 이외에서는 UPLOAD_DIR 가 로컬 사본 캐시
+# S3_ENDPOINT_URL 이 file:///경로 이면 boto3 없이 해당 디렉터리를 객체 저장소로 사용
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_PREFIX = os.getenv("S3_PREFIX", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "")
+
+# 업로드 파일 최대 크기 (0 이면 제한 없음). 넘으면 본문을 다 받기 전에 413 으로 거절
+MAX_FILE_SIZE = _env_int("MAX_FILE_SIZE", 100 * 1024 * 1024)
+
+# 처리된 xlsx 에서 다시 압축하는 part 의 deflate 레벨 (0-9)
+ZIP_COMPRESSION_LEVEL = _env_int("ZIP_COMPRESSION_LEVEL", 6)
+
+# 컴파일된 템플릿 LRU 캐시의 최대 크기
+TEMPLATE_PLAN_CACHE_BYTES = _env_int("TEMPLATE_PLAN_CACHE_BYTES", 256 * 1024 * 1024)
+
+# 일괄 처리 프로세스 풀 크기 (0 이면 CPU 코어 수를 서버 프로세스 수로 나눈 값) 와 병렬 처리를 시작하는 행 수
+BATCH_MAX_WORKERS = _env_int("BATCH_MAX_WORKERS", 0)
+BATCH_PARALLEL_THRESHOLD = _env_int("BATCH_PARALLEL_THRESHOLD", 32)
+
+# 스트리밍 분석의 시트별 프로세스 풀 크기 (0 이면 CPU 코어 수를 서버 프로세스 수로 나눈 값, 1 이면 사용하지 않음) 와
+# 프로세스 풀을 쓰기 시작하는 시트 XML 크기 합 (압축 해제 기준)
+ANALYSIS_WORKERS = _env_int("ANALYSIS_WORKERS", 0)
+ANALYSIS_PARALLEL_BYTES = _env_int("ANALYSIS_PARALLEL_BYTES", 16 * 1024 * 1024)
+
+# 분석/처리 작업 실행기: 동시 실행 수, 대기열 길이, 포화 시 Retry-After(초)
+EXECUTOR_MAX_WORKERS = _env_int("EXECUTOR_MAX_WORKERS", 4)
+EXECUTOR_MAX_QUEUE = _env_int("EXECUTOR_MAX_QUEUE", 32)
+EXECUTOR_RETRY_AFTER = _env_int("EXECUTOR_RETRY_AFTER", 1)
+
+# 메모리에 보관하는 분석 결과 수 (디스크 캐시는 UPLOAD_DIR/.analysis_cache)
+ANALYSIS_CACHE_ENTRIES = _env_int("ANALYSIS_CACHE_ENTRIES", 256)
+
+# 저장 파일 수명 관리: 종류별 마지막 사용 후 보관 시간(초, 0 이면 만료 없음), 전체 용량 한도
+# (0 이면 제한 없음, 넘으면 오래 사용하지 않은 파일부터 삭제), 정리 주기, 임시 파일 유예 시간
+STORAGE_UPLOAD_TTL = _env_int("STORAGE_UPLOAD_TTL", 7 * 24 * 3600)
+STORAGE_PROCESSED_TTL = _env_int("STORAGE_PROCESSED_TTL", 24 * 3600)
+STORAGE_BATCH_TTL = _env_int("STORAGE_BATCH_TTL", 24 * 3600)
+STORAGE_QUOTA_BYTES = _env_int("STORAGE_QUOTA_BYTES", 0)
+STORAGE_SWEEP_INTERVAL = _env_int("STORAGE_SWEEP_INTERVAL", 300)
+STORAGE_TEMP_GRACE = _env_int("STORAGE_TEMP_GRACE", 900)
+
+# 비동기 작업 대기열: memory(프로세스 내) 또는 redis(JOB_REDIS_URL, 여러 서버가 공유)
+# 작업 프로세스 수, 그중 interactive 작업에만 쓰는 수, 작업 상태 보관 시간(초)
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory")
+JOB_REDIS_URL = os.getenv("JOB_REDIS_URL", "")
+JOB_WORKERS = _env_int("JOB_WORKERS", 2)
+JOB_INTERACTIVE_RESERVED = _env_int("JOB_INTERACTIVE_RESERVED", 1)
+JOB_TTL = _env_int("JOB_TTL", 3600)
+
+# 미리보기: 캐시하는 영역(템플릿, 시트, 범위) 수와 한 번에 요청할 수 있는 최대 셀 수 (0 이면 제한 없음)
+PREVIEW_CACHE_ENTRIES = _env_int("PREVIEW_CACHE_ENTRIES", 64)
+PREVIEW_MAX_CELLS = _env_int("PREVIEW_MAX_CELLS", 20000)
+
+# 점진 채우기: 템플릿과 세션별 마지막 결과(블록별 압축 바이트)를 보관하는 최대 크기 (0 이면 사용하지 않음)
+INCREMENTAL_FILL_CACHE_BYTES = _env_int("INCREMENTAL_FILL_CACHE_BYTES", 64 * 1024 * 1024)
+
+# /metrics (Prometheus 형식) 측정 사용 여부와, 응답에 단계별 시간을 Server-Timing 헤더로 붙일지 여부
+METRICS_ENABLED = _env_int("METRICS_ENABLED", 1) != 0
+SERVER_TIMING = _env_int("SERVER_TIMING", 0) != 0
@@ -1,9 +1,44 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.routers import excel
+from starlette.concurrency import run_in_threadpool
+from app import config
+from app.routers import excel, jobs
+from app.services.executor import ExecutorSaturated
+from app.services.metrics import CONTENT_TYPE, MetricsMiddleware, metrics
+from app.services.upload_spool import RequestSizeLimitMiddleware
+from app.services.warmup import parse_names, warm_templates
 
-app = FastAPI(title="Excel Input Processor API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 예전 평면 구조의 파일을 하위 디렉터리로 옮기고 저장 파일 정리기 시작
+    excel.excel_service.storage_janitor.start()
+    jobs.job_runner.start()
+    # 자주 쓰는 템플릿을 미리 분석/컴파일 (끝나야 요청을 받으므로 배포 직후 첫 요청도 캐시에서 처리)
+    await run_in_threadpool(
+        warm_templates, excel.excel_service, parse_names(config.WARMUP_TEMPLATES), parse_names(config.WARMUP_ENGINES)
+    )
+    yield
+    # 작업 대기열, 일괄 처리/시트 분석 프로세스 풀과 작업 실행기 정리
+    jobs.job_runner.stop()
+    excel.excel_service.storage_janitor.stop()
+    excel.excel_service.batch_filler.shutdown()
+    excel.excel_service.sheet_analyzer.shutdown()
+    excel.work_executor.shutdown()
+
+app = FastAPI(title="Excel Input Processor API", version="1.0.0", lifespan=lifespan)
+
+metrics.configure(config.METRICS_ENABLED, config.SERVER_TIMING)
+metrics.gauge(
+    "excel_executor_tasks", "작업 실행기에서 실행 중/대기 중인 작업 수", ("state",),
+    lambda: [((state,), excel.work_executor.stats()[state]) for state in ("running", "queued")]
+)
+metrics.gauge(
+    "excel_executor_rejected", "실행기가 포화되어 503 으로 거절한 요청 수 (프로세스 시작 후 누계)", (),
+    lambda: [((), excel.work_executor.stats()["rejected"])]
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,9 +48,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# 업로드가 MAX_FILE_SIZE 를 넘으면 본문을 다 받기 전에 거절
+if config.MAX_FILE_SIZE:
+    app.add_middleware(RequestSizeLimitMiddleware, max_file_size=config.MAX_FILE_SIZE)
+
+# 엔드포인트별 응답 시간과 Server-Timing 헤더 (가장 바깥에서 측정하도록 마지막에 추가)
+if config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+app.mount("/uploads", StaticFiles(directory=config.UPLOAD_DIR), name="uploads")
 
 app.include_router(excel.router, prefix="/api", tags=["excel"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 
 @app.get("/")
 async def root():
@@ -23,4 +75,9 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus 텍스트 형식의 측정값"""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
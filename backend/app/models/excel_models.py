@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Literal, Optional, Any
 
 class InputField(BaseModel):
     pattern: str
@@ -24,18 +24,73 @@ class ExcelAnalysisResult(BaseModel):
     pandas_error: Optional[str] = None
     file_id: Optional[str] = None
 
+class ExcelProfileResult(BaseModel):
+    file_id: str
+    engine: str
+    pandas_info: Dict[str, Any]
+
+class InputFieldPage(BaseModel):
+    file_id: str
+    sheet: Optional[str] = None
+    total: int
+    offset: int
+    limit: int
+    fields: List[InputField]
+
 class InputValue(BaseModel):
     pattern: str
     value: str
     cell: str
     sheet: str
+    # 셀 전체가 placeholder 이면 이 형식의 셀로 기록 (string 이면 텍스트로 치환)
+    type: Literal["string", "number", "date", "bool", "formula"] = "string"
 
 class ProcessExcelRequest(BaseModel):
     file_id: str
     input_values: List[InputValue]
+    # 같은 값을 조금씩 바꿔 반복 요청하는 클라이언트(편집 화면)의 식별자. 직전 결과를 재사용하는 단위
+    session_id: Optional[str] = None
 
 class ProcessExcelResponse(BaseModel):
     success: bool
     message: str
     download_url: Optional[str] = None
-    processed_file_id: Optional[str] = None
\ No newline at end of file
+    processed_file_id: Optional[str] = None
+
+class BatchProcessRequest(BaseModel):
+    file_id: str
+    rows: List[List[InputValue]]
+
+class BatchProcessResponse(BaseModel):
+    success: bool
+    message: str
+    download_url: Optional[str] = None
+    batch_id: Optional[str] = None
+    total_files: int = 0
+
+class JobRequest(BaseModel):
+    kind: Literal["analyze", "process", "batch"]
+    file_id: str
+    # process 작업의 입력값, batch 작업의 행 목록
+    input_values: List[InputValue] = []
+    rows: List[List[InputValue]] = []
+    # analyze 작업 옵션
+    engine: Literal["openpyxl", "stream"] = "openpyxl"
+    profile: bool = False
+    profile_engine: Literal["stream", "pandas"] = "stream"
+    format: Literal["full", "compact"] = "full"
+    # 지정하지 않으면 batch 작업은 batch, 나머지는 interactive 대기열
+    priority: Optional[Literal["interactive", "batch"]] = None
+
+class JobStatus(BaseModel):
+    job_id: str
+    kind: str
+    lane: str
+    status: str
+    progress: float
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    download_url: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
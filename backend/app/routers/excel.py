@@ -1,72 +1,270 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import FileResponse
-from app.services.excel_service import ExcelService
-from app.models.excel_models import ExcelAnalysisResult, ProcessExcelRequest, ProcessExcelResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app import config
+from app.services.factory import create_excel_service
+from app.models.excel_models import (
+    ExcelAnalysisResult,
+    InputValue,
+    ExcelProfileResult,
+    InputFieldPage,
+    ProcessExcelRequest,
+    ProcessExcelResponse,
+    BatchProcessRequest,
+    BatchProcessResponse
+)
+from app.services.batch_fill import parse_value_rows
+from app.services.executor import BoundedExecutor, ExecutorSaturated
+from app.services.fast_json import FastJSONResponse
+from app.services.sheet_preview import render_csv, render_html
+from app.services.upload_spool import UploadTooLarge
+from email.utils import formatdate
+from pydantic import ValidationError
+from typing import Dict, List, Literal, Optional, Tuple, Union
+import json
 import os
 import tempfile
 
+AnalyzeEngine = Literal["openpyxl", "stream"]
+ProfileEngine = Literal["stream", "pandas"]
+AnalysisFormat = Literal["full", "compact"]
+PreviewFormat = Literal["html", "csv", "json"]
+
+# 입력 필드 페이지 하나의 최대 크기
+FIELDS_PAGE_MAX_LIMIT = 5000
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
 router = APIRouter()
-excel_service = ExcelService()
+excel_service = create_excel_service()
+# 분석/처리 작업은 이벤트 루프를 막지 않도록 제한된 실행기에서 수행
+work_executor = BoundedExecutor(
+    max_workers=config.EXECUTOR_MAX_WORKERS,
+    max_queue=config.EXECUTOR_MAX_QUEUE,
+    retry_after=config.EXECUTOR_RETRY_AFTER
+)
+
+async def _resolve_template(file_id: str, detail: str = "원본 파일을 찾을 수 없습니다.") -> str:
+    """file_id 의 템플릿 로컬 경로. 원격 저장소라면 내려받을 수 있으므로 실행기에서 조회"""
+    template_path = await work_executor.run(excel_service.get_template_path, file_id)
+    
+    if template_path is None or not os.path.exists(template_path):
+        raise HTTPException(status_code=404, detail=detail)
+    
+    return template_path
+
+async def _analysis_response(
+    file_path: str,
+    file_id: str,
+    response_format: str,
+    engine: str,
+    profile: bool,
+    profile_engine: str
+):
+    """format=compact 이면 열 배열 형식을 pydantic 검증 없이 바로 직렬화하여 응답합니다."""
+    if response_format == "compact":
+        compact = await work_executor.run(
+            excel_service.analyze_excel_compact,
+            file_path,
+            engine=engine,
+            profile=profile,
+            profile_engine=profile_engine
+        )
+        compact["file_id"] = file_id
+        return FastJSONResponse(compact)
+    
+    analysis_result = await work_executor.run(
+        excel_service.analyze_excel_file,
+        file_path,
+        engine=engine,
+        profile=profile,
+        profile_engine=profile_engine
+    )
+    
+    setattr(analysis_result, 'file_id', file_id)
+    
+    return analysis_result
 
 @router.get("/analyze-sample", response_model=ExcelAnalysisResult)
-async def analyze_sample_excel():
+async def analyze_sample_excel(
+    engine: AnalyzeEngine = Query("openpyxl"),
+    profile: bool = Query(False),
+    profile_engine: ProfileEngine = Query("stream"),
+    response_format: AnalysisFormat = Query("full", alias="format")
+):
     """sample.xlsx 파일을 분석합니다."""
     try:
         # 프로젝트 루트에 있는 sample.xlsx 파일 경로
-        # backend/app/routers/excel.py -> ../../../sample.xlsx
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        backend_dir = os.path.dirname(os.path.dirname(current_dir))
-        project_root = os.path.dirname(backend_dir)
-        sample_file_path = os.path.join(project_root, "sample.xlsx")
+        sample_file_path = excel_service.get_sample_file_path()
         
         if not os.path.exists(sample_file_path):
             raise HTTPException(status_code=404, detail="sample.xlsx 파일을 찾을 수 없습니다.")
         
-        analysis_result = excel_service.analyze_excel_file(sample_file_path)
-        
         # sample.xlsx의 고정 file_id 설정
-        setattr(analysis_result, 'file_id', 'sample')
-        
-        return analysis_result
+        return await _analysis_response(sample_file_path, "sample", response_format, engine, profile, profile_engine)
         
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/analyze-excel", response_model=ExcelAnalysisResult)
-async def analyze_excel(file: UploadFile = File(...)):
+async def analyze_excel(
+    file: UploadFile = File(...),
+    engine: AnalyzeEngine = Query("openpyxl"),
+    profile: bool = Query(False),
+    profile_engine: ProfileEngine = Query("stream"),
+    response_format: AnalysisFormat = Query("full", alias="format")
+):
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="Excel 파일만 업로드 가능합니다.")
     
+    if config.MAX_FILE_SIZE and file.size is not None and file.size > config.MAX_FILE_SIZE:
+        raise UploadTooLarge(config.MAX_FILE_SIZE)
+    
     try:
-        file_content = await file.read()
-        file_id = excel_service.save_uploaded_file(file_content, file.filename)
+        # 업로드는 청크 단위로 디스크에 쓰면서 해시하므로 메모리에 전체를 올리지 않음
+        file_id = await work_executor.run(
+            excel_service.save_uploaded_stream,
+            file.file,
+            file.filename,
+            config.MAX_FILE_SIZE
+        )
         file_path = excel_service.get_file_path(file_id, "upload_")
         
-        analysis_result = excel_service.analyze_excel_file(file_path)
-        
-        setattr(analysis_result, 'file_id', file_id)
-        
-        return analysis_result
+        return await _analysis_response(file_path, file_id, response_format, engine, profile, profile_engine)
         
+    except (ExecutorSaturated, UploadTooLarge):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/file/{file_id}/profile", response_model=ExcelProfileResult)
+async def profile_file(file_id: str, engine: ProfileEngine = Query("stream")):
+    """업로드된 파일(또는 sample)의 시트별 shape/columns/dtypes 요약을 반환합니다."""
+    file_path = await _resolve_template(file_id, "파일을 찾을 수 없습니다.")
+    
+    try:
+        pandas_info = await work_executor.run(excel_service.profile_excel_file, file_path, engine)
+        return ExcelProfileResult(file_id=file_id, engine=engine, pandas_info=pandas_info)
+    
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/file/{file_id}/fields", response_model=InputFieldPage)
+async def list_fields(
+    file_id: str,
+    sheet: Optional[str] = Query(None),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=FIELDS_PAGE_MAX_LIMIT),
+    engine: AnalyzeEngine = Query("stream")
+):
+    """분석된 입력 필드를 페이지 단위로 반환합니다. sheet 는 시트 이름 또는 0부터 시작하는 인덱스."""
+    file_path = await _resolve_template(file_id, "파일을 찾을 수 없습니다.")
+    
+    try:
+        table = await work_executor.run(excel_service.analyze_excel_table, file_path, engine)
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    sheet_index = None
+    if sheet is not None:
+        sheet_index = table.sheet_index(sheet)
+        if sheet_index is None:
+            raise HTTPException(status_code=404, detail=f"시트를 찾을 수 없습니다: {sheet}")
+    
+    total, fields = table.fields(sheet_index, offset, limit)
+    
+    return FastJSONResponse({
+        "file_id": file_id,
+        "sheet": table.sheets[sheet_index]["name"] if sheet_index is not None else None,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "fields": fields
+    })
+
+def _parse_preview_values(values: Optional[str]) -> Union[Dict[str, str], List[InputValue]]:
+    """values 쿼리(JSON): InputValue 목록 또는 패턴이 있는 모든 셀에 적용할 {패턴: 값}"""
+    if not values:
+        return []
+    try:
+        parsed = json.loads(values)
+        if isinstance(parsed, dict):
+            return {str(pattern): str(value) for pattern, value in parsed.items()}
+        if isinstance(parsed, list):
+            return [InputValue(**value) for value in parsed]
+    except (json.JSONDecodeError, TypeError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=f"values 형식이 잘못되었습니다: {e}")
+    raise HTTPException(status_code=400, detail="values 는 InputValue 목록 또는 {패턴: 값} 객체여야 합니다.")
+
+@router.get("/file/{file_id}/preview")
+async def preview_file(
+    file_id: str,
+    sheet: Optional[str] = Query(None),
+    cell_range: Optional[str] = Query(None, alias="range"),
+    values: Optional[str] = Query(None),
+    response_format: PreviewFormat = Query("html", alias="format")
+):
+    """입력값을 가상으로 적용한 시트 영역을 HTML/CSV/JSON 으로 반환합니다. 파일은 만들지 않습니다.
+
+    sheet 는 시트 이름 또는 0부터 시작하는 인덱스(기본 첫 시트), range 는 'A1:H30' 형식,
+    values 는 InputValue 목록 또는 {패턴: 값} 의 JSON 입니다.
+    """
+    input_values = _parse_preview_values(values)
+    file_path = await _resolve_template(file_id, "파일을 찾을 수 없습니다.")
+    
+    try:
+        preview = await work_executor.run(excel_service.preview_excel, file_path, sheet, cell_range, input_values)
+    except ExecutorSaturated:
+        raise
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if response_format == "csv":
+        return Response(render_csv(preview), media_type="text/csv; charset=utf-8")
+    if response_format == "json":
+        return FastJSONResponse(dict(preview.to_dict(), file_id=file_id))
+    return Response(render_html(preview), media_type="text/html; charset=utf-8")
+
 @router.post("/process-excel", response_model=ProcessExcelResponse)
-async def process_excel(request: ProcessExcelRequest):
+async def process_excel(request: ProcessExcelRequest, stream: bool = Query(False)):
     try:
+        if stream:
+            # 결과를 저장하지 않고 만들어지는 대로 응답으로 전송 (일회성 다운로드)
+            original_file_path = await _resolve_template(request.file_id)
+            chunks = await work_executor.run(
+                excel_service.stream_excel_with_inputs,
+                original_file_path,
+                request.input_values,
+                request.session_id
+            )
+            return StreamingResponse(
+                chunks,
+                media_type=XLSX_MEDIA_TYPE,
+                headers={"Content-Disposition": 'attachment; filename="processed.xlsx"'}
+            )
+        
         if request.file_id == "sample":
             # sample.xlsx 파일 처리
-            processed_file_id = excel_service.process_sample_excel_with_inputs(request.input_values)
+            processed_file_id = await work_executor.run(excel_service.process_sample_excel_with_inputs, request.input_values, request.session_id)
         else:
             # 업로드된 파일 처리 (기존 로직)
-            original_file_path = excel_service.get_file_path(request.file_id, "upload_")
-            
-            if not os.path.exists(original_file_path):
-                raise HTTPException(status_code=404, detail="원본 파일을 찾을 수 없습니다.")
+            original_file_path = await _resolve_template(request.file_id)
             
-            processed_file_id = excel_service.process_excel_with_inputs(
+            processed_file_id = await work_executor.run(
+                excel_service.process_excel_with_inputs,
                 original_file_path, 
-                request.input_values
+                request.input_values,
+                request.session_id
             )
         
         download_url = f"/api/download/{processed_file_id}"
@@ -78,49 +276,188 @@ async def process_excel(request: ProcessExcelRequest):
             processed_file_id=processed_file_id
         )
         
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         return ProcessExcelResponse(
             success=False,
             message=f"처리 중 오류 발생: {str(e)}"
         )
 
+async def _process_batch(file_id: str, rows) -> BatchProcessResponse:
+    template_path = await _resolve_template(file_id)
+    
+    batch_id, total_files = await work_executor.run(excel_service.process_excel_batch, template_path, rows)
+    
+    return BatchProcessResponse(
+        success=True,
+        message=f"{total_files}개의 Excel 파일이 성공적으로 처리되었습니다.",
+        download_url=f"/api/download/batch/{batch_id}",
+        batch_id=batch_id,
+        total_files=total_files
+    )
+
+@router.post("/process-excel/batch", response_model=BatchProcessResponse)
+async def process_excel_batch(request: BatchProcessRequest):
+    """하나의 템플릿을 여러 input_values 행으로 채워 zip 으로 반환합니다."""
+    try:
+        return await _process_batch(request.file_id, ((None, input_values) for input_values in request.rows))
+    
+    except (HTTPException, ExecutorSaturated):
+        raise
+    except Exception as e:
+        return BatchProcessResponse(
+            success=False,
+            message=f"처리 중 오류 발생: {str(e)}"
+        )
+
+@router.post("/process-excel/batch/upload", response_model=BatchProcessResponse)
+async def process_excel_batch_upload(file_id: str = Form(...), file: UploadFile = File(...)):
+    """CSV(첫 줄이 패턴 이름), JSONL 또는 JSON 배열 파일의 각 행으로 템플릿을 채워 zip 으로 반환합니다."""
+    if not file.filename.lower().endswith(('.csv', '.jsonl', '.ndjson', '.json')):
+        raise HTTPException(status_code=400, detail="CSV, JSONL 또는 JSON 파일만 업로드 가능합니다.")
+    
+    try:
+        # 업로드는 디스크로 넘겨진 임시 파일이므로 전체를 읽지 않고 한 줄씩 파싱
+        return await _process_batch(file_id, parse_value_rows(file.file, file.filename))
+    
+    except (HTTPException, ExecutorSaturated):
+        raise
+    except Exception as e:
+        return BatchProcessResponse(
+            success=False,
+            message=f"처리 중 오류 발생: {str(e)}"
+        )
+
+class _RangeNotSatisfiable(Exception):
+    pass
+
+def _parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Range 헤더의 단일 'bytes=' 구간을 (시작, 끝) 으로 변환합니다.
+
+    여러 구간이나 해석할 수 없는 값은 None(전체 전송)이고, 파일 밖의 구간이면 _RangeNotSatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, separator, end_text = spec.strip().partition("-")
+    if not separator:
+        return None
+    try:
+        if not start_text:
+            # 'bytes=-500' 은 마지막 500 바이트
+            suffix_length = int(end_text)
+            if suffix_length <= 0 or size == 0:
+                raise _RangeNotSatisfiable()
+            return max(size - suffix_length, 0), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise _RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+async def _download_response(request: Request, file_id: str, prefix: str, extension: str, filename: str, media_type: str):
+    """저장된 파일을 청크 단위로 스트리밍합니다. ETag/If-None-Match 와 단일 구간 Range 를 지원하여
+    재시도나 CDN 이 이미 받은 내용을 다시 받지 않도록 합니다."""
+    key = excel_service.storage_key(file_id, prefix, extension)
+    stored = await run_in_threadpool(excel_service.storage.stat, key)
+    
+    if stored is None:
+        raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
+    
+    local_path = excel_service.storage.local_path(key)
+    if local_path is not None:
+        excel_service.storage_janitor.touch(local_path)
+    
+    headers = {
+        "ETag": stored.etag,
+        "Last-Modified": formatdate(stored.modified, usegmt=True),
+        "Accept-Ranges": "bytes"
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, stored.etag):
+        return Response(status_code=304, headers=headers)
+    
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # If-Range 가 현재 버전과 다르면 구간 대신 전체를 보냄
+    if range_header is not None and (if_range is None or if_range.strip() in (stored.etag, headers["Last-Modified"])):
+        try:
+            byte_range = _parse_byte_range(range_header, stored.size)
+        except _RangeNotSatisfiable:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{stored.size}", **headers})
+    
+    if byte_range is None:
+        headers["Content-Length"] = str(stored.size)
+        return StreamingResponse(excel_service.storage.iter_chunks(key), media_type=media_type, headers=headers)
+    
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{stored.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        excel_service.storage.iter_chunks(key, start, end - start + 1),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
+
+@router.get("/download/batch/{batch_id}")
+async def download_batch(request: Request, batch_id: str):
+    return await _download_response(request, batch_id, "batch_", ".zip", f"batch_{batch_id}.zip", "application/zip")
+
 @router.get("/download/{file_id}")
-async def download_file(file_id: str):
+async def download_file(request: Request, file_id: str):
     try:
-        file_path = excel_service.get_file_path(file_id, "processed_")
-        
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
-        
-        return FileResponse(
-            path=file_path,
-            filename=f"processed_{file_id}.xlsx",
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        return await _download_response(
+            request,
+            file_id,
+            "processed_",
+            ".xlsx",
+            f"processed_{file_id}.xlsx",
+            XLSX_MEDIA_TYPE
         )
         
+    except HTTPException:
+        # 파일이 없을 때의 404 등은 그대로 전달
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/storage/stats")
+async def storage_stats():
+    """저장 파일 수/크기와 정리기가 회수한 파일 수/크기를 반환합니다."""
+    return excel_service.storage_janitor.stats()
+
 @router.delete("/file/{file_id}")
 async def delete_file(file_id: str):
     try:
-        upload_path = excel_service.get_file_path(file_id, "upload_")
-        processed_path = excel_service.get_file_path(file_id, "processed_")
-        
-        deleted_files = []
-        
-        if os.path.exists(upload_path):
-            os.remove(upload_path)
-            deleted_files.append("upload")
-        
-        if os.path.exists(processed_path):
-            os.remove(processed_path)
-            deleted_files.append("processed")
+        deleted_files = await run_in_threadpool(excel_service.delete_file, file_id)
+        has_upload = await run_in_threadpool(excel_service.has_upload, file_id)
         
-        if not deleted_files:
+        if not deleted_files and not has_upload:
             raise HTTPException(status_code=404, detail="삭제할 파일을 찾을 수 없습니다.")
         
-        return {"message": f"파일이 성공적으로 삭제되었습니다: {', '.join(deleted_files)}"}
+        messages = []
+        if deleted_files:
+            messages.append(f"파일이 성공적으로 삭제되었습니다: {', '.join(deleted_files)}")
+        if has_upload:
+            # 같은 내용의 업로드는 file_id 가 같아 다른 사용자와 공유되므로 보관 기간이 지나면 정리기가 삭제
+            messages.append("업로드 원본은 보관 기간이 지나면 자동으로 삭제됩니다.")
+        return {"message": " ".join(messages)}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
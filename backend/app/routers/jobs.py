@@ -0,0 +1,101 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from app import config
+from app.models.excel_models import JobRequest, JobStatus
+from app.routers.excel import AnalysisFormat, AnalyzeEngine, ProfileEngine, excel_service, work_executor
+from app.services.executor import ExecutorSaturated
+from app.services.jobs import JobRunner, create_job_broker
+from app.services.upload_spool import UploadTooLarge
+from typing import Any, Dict
+import os
+
+router = APIRouter()
+job_broker = create_job_broker(config.JOB_BACKEND, config.JOB_REDIS_URL, ttl=config.JOB_TTL)
+# memory 저장소는 다른 프로세스와 공유할 수 없으므로 같은 서비스를 쓰는 스레드에서 실행
+job_runner = JobRunner(
+    job_broker,
+    workers=config.JOB_WORKERS,
+    interactive_reserved=config.JOB_INTERACTIVE_RESERVED,
+    use_processes=config.STORAGE_BACKEND != "memory",
+    service=excel_service
+)
+
+def _job_status(job: Dict[str, Any]) -> JobStatus:
+    return JobStatus(**{key: value for key, value in job.items() if key != "payload"})
+
+def _template_exists(file_id: str) -> bool:
+    if file_id == "sample":
+        return os.path.exists(excel_service.get_sample_file_path())
+    return excel_service.storage.exists(excel_service.storage_key(file_id, "upload_"))
+
+async def _submit(kind: str, payload: Dict[str, Any], lane: str) -> JobStatus:
+    if not await run_in_threadpool(_template_exists, payload["file_id"]):
+        raise HTTPException(status_code=404, detail="원본 파일을 찾을 수 없습니다.")
+
+    job = await run_in_threadpool(job_broker.submit, kind, payload, lane)
+    return _job_status(job)
+
+@router.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(request: JobRequest):
+    """분석/처리/일괄 처리 작업을 대기열에 넣고 바로 작업 상태를 반환합니다.
+
+    GET /api/jobs/{job_id} 로 진행 상태와 완료 후 download_url 을 확인합니다.
+    """
+    if request.kind == "process" and not request.input_values:
+        raise HTTPException(status_code=400, detail="process 작업에는 input_values 가 필요합니다.")
+    if request.kind == "batch" and not request.rows:
+        raise HTTPException(status_code=400, detail="batch 작업에는 rows 가 필요합니다.")
+
+    payload = request.model_dump(exclude={"kind", "priority"})
+    lane = request.priority or ("batch" if request.kind == "batch" else "interactive")
+    return await _submit(request.kind, payload, lane)
+
+@router.post("/jobs/analyze-excel", response_model=JobStatus, status_code=202)
+async def submit_analyze_excel(
+    file: UploadFile = File(...),
+    engine: AnalyzeEngine = Query("openpyxl"),
+    profile: bool = Query(False),
+    profile_engine: ProfileEngine = Query("stream"),
+    response_format: AnalysisFormat = Query("full", alias="format")
+):
+    """파일을 업로드하고 분석은 작업으로 실행합니다. 결과의 file_id 로 이후 처리를 요청합니다."""
+    if not file.filename.endswith(('.xlsx', '.xls')):
+        raise HTTPException(status_code=400, detail="Excel 파일만 업로드 가능합니다.")
+
+    if config.MAX_FILE_SIZE and file.size is not None and file.size > config.MAX_FILE_SIZE:
+        raise UploadTooLarge(config.MAX_FILE_SIZE)
+
+    try:
+        file_id = await work_executor.run(
+            excel_service.save_uploaded_stream,
+            file.file,
+            file.filename,
+            config.MAX_FILE_SIZE
+        )
+    except (ExecutorSaturated, UploadTooLarge):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    payload = {
+        "file_id": file_id,
+        "engine": engine,
+        "profile": profile,
+        "profile_engine": profile_engine,
+        "format": response_format
+    }
+    return await _submit("analyze", payload, "interactive")
+
+@router.get("/jobs/stats")
+async def job_stats():
+    """대기열별 대기/실행 중인 작업 수와 완료/실패 수를 반환합니다."""
+    return await run_in_threadpool(job_runner.stats)
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    job = await run_in_threadpool(job_broker.get, job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+
+    return _job_status(job)
@@ -0,0 +1,80 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.services import fast_json
+from app.services.analysis_table import AnalysisTable
+
+
+class AnalysisCache:
+    """콘텐츠 해시를 키로 분석 결과를 보관하는 2단계 캐시.
+
+    메모리에는 최근 max_entries 개를 LRU 로 두고, 디스크(cache_dir)에는 compact JSON 으로 저장하여
+    프로세스가 재시작되거나 다른 워커에서도 다시 분석하지 않도록 합니다. AnalysisTable 은
+    변경하지 않으므로 복사하지 않고 그대로 돌려줍니다.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 256):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, AnalysisTable]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remember(self, key: str, result: AnalysisTable):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[AnalysisTable]:
+        """캐시된 결과. 없으면 None."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                return result
+
+        try:
+            with open(self._path(key), "rb") as f:
+                result = AnalysisTable.from_compact(fast_json.loads(f.read()))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        self._remember(key, result)
+        return result
+
+    def put(self, key: str, result: AnalysisTable):
+        self._remember(key, result)
+
+        # 임시 파일에 쓴 뒤 교체하여 다른 워커가 쓰다 만 파일을 읽지 않도록 함
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(fast_json.dumps(result.to_compact()))
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def invalidate(self, content_hash: str):
+        """해당 콘텐츠 해시로 시작하는 모든 항목을 지웁니다."""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(content_hash)]:
+                del self._entries[key]
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(content_hash):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
@@ -0,0 +1,142 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models.excel_models import ExcelAnalysisResult, InputField, SheetInfo
+from app.services.xlsx_reader import column_letter
+
+# (행, 열, 패턴, 원래 셀 값)
+FieldRow = Tuple[int, int, str, str]
+
+
+class AnalysisTable:
+    """분석 결과를 시트 목록과 필드 열 배열로 보관하는 내부 표현.
+
+    필드는 시트 순서, 시트 안에서는 행 우선 순서로 한 번만 저장하고, 셀 주소와 열 문자는
+    행/열에서 계산하며 같은 원래 값은 문자열 표에 한 번만 둡니다. 캐시와 compact 응답은 이
+    표현을 그대로 쓰고, ExcelAnalysisResult 는 full 형식이 필요할 때만 만듭니다.
+
+    캐시가 같은 객체를 여러 요청에 돌려주므로 만든 뒤에는 변경하지 않습니다.
+    """
+
+    def __init__(self):
+        self.file_info: Dict[str, Any] = {}
+        # {"name", "max_row", "max_column", "field_offset", "field_count"}
+        self.sheets: List[Dict[str, Any]] = []
+        self.sheet: List[int] = []
+        self.row: List[int] = []
+        self.column: List[int] = []
+        self.pattern: List[str] = []
+        self.value: List[int] = []
+        self.values: List[str] = []
+        self._value_index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.row)
+
+    def add_sheet(self, name: str, max_row: int, max_column: int, fields: Iterable[FieldRow]) -> int:
+        """시트와 그 시트의 필드를 (행 우선 순서로) 추가하고 시트 인덱스를 반환합니다."""
+        sheet_index = len(self.sheets)
+        offset = len(self.row)
+        for row, column, pattern, original_value in fields:
+            value_index = self._value_index.get(original_value)
+            if value_index is None:
+                value_index = self._value_index[original_value] = len(self.values)
+                self.values.append(original_value)
+            self.sheet.append(sheet_index)
+            self.row.append(row)
+            self.column.append(column)
+            self.pattern.append(pattern)
+            self.value.append(value_index)
+        self.sheets.append({
+            "name": name,
+            "max_row": max_row,
+            "max_column": max_column,
+            "field_offset": offset,
+            "field_count": len(self.row) - offset,
+        })
+        return sheet_index
+
+    def sheet_index(self, sheet: str) -> Optional[int]:
+        """시트 이름(없으면 0부터 시작하는 인덱스 문자열)에 해당하는 인덱스. 없으면 None."""
+        for index, info in enumerate(self.sheets):
+            if info["name"] == sheet:
+                return index
+        if sheet.isdigit() and int(sheet) < len(self.sheets):
+            return int(sheet)
+        return None
+
+    def field(self, index: int) -> Dict[str, Any]:
+        """index 번째 필드를 InputField 와 같은 모양의 dict 로 반환합니다."""
+        letter = column_letter(self.column[index])
+        return {
+            "pattern": self.pattern[index],
+            "cell": f"{letter}{self.row[index]}",
+            "row": self.row[index],
+            "column": self.column[index],
+            "column_letter": letter,
+            "original_value": self.values[self.value[index]],
+            "sheet": self.sheets[self.sheet[index]]["name"],
+        }
+
+    def fields(self, sheet_index: Optional[int] = None, offset: int = 0, limit: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """(전체 수, offset 부터 limit 개의 필드 dict) 를 반환합니다. sheet_index 가 있으면 그 시트만."""
+        if sheet_index is None:
+            start, total = 0, len(self.row)
+        else:
+            start, total = self.sheets[sheet_index]["field_offset"], self.sheets[sheet_index]["field_count"]
+        end = total if limit is None else min(total, offset + limit)
+        return total, [self.field(start + index) for index in range(offset, end)]
+
+    def to_compact(self) -> Dict[str, Any]:
+        """compact 응답/캐시 형식. 내부 목록을 그대로 참조하므로 반환값을 변경하지 마세요."""
+        return {
+            "format": "compact",
+            "file_info": self.file_info,
+            "sheets": self.sheets,
+            "fields": {
+                "sheet": self.sheet,
+                "row": self.row,
+                "column": self.column,
+                "pattern": self.pattern,
+                "value": self.value,
+            },
+            "values": self.values,
+        }
+
+    @classmethod
+    def from_compact(cls, data: Dict[str, Any]) -> "AnalysisTable":
+        table = cls()
+        table.file_info = data["file_info"]
+        table.sheets = data["sheets"]
+        fields = data["fields"]
+        table.sheet = fields["sheet"]
+        table.row = fields["row"]
+        table.column = fields["column"]
+        table.pattern = fields["pattern"]
+        table.value = fields["value"]
+        table.values = data["values"]
+        table._value_index = {value: index for index, value in enumerate(table.values)}
+        return table
+
+    def to_result(self) -> ExcelAnalysisResult:
+        """full 형식의 ExcelAnalysisResult. 값이 이미 검증되었으므로 검증 없이 만듭니다."""
+        sheet_fields: List[List[InputField]] = [[] for _ in self.sheets]
+        input_fields = []
+        for index in range(len(self.row)):
+            input_field = InputField.model_construct(**self.field(index))
+            sheet_fields[self.sheet[index]].append(input_field)
+            input_fields.append(input_field)
+
+        sheets = {
+            info["name"]: SheetInfo.model_construct(
+                name=info["name"],
+                max_row=info["max_row"],
+                max_column=info["max_column"],
+                input_fields=sheet_fields[index]
+            )
+            for index, info in enumerate(self.sheets)
+        }
+        return ExcelAnalysisResult.model_construct(
+            sheets=sheets,
+            input_fields=input_fields,
+            file_info=dict(self.file_info)
+        )
@@ -0,0 +1,214 @@
+import csv
+import io
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from app.models.excel_models import InputValue
+from app.services.placeholder_index import PlaceholderIndexStore
+from app.services.template_plan import CompiledTemplate, TemplatePlanCache
+
+BatchRow = Tuple[str, List[InputValue]]
+
+_UNSAFE_FILENAME = re.compile(r'[^\w.\- ]+', re.UNICODE)
+
+# 작업 프로세스마다 하나씩 두어 같은 템플릿을 다시 컴파일하지 않음
+_worker_plan_cache: Optional[TemplatePlanCache] = None
+
+
+def _fill_with_plan(plan: CompiledTemplate, compression_level: int, rows: List[BatchRow]) -> List[Tuple[str, bytes]]:
+    results = []
+    for filename, input_values in rows:
+        buffer = io.BytesIO()
+        plan.fill(input_values, buffer, compression_level)
+        results.append((filename, buffer.getvalue()))
+    return results
+
+
+def _fill_chunk(
+    template_path: str,
+    compression_level: int,
+    rows: List[BatchRow],
+    index_root: Optional[str] = None,
+) -> List[Tuple[str, bytes]]:
+    """작업 프로세스에서 실행: 컴파일된 템플릿으로 여러 행을 채워 (파일명, xlsx 바이트) 목록을 반환
+
+    index_root 가 있으면 부모 프로세스가 저장한 placeholder 색인으로 템플릿을 복원합니다.
+    """
+    global _worker_plan_cache
+    if _worker_plan_cache is None:
+        _worker_plan_cache = TemplatePlanCache(index_store=PlaceholderIndexStore(index_root) if index_root else None)
+
+    return _fill_with_plan(_worker_plan_cache.get(template_path), compression_level, rows)
+
+
+def _safe_filename(name: str, index: int) -> str:
+    name = _UNSAFE_FILENAME.sub("_", os.path.basename(name or "")).strip(" .")
+    if not name:
+        name = f"{index + 1:05d}"
+    if not name.lower().endswith(".xlsx"):
+        name = f"{name}.xlsx"
+    return name
+
+
+def _json_row(record, where: str) -> Tuple[Optional[str], Union[Dict[str, str], List[InputValue]]]:
+    if not isinstance(record, dict):
+        raise ValueError(f"{where}은 JSON 객체여야 합니다.")
+    name = record.pop("filename", None)
+    if "input_values" in record:
+        return name, [InputValue(**value) for value in record["input_values"]]
+    return name, {str(pattern): str(value) for pattern, value in record.items()}
+
+
+def parse_value_rows(
+    source: Union[bytes, str, BinaryIO],
+    filename: str,
+) -> Iterator[Tuple[Optional[str], Union[Dict[str, str], List[InputValue]]]]:
+    """업로드된 CSV/JSONL/JSON 을 행 단위로 읽습니다.
+
+    CSV 는 첫 줄이 패턴 이름(input1, input2 ...)인 표, JSONL 은 한 줄에 하나씩
+    {패턴: 값} 객체 또는 {"input_values": [...]} 객체, JSON 은 그런 객체의 배열입니다. 모든 형식에서
+    선택적으로 'filename' 열/키로 결과 파일 이름을 지정할 수 있습니다. source 가 파일 객체이면
+    CSV/JSONL 은 한 줄씩 읽으므로 전체를 메모리에 올리지 않습니다 (JSON 배열은 한 번에 읽음).
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    text = io.StringIO(source) if isinstance(source, str) else io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        lowered = filename.lower()
+        if lowered.endswith(".json"):
+            try:
+                records = json.load(text)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON 형식이 잘못되었습니다: {e}")
+            if not isinstance(records, list):
+                raise ValueError("JSON 파일은 객체의 배열이어야 합니다. 한 줄에 객체 하나씩이면 .jsonl 로 올려 주세요.")
+            for index, record in enumerate(records, start=1):
+                yield _json_row(record, f"{index}번째 항목")
+            return
+
+        if lowered.endswith((".jsonl", ".ndjson")):
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{line_number}번째 줄의 JSON 형식이 잘못되었습니다: {e}")
+                yield _json_row(record, f"{line_number}번째 줄")
+            return
+
+        for record in csv.DictReader(text):
+            name = record.pop("filename", None)
+            yield name, {pattern: value or "" for pattern, value in record.items() if pattern}
+    finally:
+        if isinstance(text, io.TextIOWrapper):
+            # 업로드 파일은 호출한 쪽에서 닫도록 분리
+            text.detach()
+
+
+class BatchFiller:
+    """하나의 템플릿을 여러 값 세트로 채워 zip 하나로 묶는 일괄 처리기.
+
+    행이 parallel_threshold 개 이상이면 프로세스 풀에 나누어 맡기고, 각 작업 프로세스는
+    템플릿을 한 번만 컴파일해 재사용합니다.
+    """
+
+    def __init__(
+        self,
+        plan_cache: TemplatePlanCache,
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = 32,
+    ):
+        self.plan_cache = plan_cache
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 서버 스레드 상태를 물려받지 않도록 spawn 으로 시작
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def fill(
+        self,
+        template_path: str,
+        rows: Iterable[Tuple[Optional[str], List[InputValue]]],
+        output_path: str,
+        compression_level: int = 6,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """rows 를 채운 xlsx 들을 output_path 의 zip 으로 기록하고 생성한 파일 수를 반환합니다.
+
+        progress 가 있으면 파일 하나를 기록할 때마다 (완료 수, 전체 수) 로 호출합니다.
+        """
+        named_rows: List[BatchRow] = []
+        used_names = set()
+        for index, (name, input_values) in enumerate(rows):
+            filename = _safe_filename(name, index)
+            if filename in used_names:
+                filename = f"{filename[:-5]}_{index + 1}.xlsx"
+            used_names.add(filename)
+            named_rows.append((filename, input_values))
+
+        if not named_rows:
+            raise ValueError("처리할 행이 없습니다.")
+
+        # xlsx 는 이미 압축되어 있으므로 바깥 zip 은 저장만 함
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_STORED) as archive:
+            for done, (filename, content) in enumerate(self._fill_rows(template_path, named_rows, compression_level), start=1):
+                archive.writestr(filename, content)
+                if progress is not None:
+                    progress(done, len(named_rows))
+
+        return len(named_rows)
+
+    def _fill_rows(self, template_path: str, rows: List[BatchRow], compression_level: int) -> Iterator[Tuple[str, bytes]]:
+        if len(rows) < self.parallel_threshold or self.max_workers == 1:
+            yield from _fill_with_plan(self.plan_cache.get(template_path), compression_level, rows)
+            return
+
+        # 작업 프로세스마다 여러 묶음을 주어 부하를 고르게 분산
+        chunk_size = max(1, math.ceil(len(rows) / (self.max_workers * 4)))
+        executor = self._get_executor()
+        index_store = self.plan_cache.index_store
+        index_root = index_store.root if index_store is not None else None
+        # 결과 바이트가 메모리에 쌓이지 않도록 작업 프로세스당 두 묶음까지만 미리 맡기고,
+        # 앞 묶음을 기록하는 대로 다음 묶음을 맡김
+        starts = iter(range(0, len(rows), chunk_size))
+
+        def submit(start: int) -> Future:
+            return executor.submit(_fill_chunk, template_path, compression_level, rows[start:start + chunk_size], index_root)
+
+        pending: Deque[Future] = deque(submit(start) for start in itertools.islice(starts, self.max_workers * 2))
+        try:
+            while pending:
+                results = pending.popleft().result()
+                start = next(starts, None)
+                if start is not None:
+                    pending.append(submit(start))
+                yield from results
+        finally:
+            # 기록이 중간에 실패하면 아직 시작하지 않은 묶음은 취소
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,434 @@
+import itertools
+import math
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.models.excel_models import InputValue
+from app.services.placeholder import PlaceholderSubstituter, escape_xml_attribute, escape_xml_text
+from app.services.rich_text import item_text, iter_string_items, rewrite_string_item
+
+_PREFIX = r'(?:[A-Za-z_][\w.-]*:)?'
+_CELL = re.compile(r'<(' + _PREFIX + r'c)\b([^>]*?)(?:/>|>(.*?)</\1>)', re.DOTALL)
+_CELL_REF = re.compile(r'\br\s*=\s*["\']([^"\']+)["\']')
+_CELL_TYPE = re.compile(r'\s+t\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+_CELL_VALUE = re.compile(r'<' + _PREFIX + r'v>\s*(\d+)\s*</' + _PREFIX + r'v>')
+_INLINE_STRING = re.compile(r'<(' + _PREFIX + r'is)\b[^>]*?(?:/>|>(.*?)</\1>)', re.DOTALL)
+_NUMBER = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+_CALC_PR = re.compile(r'<(' + _PREFIX + r')calcPr\b([^>]*?)(/?)>')
+_FULL_CALC = re.compile(r'\s+fullCalcOnLoad\s*=\s*(?:"[^"]*"|\'[^\']*\')')
+_DATE_1904 = re.compile(r'<' + _PREFIX + r'workbookPr\b[^>]*?\bdate1904\s*=\s*["\'](?:1|true)["\']')
+# CT_Workbook 에서 calcPr 뒤에 올 수 있는 요소. 없으면 </workbook> 앞에 넣음
+_AFTER_CALC_PR = re.compile(
+    r'<' + _PREFIX + r'(?:oleSize|customWorkbookViews|pivotCaches|smartTagPr|smartTagTypes|webPublishing'
+    r'|fileRecoveryPr|webPublishObjects|extLst)\b|</' + _PREFIX + r'workbook>'
+)
+
+_CELL_STYLE = re.compile(r'\s+s\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+_STYLE_SHEET = re.compile(r'<(' + _PREFIX + r')styleSheet\b[^>]*>')
+_NUM_FMTS = re.compile(r'<(' + _PREFIX + r')numFmts\b([^>]*?)(?:/>|>(.*?)</\1numFmts>)', re.DOTALL)
+_NUM_FMT = re.compile(r'<' + _PREFIX + r'numFmt\b([^>]*?)/?>')
+_CELL_XFS = re.compile(r'<(' + _PREFIX + r')cellXfs\b([^>]*?)>(.*?)</\1cellXfs>', re.DOTALL)
+_XF = re.compile(r'<(' + _PREFIX + r')xf\b([^>]*?)(?:/>|>.*?</\1xf>)', re.DOTALL)
+_ATTRIBUTE = re.compile(r'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+_COUNT = re.compile(r'\s+count\s*=\s*(?:"[^"]*"|\'[^\']*\')')
+_NUM_FMT_ID = re.compile(r'\s+numFmtId\s*=\s*(?:"[^"]*"|\'[^\']*\')')
+_APPLY_NUMBER_FORMAT = re.compile(r'\s+applyNumberFormat\s*=\s*(?:"[^"]*"|\'[^\']*\')')
+# 서식 코드에서 날짜/시간 기호를 찾기 전에 지우는 부분 (따옴표 문자열, 이스케이프 문자, [색] 등)
+_FORMAT_LITERALS = re.compile(r'"[^"]*"|\\.|\[[^\]]*\]')
+_DATE_CODE = re.compile(r'[dmyhs]', re.IGNORECASE)
+# 날짜/시간을 나타내는 기본 제공 서식 번호
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+# openpyxl 이 날짜/날짜 시간 값에 지정하는 서식과 같게 하여 처리 경로끼리 결과가 같도록 함
+DATE_FORMAT = "yyyy-mm-dd"
+DATETIME_FORMAT = "yyyy-mm-dd h:mm:ss"
+
+_TRUE = {"true", "1", "yes", "y", "on"}
+_FALSE = {"false", "0", "no", "n", "off"}
+_EPOCH = datetime(1899, 12, 30)
+_EPOCH_1904 = datetime(1904, 1, 1)
+
+# (시작, 끝, 새 셀 XML)
+CellEdit = Tuple[int, int, str]
+
+
+class CellValue(NamedTuple):
+    """셀에 기록할 값. cell_type 은 <c t="..."> (숫자는 None), value 는 <v>, formula 는 <f> 내용."""
+    cell_type: Optional[str]
+    value: Optional[str]
+    formula: Optional[str] = None
+
+
+def is_typed(input_value: InputValue) -> bool:
+    """string 이외의 형식(number, date, bool, formula). 셀 전체가 placeholder 일 때만 셀 형식으로 기록됨"""
+    return input_value.type != "string"
+
+
+def _format_number(number: float) -> str:
+    if number.is_integer() and abs(number) < 1e15:
+        return str(int(number))
+    return repr(number)
+
+
+def has_time(value: str) -> bool:
+    """날짜 입력값에 시각이 포함되어 있는지 (YYYY-MM-DD 만 있으면 날짜)"""
+    return len(value.strip()) != 10
+
+
+def _parse_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.strip().replace(" ", "T", 1))
+    return parsed.replace(tzinfo=None)
+
+
+def _date_serial(moment: datetime, date1904: bool) -> float:
+    serial = (moment - (_EPOCH_1904 if date1904 else _EPOCH)).total_seconds() / 86400
+    # 1900 날짜 체계는 없는 날짜인 1900-02-29 를 포함하므로 그 이전 날짜는 하루 당김
+    if not date1904 and serial < 61:
+        serial -= 1
+    if serial < (0 if date1904 else 1):
+        raise ValueError("Excel 이 표현할 수 없는 날짜입니다.")
+    return round(serial, 10)
+
+
+def parse_cell_value(value: str, value_type: str, date1904: bool = False) -> CellValue:
+    """value 를 value_type 형식의 셀 값으로 변환합니다. 변환할 수 없으면 ValueError."""
+    if value_type == "number":
+        text = value.strip()
+        if not _NUMBER.fullmatch(text) or not math.isfinite(float(text)):
+            raise ValueError("숫자가 아닙니다.")
+        return CellValue(None, _format_number(float(text)))
+    if value_type == "bool":
+        text = value.strip().lower()
+        if text not in _TRUE and text not in _FALSE:
+            raise ValueError("true/false 가 아닙니다.")
+        return CellValue("b", "1" if text in _TRUE else "0")
+    if value_type == "date":
+        return CellValue(None, _format_number(_date_serial(_parse_datetime(value), date1904)))
+    if value_type == "formula":
+        formula = value.strip().removeprefix("=")
+        if not formula:
+            raise ValueError("수식이 비어 있습니다.")
+        # 계산 결과(<v>)는 비워 두고 Excel 이 열 때 계산하도록 함
+        return CellValue(None, None, formula)
+    return CellValue("str", value)
+
+
+def python_value(input_value: InputValue) -> Any:
+    """openpyxl 셀에 넣을 값"""
+    value_type = input_value.type
+    if value_type == "number":
+        number = float(input_value.value)
+        return int(number) if number.is_integer() and abs(number) < 1e15 else number
+    if value_type == "bool":
+        return input_value.value.strip().lower() in _TRUE
+    if value_type == "date":
+        moment = _parse_datetime(input_value.value)
+        return moment if has_time(input_value.value) else moment.date()
+    if value_type == "formula":
+        return "=" + input_value.value.strip().removeprefix("=")
+    return input_value.value
+
+
+def validate_input_values(input_values: Iterable[InputValue]):
+    """형식을 지정한 입력값을 미리 변환해 보고 변환할 수 없으면 ValueError 를 발생시킵니다."""
+    for input_value in input_values:
+        if not is_typed(input_value):
+            continue
+        try:
+            parse_cell_value(input_value.value, input_value.type)
+        except ValueError as e:
+            raise ValueError(
+                f"{input_value.sheet}!{input_value.cell} 의 값을 {input_value.type} 형식으로 바꿀 수 없습니다: "
+                f"{input_value.value!r} ({e})"
+            )
+
+
+def matches_whole_cell(text: Optional[str], pattern: str) -> bool:
+    """셀의 텍스트 전체(앞뒤 공백 제외)가 pattern 하나인지"""
+    return text is not None and text.strip().lower() == pattern.lower()
+
+
+def _attribute_map(attributes: str) -> Dict[str, str]:
+    return {match.group(1): match.group(2) if match.group(2) is not None else match.group(3)
+            for match in _ATTRIBUTE.finditer(attributes)}
+
+
+def cell_style(attributes: str) -> int:
+    """<c> 속성의 서식 번호 (s, 없으면 0)"""
+    match = _CELL_STYLE.search(attributes)
+    if match is None:
+        return 0
+    value = match.group(1) if match.group(1) is not None else match.group(2)
+    return int(value) if value.strip().isdigit() else 0
+
+
+class DateStyles:
+    """styles.xml 에 날짜 서식을 가진 셀 서식(xf)을 더합니다.
+
+    날짜 값은 일련번호로 기록되므로 셀 서식이 날짜가 아니면 Excel 에서 숫자로 보입니다. style_for 는 셀의
+    원래 서식이 이미 날짜 서식이면 그대로, 아니면 원래 서식(글꼴, 테두리 등)에 날짜 서식만 바꾼 xf 를
+    cellXfs 끝에 더하고 그 번호를 반환합니다. 더한 내용은 render() 로 styles.xml 에 반영합니다.
+    """
+
+    def __init__(self, styles_xml: str):
+        self.styles_xml = styles_xml
+        self._cell_xfs = _CELL_XFS.search(styles_xml)
+        self._xfs: List[Tuple[str, str]] = []
+        if self._cell_xfs is not None:
+            self._xfs = [(match.group(1), match.group(2)) for match in _XF.finditer(self._cell_xfs.group(3))]
+        self._formats: Dict[int, str] = {}
+        num_fmts = _NUM_FMTS.search(styles_xml)
+        if num_fmts is not None and num_fmts.group(3):
+            for match in _NUM_FMT.finditer(num_fmts.group(3)):
+                attributes = _attribute_map(match.group(1))
+                if attributes.get("numFmtId", "").isdigit():
+                    self._formats[int(attributes["numFmtId"])] = attributes.get("formatCode", "")
+        self._added_formats: Dict[str, int] = {}
+        self._added_xfs: List[str] = []
+        self._styles: Dict[Tuple[int, int], int] = {}
+
+    @property
+    def changed(self) -> bool:
+        return bool(self._added_xfs)
+
+    def _is_date_format(self, format_id: int) -> bool:
+        if format_id in _BUILTIN_DATE_FORMATS:
+            return True
+        code = self._formats.get(format_id)
+        return code is not None and _DATE_CODE.search(_FORMAT_LITERALS.sub("", code)) is not None
+
+    def _format_id(self, code: str) -> int:
+        for format_id, existing in self._formats.items():
+            if existing == code:
+                return format_id
+        format_id = self._added_formats.get(code)
+        if format_id is None:
+            # 사용자 정의 서식 번호는 164 부터
+            format_id = max([163, *self._formats, *self._added_formats.values()]) + 1
+            self._added_formats[code] = format_id
+        return format_id
+
+    def style_for(self, style: int, with_time: bool) -> int:
+        """style 번호의 셀에 날짜(with_time 이면 날짜 시간) 값을 넣을 때 쓸 서식 번호"""
+        if self._cell_xfs is None or not 0 <= style < len(self._xfs):
+            return style
+        prefix, attributes = self._xfs[style]
+        format_id = _attribute_map(attributes).get("numFmtId", "0")
+        if format_id.isdigit() and self._is_date_format(int(format_id)):
+            return style
+
+        new_format = self._format_id(DATETIME_FORMAT if with_time else DATE_FORMAT)
+        key = (style, new_format)
+        if key not in self._styles:
+            attributes = _APPLY_NUMBER_FORMAT.sub("", _NUM_FMT_ID.sub("", attributes)).rstrip()
+            self._added_xfs.append(f'<{prefix}xf numFmtId="{new_format}"{attributes} applyNumberFormat="1"/>')
+            self._styles[key] = len(self._xfs) + len(self._added_xfs) - 1
+        return self._styles[key]
+
+    def render(self) -> str:
+        """더한 서식을 반영한 styles.xml"""
+        if not self._added_xfs:
+            return self.styles_xml
+        xml = self.styles_xml
+        cell_xfs = self._cell_xfs
+        prefix, attributes, inner = cell_xfs.groups()
+        attributes = _COUNT.sub("", attributes) + f' count="{len(self._xfs) + len(self._added_xfs)}"'
+        xml = f"{xml[:cell_xfs.start()]}<{prefix}cellXfs{attributes}>{inner}{''.join(self._added_xfs)}</{prefix}cellXfs>{xml[cell_xfs.end():]}"
+        if self._added_formats:
+            added = "".join(
+                f'<{prefix}numFmt numFmtId="{format_id}" formatCode="{escape_xml_attribute(code)}"/>'
+                for code, format_id in self._added_formats.items()
+            )
+            num_fmts = _NUM_FMTS.search(xml)
+            if num_fmts is not None:
+                num_prefix, num_attributes, num_inner = num_fmts.groups()
+                count = len(self._formats) + len(self._added_formats)
+                num_attributes = _COUNT.sub("", num_attributes) + f' count="{count}"'
+                xml = f"{xml[:num_fmts.start()]}<{num_prefix}numFmts{num_attributes}>{num_inner or ''}{added}</{num_prefix}numFmts>{xml[num_fmts.end():]}"
+            else:
+                # numFmts 는 styleSheet 의 첫 자식 요소
+                sheet = _STYLE_SHEET.search(xml)
+                xml = (f'{xml[:sheet.end()]}<{prefix}numFmts count="{len(self._added_formats)}">{added}</{prefix}numFmts>'
+                       f'{xml[sheet.end():]}')
+        return xml
+
+
+def render_cell(name: str, attributes: str, value: CellValue, style: Optional[int] = None) -> str:
+    """원래 <c> 의 이름과 속성(r, s 등)을 유지하고 형식과 내용만 바꾼 셀 XML. style 이 있으면 s 를 바꿈"""
+    prefix = name[:-1]
+    attributes = _CELL_TYPE.sub("", attributes)
+    if style is not None:
+        attributes = _CELL_STYLE.sub("", attributes) + (f' s="{style}"' if style else "")
+    if value.cell_type is not None:
+        attributes += f' t="{value.cell_type}"'
+    chunks = [f"<{name}{attributes}>"]
+    if value.formula is not None:
+        chunks.append(f"<{prefix}f>{escape_xml_text(value.formula)}</{prefix}f>")
+    if value.value is not None:
+        chunks.append(f"<{prefix}v>{escape_xml_text(value.value)}</{prefix}v>")
+    chunks.append(f"</{name}>")
+    return "".join(chunks)
+
+
+def _date_style(attributes: str, input_value: InputValue, date_styles: Optional[DateStyles]) -> Optional[int]:
+    if input_value.type != "date" or date_styles is None:
+        return None
+    return date_styles.style_for(cell_style(attributes), has_time(input_value.value))
+
+
+def retype_cell(cell_xml: str, input_value: InputValue, date1904: bool = False, date_styles: Optional[DateStyles] = None) -> str:
+    """<c> 요소 하나(cell_xml)를 input_value 의 형식과 내용으로 바꿉니다. 날짜는 date_styles 로 날짜 서식을 지정"""
+    match = _CELL.match(cell_xml)
+    if match is None:
+        raise ValueError(f"셀 요소가 아닙니다: {cell_xml[:40]}")
+    value = parse_cell_value(input_value.value, input_value.type, date1904)
+    return render_cell(match.group(1), match.group(2), value, _date_style(match.group(2), input_value, date_styles))
+
+
+def _cell_type(attributes: str) -> Optional[str]:
+    match = _CELL_TYPE.search(attributes)
+    return None if match is None else match.group(1) if match.group(1) is not None else match.group(2)
+
+
+def cell_text(attributes: str, inner: Optional[str], shared_text: Callable[[int], Optional[str]]) -> Optional[str]:
+    """문자열 셀(공유 문자열, 인라인 문자열)의 텍스트. 그 밖의 셀은 None."""
+    if inner is None:
+        return None
+    cell_type = _cell_type(attributes)
+    if cell_type == "s":
+        value = _CELL_VALUE.search(inner)
+        return shared_text(int(value.group(1))) if value is not None else None
+    if cell_type == "inlineStr":
+        item = _INLINE_STRING.search(inner)
+        return item_text(item.group(2) or "") if item is not None else None
+    return None
+
+
+def _string_item(attributes: str, inner: Optional[str], shared_item: Callable[[int], Optional[str]]) -> Optional[str]:
+    """문자열 셀의 <si>/<is> 내용. 그 밖의 셀은 None."""
+    if inner is None:
+        return None
+    cell_type = _cell_type(attributes)
+    if cell_type == "s":
+        value = _CELL_VALUE.search(inner)
+        return shared_item(int(value.group(1))) if value is not None else None
+    if cell_type == "inlineStr":
+        item = _INLINE_STRING.search(inner)
+        return (item.group(2) or "") if item is not None else None
+    return None
+
+
+def inline_string_cell(cell_xml: str, item: str) -> str:
+    """<c> 요소 하나(cell_xml)를 <is> 내용이 item 인 인라인 문자열 셀로 바꿉니다 (r, s 등은 유지)."""
+    match = _CELL.match(cell_xml)
+    if match is None:
+        raise ValueError(f"셀 요소가 아닙니다: {cell_xml[:40]}")
+    name, attributes = match.group(1), _CELL_TYPE.sub("", match.group(2))
+    prefix = name[:-1]
+    return f'<{name}{attributes} t="inlineStr"><{prefix}is>{item}</{prefix}is></{name}>'
+
+
+def cell_edits(
+    content: str,
+    cell_values: Dict[str, List[InputValue]],
+    input_values: List[InputValue],
+    shared_item: Callable[[int], Optional[str]],
+    date1904: bool = False,
+    date_styles: Optional[DateStyles] = None,
+) -> List[CellEdit]:
+    """시트 XML 에서 cell_values({셀 주소: 그 셀을 가리키는 입력값}) 의 셀만 바꾸는 편집 목록.
+
+    - 셀 전체가 형식을 지정한 입력값의 placeholder 이면 그 형식의 셀로 (date_styles 가 있으면 날짜 서식 지정)
+    - 그 밖의 셀은 셀 자신의 값을 먼저, 나머지 placeholder 는 요청(input_values)에서 처음 주어진 값으로
+      텍스트만 치환. 공유 문자열은 다른 셀도 가리킬 수 있으므로 치환한 내용을 인라인 문자열로 기록
+    """
+    edits = []
+    for match in _CELL.finditer(content):
+        attributes = match.group(2)
+        ref = _CELL_REF.search(attributes)
+        if ref is None:
+            continue
+        values = cell_values.get(ref.group(1).replace("$", "").upper())
+        if not values:
+            continue
+
+        item = _string_item(attributes, match.group(3), shared_item)
+        typed = next((input_value for input_value in values if is_typed(input_value)), None)
+        if typed is not None and item is not None and matches_whole_cell(item_text(item), typed.pattern):
+            value = parse_cell_value(typed.value, typed.type, date1904)
+            style = _date_style(attributes, typed, date_styles)
+            edits.append((match.start(), match.end(), render_cell(match.group(1), attributes, value, style)))
+            continue
+
+        substituter = PlaceholderSubstituter.from_input_values(itertools.chain(values, input_values))
+        if item is not None:
+            # 여러 run 에 나뉜 패턴도 찾으며 값은 시작 run 의 서식으로 들어감
+            new_item = rewrite_string_item(item, lambda text, starts: substituter.edits(text))
+            if new_item is not None:
+                edits.append((match.start(), match.end(), inline_string_cell(match.group(), new_item)))
+        elif match.group(3):
+            # 수식 등은 텍스트 노드에서만 치환
+            new_cell = substituter.sub_xml_text(match.group())
+            if new_cell != match.group():
+                edits.append((match.start(), match.end(), new_cell))
+    return edits
+
+
+def apply_cell_edits(content: str, edits: List[CellEdit]) -> str:
+    """content 에 (시작, 끝, 새 셀 XML) 편집을 적용합니다. edits 는 시작 위치 순서."""
+    if not edits:
+        return content
+    chunks = []
+    position = 0
+    for start, end, cell_xml in edits:
+        chunks.append(content[position:start])
+        chunks.append(cell_xml)
+        position = end
+    chunks.append(content[position:])
+    return "".join(chunks)
+
+
+def shared_string_items(content: str) -> Callable[[int], Optional[str]]:
+    """sharedStrings.xml 내용에서 순번으로 <si> 내용을 찾는 함수. 필요한 순번까지만 읽습니다."""
+    inners: List[str] = []
+    items = iter_string_items(content)
+
+    def lookup(index: int) -> Optional[str]:
+        while len(inners) <= index:
+            inner = next(items, None)
+            if inner is None:
+                return None
+            inners.append(inner)
+        return inners[index]
+
+    return lookup
+
+
+def shared_string_texts(content: str) -> Callable[[int], Optional[str]]:
+    """sharedStrings.xml 내용에서 순번으로 텍스트를 찾는 함수. 필요한 순번까지만 읽습니다."""
+    lookup = shared_string_items(content)
+
+    def text(index: int) -> Optional[str]:
+        inner = lookup(index)
+        return item_text(inner) if inner is not None else None
+
+    return text
+
+
+def is_date1904(workbook_xml: str) -> bool:
+    return _DATE_1904.search(workbook_xml) is not None
+
+
+def set_full_calc_on_load(workbook_xml: str) -> str:
+    """workbook.xml 의 <calcPr> 에 fullCalcOnLoad="1" 을 설정하여 Excel 이 열 때 모든 수식을 다시 계산하게 합니다."""
+    match = _CALC_PR.search(workbook_xml)
+    if match is not None:
+        prefix, attributes, empty = match.groups()
+        attributes = _FULL_CALC.sub("", attributes).rstrip() + ' fullCalcOnLoad="1"'
+        return f"{workbook_xml[:match.start()]}<{prefix}calcPr{attributes}{empty}>{workbook_xml[match.end():]}"
+
+    anchor = _AFTER_CALC_PR.search(workbook_xml)
+    if anchor is None:
+        return workbook_xml
+    prefix = re.match(r'</?(' + _PREFIX + r')', anchor.group()).group(1)
+    return f'{workbook_xml[:anchor.start()]}<{prefix}calcPr fullCalcOnLoad="1"/>{workbook_xml[anchor.start():]}'
@@ -1,24 +1,134 @@
-import pandas as pd
-import openpyxl
 import re
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
-from openpyxl.cell.rich_text import TextBlock, CellRichText
 import os
 import uuid
-import shutil
+import io
+import itertools
+import tempfile
 import zipfile
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional
-from app.models.excel_models import ExcelAnalysisResult, InputField, SheetInfo, InputValue
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from app.models.excel_models import ExcelAnalysisResult, InputValue
+from app.services.placeholder import PlaceholderSubstituter
+from app.services.analysis_cache import AnalysisCache
+from app.services.analysis_table import AnalysisTable
+from app.services.batch_fill import BatchFiller
+from app.services.cell_values import (
+    DateStyles,
+    apply_cell_edits,
+    cell_edits,
+    is_date1904,
+    is_typed,
+    matches_whole_cell,
+    python_value,
+    set_full_calc_on_load,
+    shared_string_items,
+    validate_input_values,
+)
+from app.services.hashing import HASH_CHUNK_SIZE, FileHashMemo
+from app.services.incremental_fill import IncrementalFillCache
+from app.services.metrics import analyses, fallbacks, fill_paths, metrics, processed_bytes
+from app.services.sheet_analysis import SheetAnalyzer
+from app.services.sheet_preview import DEFAULT_PREVIEW_RANGE, SheetPreview, ViewportCache, apply_values, parse_bounds
+from app.services.sheet_profile import profile_workbook_stream
+from app.services.storage import LocalStorage, StorageBackend
+from app.services.storage_janitor import StorageJanitor, shard_name
+from app.services.placeholder_index import PlaceholderIndexStore
+from app.services.template_plan import PLACEHOLDER_TOKEN, CompiledTemplate, TemplatePlanCache, TemplatePlanMiss, normalize_cell_ref
+from app.services.upload_spool import spool_upload
+from app.services.xlsx_reader import (
+    INPUT_PATTERN,
+    find_shared_strings_part,
+    find_styles_part,
+    find_workbook_part,
+    iter_shared_strings,
+    resolve_sheet_parts,
+)
+from app.services.xlsx_zip import ChunkSink, ZipStreamWriter, deflate_member, read_raw_member
+
+ANALYZE_ENGINES = ("openpyxl", "stream")
+PROFILE_ENGINES = ("stream", "pandas")
+
+# 분석 결과 형식이나 규칙이 바뀌면 올려서 캐시된 결과를 무효화
+ANALYZER_VERSION = 3
+# 스트리밍 응답의 openpyxl 폴백 결과를 메모리에 두는 최대 크기 (넘으면 임시 파일로)
+STREAM_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+def _iter_file_chunks(fileobj: BinaryIO, chunk_size: int = HASH_CHUNK_SIZE) -> Iterator[bytes]:
+    with fileobj:
+        for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+            yield chunk
+
 
 class ExcelService:
-    def __init__(self, upload_dir: str = "uploads"):
+    def __init__(
+        self,
+        upload_dir: str = "uploads",
+        plan_cache_bytes: int = 256 * 1024 * 1024,
+        compression_level: int = 6,
+        batch_workers: Optional[int] = None,
+        batch_parallel_threshold: int = 32,
+        analysis_cache_entries: int = 256,
+        storage_ttls: Optional[Dict[str, int]] = None,
+        storage_quota_bytes: int = 0,
+        storage_sweep_interval: int = 300,
+        storage_temp_grace: int = 900,
+        storage: Optional[StorageBackend] = None,
+        preview_cache_entries: int = 64,
+        preview_max_cells: int = 20000,
+        incremental_fill_bytes: int = 64 * 1024 * 1024,
+        analysis_workers: Optional[int] = None,
+        analysis_parallel_bytes: int = 16 * 1024 * 1024
+    ):
         self.upload_dir = upload_dir
+        # 원본/결과 파일의 저장소. 로컬 이외의 저장소에서는 upload_dir 가 로컬 사본 캐시가 됨
+        self.storage = storage or LocalStorage(upload_dir)
+        self.compression_level = compression_level
+        self.file_hashes = FileHashMemo()
+        self.storage_janitor = StorageJanitor(
+            upload_dir,
+            ttls=storage_ttls,
+            quota_bytes=storage_quota_bytes,
+            interval=storage_sweep_interval,
+            temp_grace=storage_temp_grace,
+            on_evict=self._on_storage_evict
+        )
+        # 템플릿의 placeholder 위치를 업로드 옆 sidecar 로 저장하여 재시작/다른 프로세스에서도 재사용
+        self.placeholder_index = PlaceholderIndexStore(upload_dir, on_load=self.storage_janitor.touch)
+        self.plan_cache = TemplatePlanCache(
+            max_bytes=plan_cache_bytes,
+            hashes=self.file_hashes,
+            index_store=self.placeholder_index
+        )
+        self.analysis_cache = AnalysisCache(os.path.join(upload_dir, ".analysis_cache"), analysis_cache_entries)
+        self.batch_filler = BatchFiller(self.plan_cache, batch_workers, batch_parallel_threshold)
+        self.sheet_analyzer = SheetAnalyzer(analysis_workers, analysis_parallel_bytes)
+        self.viewport_cache = ViewportCache(preview_cache_entries, self.file_hashes)
+        self.preview_max_cells = preview_max_cells
+        # 같은 템플릿을 값 몇 개만 바꿔 다시 채울 때 바뀌지 않은 압축 블록을 재사용
+        self.fill_states = IncrementalFillCache(incremental_fill_bytes)
         os.makedirs(upload_dir, exist_ok=True)
     
-    def _replace_pattern_preserving_format(self, cell, pattern: str, replacement: str):
+    def _on_storage_evict(self, path: str, prefix: str):
+        # 만료된 업로드의 분석 결과와 placeholder 색인도 함께 지움 (file_id 가 곧 내용 해시)
+        if prefix == "upload_":
+            file_id = os.path.splitext(os.path.basename(path))[0][len(prefix):]
+            self.analysis_cache.invalidate(file_id)
+            self.placeholder_index.delete(file_id)
+    
+    def _template_plan(self, file_path: str) -> Optional[CompiledTemplate]:
+        """템플릿의 컴파일 결과 (메모리 캐시, 저장된 색인, 새 컴파일 순). xlsx 로 읽을 수 없으면 None."""
+        try:
+            with metrics.span("plan"):
+                return self.plan_cache.get(file_path)
+        except Exception as e:
+            print(f"Template plan unavailable: {e}")
+            return None
+    
+    def _replace_pattern_preserving_format(self, cell, substituter: PlaceholderSubstituter):
         """서식을 보존하면서 패턴을 교체하는 헬퍼 메소드"""
+        from openpyxl.cell.rich_text import TextBlock, CellRichText
+        
         try:
             original_value = cell.value
             
@@ -29,257 +139,623 @@ class ExcelService:
                 
                 for part in original_value:
                     if hasattr(part, 'text') and hasattr(part, 'font'):
-                        # TextBlock인 경우
-                        new_text = re.sub(
-                            re.escape(pattern), 
-                            replacement, 
-                            part.text, 
-                            flags=re.IGNORECASE
-                        )
-                        # 원래 폰트 서식을 유지하면서 새 텍스트 블록 생성
-                        from openpyxl.cell.rich_text import TextBlock
-                        new_rich_text.append(TextBlock(new_text, part.font))
+                        # TextBlock인 경우 원래 폰트 서식을 유지하면서 새 텍스트 블록 생성
+                        new_rich_text.append(TextBlock(part.font, substituter.sub(part.text)))
                     else:
                         # 문자열인 경우
-                        text_str = str(part)
-                        new_text = re.sub(
-                            re.escape(pattern), 
-                            replacement, 
-                            text_str, 
-                            flags=re.IGNORECASE
-                        )
-                        new_rich_text.append(new_text)
+                        new_rich_text.append(substituter.sub(str(part)))
                 
                 cell.value = new_rich_text
                 
             else:
                 # 일반 텍스트 처리
-                original_value_str = str(original_value)
-                new_value = re.sub(
-                    re.escape(pattern), 
-                    replacement, 
-                    original_value_str, 
-                    flags=re.IGNORECASE
-                )
-                cell.value = new_value
+                cell.value = substituter.sub(str(original_value))
                 
         except Exception as e:
             # 실패시 기본 방식으로 폴백
             print(f"Pattern replacement failed for cell, using fallback: {e}")
             original_value_str = str(cell.value) if cell.value else ""
-            new_value = re.sub(
-                re.escape(pattern), 
-                replacement, 
-                original_value_str, 
-                flags=re.IGNORECASE
-            )
-            cell.value = new_value
+            cell.value = substituter.sub(original_value_str)
     
-    def _process_excel_via_xml(self, original_file_path: str, output_path: str, input_values: List[InputValue], processed_file_id: str) -> str:
-        """XML 기반으로 Excel 파일 처리하여 서식 완전 보존"""
-        # 원본 파일을 복사
-        shutil.copy2(original_file_path, output_path)
-        
-        # Excel 파일은 실제로는 ZIP 아카이브
-        temp_dir = os.path.join(self.upload_dir, f"temp_{processed_file_id}")
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        try:
-            # ZIP으로 압축 해제
-            with zipfile.ZipFile(output_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
+    def _rewrite_xlsx_via_xml(self, original_file_path: str, input_values: List[InputValue], fileobj: BinaryIO):
+        """원본 zip 을 풀지 않고 멤버 단위로 읽어 fileobj 에 바로 기록"""
+        for chunk in self._iter_xlsx_via_xml(original_file_path, input_values):
+            fileobj.write(chunk)
+    
+    def _iter_xlsx_via_xml(self, original_file_path: str, input_values: List[InputValue]) -> Iterator[bytes]:
+        """원본 zip 을 풀지 않고 멤버 단위로 읽어 만들어지는 대로 바이트 조각으로 반환
+
+        변경되지 않은 멤버는 압축된 바이트 그대로 복사하고, 패턴이 교체된 part 만 다시 압축합니다.
+        """
+        with zipfile.ZipFile(original_file_path, 'r') as source:
+            # InputValue.sheet 를 workbook.xml 과 관계 정보로 worksheet part 에 연결
+            sheet_parts = {sheet.name: sheet.path for sheet in resolve_sheet_parts(source)}
+            cell_values: Dict[str, Dict[str, List[InputValue]]] = {}
+            for input_value in input_values:
+                if input_value.sheet not in sheet_parts:
+                    raise ValueError(f"시트를 찾을 수 없습니다: {input_value.sheet}")
+                cell_values.setdefault(sheet_parts[input_value.sheet], {}).setdefault(
+                    normalize_cell_ref(input_value.cell), []
+                ).append(input_value)
             
-            # worksheet XML 파일에서 텍스트 교체
-            worksheet_path = os.path.join(temp_dir, 'xl', 'worksheets', 'sheet1.xml')
-            if os.path.exists(worksheet_path):
-                with open(worksheet_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # 패턴별로 교체
-                for input_value in input_values:
-                    pattern = input_value.pattern
-                    replacement = input_value.value
-                    # XML 내에서 텍스트 교체 (대소문자 구분 없이)
-                    content = re.sub(
-                        re.escape(pattern), 
-                        replacement, 
-                        content, 
-                        flags=re.IGNORECASE
-                    )
-                
-                with open(worksheet_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+            # 공유 문자열은 여러 셀이 함께 쓰므로 제자리에서 바꾸지 않고, 바뀌는 셀만 인라인 문자열로 기록.
+            # 문자열 셀을 처음 만날 때 sharedStrings.xml 을 읽음
+            shared_strings_part = find_shared_strings_part(source)
+            shared_items: List[Callable[[int], Optional[str]]] = []
             
-            # sharedStrings.xml도 처리 (공유 문자열 테이블)
-            shared_strings_path = os.path.join(temp_dir, 'xl', 'sharedStrings.xml')
-            if os.path.exists(shared_strings_path):
-                with open(shared_strings_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                for input_value in input_values:
-                    pattern = input_value.pattern
-                    replacement = input_value.value
-                    content = re.sub(
-                        re.escape(pattern), 
-                        replacement, 
-                        content, 
-                        flags=re.IGNORECASE
-                    )
-                
-                with open(shared_strings_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+            def shared_item(index: int) -> Optional[str]:
+                if not shared_items:
+                    shared_items.append(shared_string_items(
+                        source.read(shared_strings_part).decode('utf-8') if shared_strings_part is not None else ""
+                    ))
+                return shared_items[0](index)
             
-            # 다시 ZIP으로 압축
-            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
-                for root, dirs, files in os.walk(temp_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arc_name = os.path.relpath(file_path, temp_dir)
-                        zip_ref.write(file_path, arc_name)
+            # 형식을 지정한 입력값이 있으면 열 때 다시 계산하도록 표시
+            workbook_part = find_workbook_part(source)
+            typed = any(is_typed(input_value) for input_value in input_values)
+            date1904 = is_date1904(source.read(workbook_part).decode('utf-8')) if typed else False
             
-            return processed_file_id
+            timer = metrics.timer()
+            # 날짜 값이 있으면 zip 안에서 styles part 가 시트보다 앞에 올 수 있으므로 해당 시트를 먼저
+            # 바꾸어 날짜 셀이 쓸 서식을 정한 뒤 styles part 에 반영
+            prepared: Dict[str, str] = {}
+            styles_part = find_styles_part(source)
+            date_parts = {sheet_parts[value.sheet] for value in input_values if is_typed(value) and value.type == "date"}
+            if date_parts and styles_part is not None:
+                date_styles = DateStyles(source.read(styles_part).decode('utf-8'))
+                with timer("substitute"):
+                    for part in date_parts:
+                        prepared[part] = self._rewrite_member_xml(
+                            part, source.read(part).decode('utf-8'), workbook_part, cell_values, input_values,
+                            shared_item, date1904, date_styles,
+                        )
+                if date_styles.changed:
+                    prepared[styles_part] = date_styles.render()
             
-        finally:
-            # 임시 디렉토리 정리
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            sink = ChunkSink()
+            writer = ZipStreamWriter(sink)
+            
+            for info in source.infolist():
+                # 요청된 셀이 있는 worksheet 의 그 셀만 교체
+                member = None
+                new_content = prepared.get(info.filename)
+                if new_content is None and (info.filename in cell_values or (typed and info.filename == workbook_part)):
+                    with timer("inflate"):
+                        content = source.read(info).decode('utf-8')
+                    with timer("substitute"):
+                        new_content = self._rewrite_member_xml(
+                            info.filename, content, workbook_part, cell_values, input_values, shared_item, date1904
+                        )
+                    if new_content == content:
+                        new_content = None
+                
+                if new_content is not None:
+                    with timer("deflate"):
+                        member = deflate_member(
+                            info.filename,
+                            new_content.encode('utf-8'),
+                            self.compression_level,
+                            info.date_time,
+                            info.external_attr
+                        )
+                
+                writer.write_member(member or read_raw_member(source, info))
+                yield from sink.drain()
+            
+            writer.close()
+            yield from sink.drain()
+            timer.flush()
+    
+    @staticmethod
+    def _rewrite_member_xml(
+        name: str,
+        content: str,
+        workbook_part: str,
+        cell_values: Dict[str, Dict[str, List[InputValue]]],
+        input_values: List[InputValue],
+        shared_item: Callable[[int], Optional[str]],
+        date1904: bool,
+        date_styles: Optional[DateStyles] = None,
+    ) -> str:
+        """_iter_xlsx_via_xml 에서 교체 대상 part 하나의 새 XML 내용"""
+        if name == workbook_part:
+            return set_full_calc_on_load(content)
+        # 셀 자신의 값이 우선이고 그 셀의 나머지 패턴은 요청 전체의 값으로 (plan, openpyxl 경로와 같은 규칙)
+        return apply_cell_edits(
+            content, cell_edits(content, cell_values[name], input_values, shared_item, date1904, date_styles)
+        )
+    
+    def _process_excel_via_xml(self, original_file_path: str, output_path: str, input_values: List[InputValue], processed_file_id: str) -> str:
+        """XML 기반으로 Excel 파일 처리하여 서식 완전 보존"""
+        with open(output_path, 'wb') as f:
+            self._rewrite_xlsx_via_xml(original_file_path, input_values, f)
+        
+        return processed_file_id
+    
+    def _iter_plan_fill(self, plan: CompiledTemplate, input_values: List[InputValue], session_id: Optional[str] = None) -> Iterator[bytes]:
+        """컴파일된 템플릿으로 채운 xlsx 조각. 점진 채우기가 켜져 있으면 같은 세션의 이전 결과를 재사용"""
+        if self.fill_states.enabled:
+            return self.fill_states.iter_fill(plan, input_values, self.compression_level, session_id)
+        return plan.iter_fill(input_values, self.compression_level)
+    
+    def _process_excel_via_plan(self, plan: CompiledTemplate, output_path: str, input_values: List[InputValue], processed_file_id: str, session_id: Optional[str] = None) -> str:
+        """캐시된 템플릿 컴파일 결과로 placeholder 위치만 이어 붙여 파일 생성"""
+        with open(output_path, "wb") as f:
+            for chunk in self._iter_plan_fill(plan, input_values, session_id):
+                f.write(chunk)
+        
+        return processed_file_id
     
     def _process_excel_via_openpyxl(self, original_file_path: str, input_values: List[InputValue]) -> str:
         """openpyxl을 사용한 기본 처리 방식"""
         processed_file_id = str(uuid.uuid4())
-        output_path = os.path.join(self.upload_dir, f"processed_{processed_file_id}.xlsx")
+        output_path = self._new_file_path(processed_file_id, "processed_")
         
-        # 원본 파일을 먼저 복사
-        shutil.copy2(original_file_path, output_path)
+        with open(output_path, "wb") as f:
+            self._write_excel_via_openpyxl(original_file_path, input_values, f)
         
-        # 복사된 파일을 열어서 값만 수정
-        workbook = openpyxl.load_workbook(output_path, data_only=False)
+        return processed_file_id
+    
+    def _write_excel_via_openpyxl(self, original_file_path: str, input_values: List[InputValue], fileobj: BinaryIO):
+        # openpyxl 은 가져오는 데만 100ms 이상 걸리므로 폴백 경로에서만 불러옴
+        import openpyxl
+        from openpyxl.workbook.properties import CalcProperties
+        
+        # 원본 파일을 열어서 값만 수정한 뒤 fileobj 에 저장
+        workbook = openpyxl.load_workbook(original_file_path, data_only=False)
         
+        # 같은 셀을 가리키는 입력값을 모아 셀마다 한 번의 스캔으로 치환. 셀 자신의 값이 우선이고 셀의
+        # 다른 placeholder 는 요청 전체의 값으로 치환 (컴파일된 템플릿 경로와 같은 규칙)
+        cell_values: Dict[Tuple[str, str], List[InputValue]] = {}
         for input_value in input_values:
-            sheet = workbook[input_value.sheet]
+            cell_values.setdefault((input_value.sheet, input_value.cell), []).append(input_value)
+        
+        for (sheet_name, cell_ref), values in cell_values.items():
+            sheet = workbook[sheet_name]
             
-            cell_match = re.match(r'([A-Z]+)(\d+)', input_value.cell)
+            cell_match = re.match(r'([A-Z]+)(\d+)', cell_ref)
             if cell_match:
                 col_letter, row_num = cell_match.groups()
                 row = int(row_num)
                 col = openpyxl.utils.column_index_from_string(col_letter)
                 
                 cell = sheet.cell(row=row, column=col)
+                typed = next((input_value for input_value in values if is_typed(input_value)), None)
                 
-                if cell.value is not None:
-                    self._replace_pattern_preserving_format(cell, input_value.pattern, input_value.value)
+                if typed is not None and matches_whole_cell(str(cell.value) if cell.value is not None else None, typed.pattern):
+                    cell.value = python_value(typed)
+                    # calcPr 가 없는 통합 문서는 calculation 이 None
+                    if workbook.calculation is None:
+                        workbook.calculation = CalcProperties(fullCalcOnLoad=True)
+                    else:
+                        workbook.calculation.fullCalcOnLoad = True
+                elif cell.value is not None:
+                    self._replace_pattern_preserving_format(
+                        cell, PlaceholderSubstituter.from_input_values(itertools.chain(values, input_values))
+                    )
                 else:
-                    cell.value = input_value.value
+                    cell.value = values[0].value
         
-        workbook.save(output_path)
+        workbook.save(fileobj)
         workbook.close()
-        
-        return processed_file_id
     
-    def analyze_excel_file(self, file_path: str) -> ExcelAnalysisResult:
-        result = {
-            "sheets": {},
-            "input_fields": [],
-            "file_info": {}
-        }
+    def _analyze_via_openpyxl(self, file_path: str, table: AnalysisTable):
+        """openpyxl 로 워크북 전체를 로드하여 셀을 검사하는 기본 분석 방식"""
+        import openpyxl
         
-        try:
-            workbook = openpyxl.load_workbook(file_path, data_only=False)
-            
-            result["file_info"]["sheet_names"] = workbook.sheetnames
-            result["file_info"]["total_sheets"] = len(workbook.sheetnames)
+        workbook = openpyxl.load_workbook(file_path, data_only=False)
+        
+        table.file_info["sheet_names"] = workbook.sheetnames
+        table.file_info["total_sheets"] = len(workbook.sheetnames)
+        
+        for sheet_name in workbook.sheetnames:
+            sheet = workbook[sheet_name]
+            sheet_fields = []
             
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                sheet_input_fields = []
-                
-                for row in range(1, sheet.max_row + 1):
-                    for col in range(1, sheet.max_column + 1):
-                        cell = sheet.cell(row=row, column=col)
-                        cell_value = cell.value
+            for row in range(1, sheet.max_row + 1):
+                for col in range(1, sheet.max_column + 1):
+                    cell = sheet.cell(row=row, column=col)
+                    cell_value = cell.value
+                    
+                    if cell_value is not None:
+                        cell_str = str(cell_value)
                         
-                        if cell_value is not None:
-                            cell_str = str(cell_value)
-                            
-                            input_pattern = re.search(r'input\d+', cell_str, re.IGNORECASE)
-                            if input_pattern:
-                                input_field = InputField(
-                                    pattern=input_pattern.group(),
-                                    cell=f"{get_column_letter(col)}{row}",
-                                    row=row,
-                                    column=col,
-                                    column_letter=get_column_letter(col),
-                                    original_value=cell_str,
-                                    sheet=sheet_name
-                                )
-                                sheet_input_fields.append(input_field)
-                                result["input_fields"].append(input_field)
-                
-                sheet_info = SheetInfo(
-                    name=sheet_name,
-                    max_row=sheet.max_row,
-                    max_column=sheet.max_column,
-                    input_fields=sheet_input_fields
-                )
-                result["sheets"][sheet_name] = sheet_info
+                        input_pattern = INPUT_PATTERN.search(cell_str)
+                        if input_pattern:
+                            sheet_fields.append((row, col, input_pattern.group(), cell_str))
             
-            try:
-                df = pd.read_excel(file_path, sheet_name=None)
-                pandas_info = {}
-                for sheet_name, data in df.items():
-                    pandas_info[sheet_name] = {
-                        "shape": data.shape,
-                        "columns": data.columns.tolist(),
-                        "dtypes": {k: str(v) for k, v in data.dtypes.to_dict().items()}
-                    }
-                result["pandas_info"] = pandas_info
-            except Exception as e:
-                result["pandas_error"] = str(e)
+            table.add_sheet(sheet_name, sheet.max_row, sheet.max_column, sheet_fields)
+    
+    def _analyze_via_stream(self, file_path: str, table: AnalysisTable, parallel: Optional[bool] = None):
+        """워크북을 만들지 않고 zip 안의 XML 을 스트리밍으로 읽어 실제 존재하는 셀만 검사
+
+        시트가 많고 큰 워크북은 시트별로 프로세스 풀에서 분석합니다 (parallel 이 None 이면 크기로 결정).
+        """
+        with zipfile.ZipFile(file_path) as zf:
+            sheet_parts = resolve_sheet_parts(zf)
             
-            return ExcelAnalysisResult(**result)
+            # 패턴이 포함된 공유 문자열만 보관하여 메모리 사용량을 일정하게 유지
+            matched_strings = {
+                index: text
+                for index, text in enumerate(iter_shared_strings(zf))
+                if INPUT_PATTERN.search(text)
+            }
+            
+            table.file_info["sheet_names"] = [part.name for part in sheet_parts]
+            table.file_info["total_sheets"] = len(sheet_parts)
+            
+            results = self.sheet_analyzer.analyze(file_path, zf, sheet_parts, matched_strings, parallel)
+            for sheet_part, (max_row, max_column, sheet_fields) in zip(sheet_parts, results):
+                table.add_sheet(sheet_part.name, max_row, max_column, sheet_fields)
+    
+    def profile_excel_file(self, file_path: str, engine: str = "stream") -> Dict[str, Dict]:
+        """시트별 shape/columns/dtypes 요약을 계산합니다.
+
+        기본 "stream" 엔진은 시트 XML 을 한 번 스트리밍하여 pandas.read_excel 과 같은 규칙으로
+        계산하고, "pandas" 엔진은 필요할 때만 pandas 를 불러와 DataFrame 으로 계산합니다.
+        """
+        if engine not in PROFILE_ENGINES:
+            raise ValueError(f"지원하지 않는 프로필 엔진입니다: {engine}")
+        
+        self.storage_janitor.touch(file_path)
+        
+        if engine == "stream":
+            return profile_workbook_stream(file_path)
+        
+        # pandas 는 가져오는 데만 수백 ms 가 걸리므로 요청된 경우에만 불러옴
+        import pandas as pd
+        
+        df = pd.read_excel(file_path, sheet_name=None)
+        pandas_info = {}
+        for sheet_name, data in df.items():
+            pandas_info[sheet_name] = {
+                "shape": data.shape,
+                "columns": data.columns.tolist(),
+                "dtypes": {k: str(v) for k, v in data.dtypes.to_dict().items()}
+            }
+        return pandas_info
+    
+    def analyze_excel_file(
+        self,
+        file_path: str,
+        engine: str = "openpyxl",
+        use_cache: bool = True,
+        profile: bool = False,
+        profile_engine: str = "stream"
+    ) -> ExcelAnalysisResult:
+        """Excel 파일에서 input 패턴을 분석합니다.
+
+        engine 이 "stream" 이면 openpyxl 워크북을 만들지 않는 스트리밍 분석기를 사용합니다.
+        결과는 파일 내용 해시와 분석기 버전을 키로 캐시되어 같은 파일은 다시 분석하지 않습니다.
+        profile 이 True 일 때만 pandas_info 를 채웁니다.
+        """
+        analysis_result = self.analyze_excel_table(file_path, engine, use_cache).to_result()
+        
+        if profile:
+            for name, value in self._profile_fields(file_path, profile_engine).items():
+                setattr(analysis_result, name, value)
+        
+        return analysis_result
+    
+    def preview_excel(
+        self,
+        file_path: str,
+        sheet: Optional[str] = None,
+        cell_range: Optional[str] = None,
+        values: Union[Dict[str, str], List[InputValue], None] = None
+    ) -> SheetPreview:
+        """템플릿 시트의 한 영역에 입력값을 가상으로 적용한 미리보기를 만듭니다 (파일을 쓰지 않음).
+
+        영역의 원래 셀 텍스트는 캐시되므로 같은 영역을 입력값만 바꿔 다시 요청하면 템플릿을 읽지 않습니다.
+        범위를 지정하지 않으면 DEFAULT_PREVIEW_RANGE 안에서 내용이 있는 부분만 보여 줍니다.
+        """
+        bounds = parse_bounds(cell_range or DEFAULT_PREVIEW_RANGE)
+        cells = (bounds[2] - bounds[0] + 1) * (bounds[3] - bounds[1] + 1)
+        if self.preview_max_cells and cells > self.preview_max_cells:
+            raise ValueError(f"미리보기 범위가 너무 큽니다: {cells}개 셀 (최대 {self.preview_max_cells}개)")
+        if isinstance(values, list):
+            validate_input_values(values)
+        
+        self.storage_janitor.touch(file_path)
+        with metrics.span("preview"):
+            viewport = self.viewport_cache.get(file_path, sheet, bounds, trim=cell_range is None)
+            return apply_values(viewport, values or [])
+    
+    def analyze_excel_compact(
+        self,
+        file_path: str,
+        engine: str = "openpyxl",
+        use_cache: bool = True,
+        profile: bool = False,
+        profile_engine: str = "stream"
+    ) -> Dict:
+        """analyze_excel_file 과 같은 분석 결과를 compact 형식(열 배열, 시트 인덱스)의 dict 로 반환합니다."""
+        compact = dict(self.analyze_excel_table(file_path, engine, use_cache).to_compact())
+        
+        if profile:
+            compact.update(self._profile_fields(file_path, profile_engine))
+        
+        return compact
+    
+    def analyze_excel_table(self, file_path: str, engine: str = "openpyxl", use_cache: bool = True) -> AnalysisTable:
+        """캐시된(없으면 새로 분석한) AnalysisTable. 반환값은 캐시와 공유되므로 변경하지 않습니다."""
+        if engine not in ANALYZE_ENGINES:
+            raise ValueError(f"지원하지 않는 분석 엔진입니다: {engine}")
+        
+        self.storage_janitor.touch(file_path)
+        
+        return self._analyze_excel_file(file_path, engine, use_cache)
+    
+    def _profile_fields(self, file_path: str, profile_engine: str) -> Dict:
+        try:
+            return {"pandas_info": self.profile_excel_file(file_path, profile_engine)}
+        except Exception as e:
+            return {"pandas_error": str(e)}
+    
+    def _analyze_excel_file(self, file_path: str, engine: str, use_cache: bool) -> AnalysisTable:
+        cache_key = None
+        if use_cache:
+            cache_key = f"{self.file_hashes.get(file_path)}-{engine}-v{ANALYZER_VERSION}"
+            cached_result = self.analysis_cache.get(cache_key)
+            if cached_result is not None:
+                analyses.inc(engine, "hit")
+                return cached_result
+        
+        analyses.inc(engine, "miss")
+        table = AnalysisTable()
+        
+        try:
+            with metrics.span(f"analyze_{engine}"):
+                if engine == "stream":
+                    self._analyze_via_stream(file_path, table)
+                else:
+                    self._analyze_via_openpyxl(file_path, table)
             
         except Exception as e:
             raise Exception(f"Excel 분석 중 오류 발생: {str(e)}")
+        
+        if cache_key is not None:
+            self.analysis_cache.put(cache_key, table)
+        
+        # 이후 채우기 요청이 바로 쓸 수 있도록 placeholder 색인을 만들어 둠 (실패해도 분석 결과는 반환)
+        self._template_plan(file_path)
+        
+        return table
     
-    def process_excel_with_inputs(self, original_file_path: str, input_values: List[InputValue]) -> str:
+    def process_excel_with_inputs(self, original_file_path: str, input_values: List[InputValue], session_id: Optional[str] = None) -> str:
+        """입력값을 적용한 파일을 저장하고 file_id 를 반환합니다.
+
+        session_id 가 같은 요청끼리는 직전 결과에서 바뀐 부분만 다시 압축합니다 (없으면 템플릿별로 공유).
+        """
+        processed_file_id = self._process_excel_file(original_file_path, input_values, session_id)
+        self._publish_file(processed_file_id, "processed_")
+        return processed_file_id
+    
+    def _process_excel_file(self, original_file_path: str, input_values: List[InputValue], session_id: Optional[str] = None) -> str:
+        self.storage_janitor.touch(original_file_path)
+        validate_input_values(input_values)
+        plan = self._template_plan(original_file_path)
+        if plan is not None:
+            # 색인으로 요청을 먼저 검증하여 처리할 수 없는 요청은 어떤 경로도 시도하지 않음
+            plan.validate(input_values)
+        
+        processed_file_id = str(uuid.uuid4())
+        output_path = self._new_file_path(processed_file_id, "processed_")
+        
         try:
-            processed_file_id = str(uuid.uuid4())
-            output_path = os.path.join(self.upload_dir, f"processed_{processed_file_id}.xlsx")
-            
-            # XML 기반 처리로 서식 완전 보존
-            return self._process_excel_via_xml(original_file_path, output_path, input_values, processed_file_id)
+            # 모든 패턴이 inputN 형태이면 컴파일된 템플릿으로 처리
+            if plan is not None and all(PLACEHOLDER_TOKEN.fullmatch(input_value.pattern) for input_value in input_values):
+                path = "plan"
+                with metrics.span("fill_plan"):
+                    processed_id = self._process_excel_via_plan(plan, output_path, input_values, processed_file_id, session_id)
+            else:
+                # XML 기반 처리로 서식 완전 보존
+                path = "xml"
+                with metrics.span("fill_xml"):
+                    processed_id = self._process_excel_via_xml(original_file_path, output_path, input_values, processed_file_id)
             
         except Exception as e:
             # XML 처리 실패시 기본 방식으로 폴백
             print(f"XML processing failed, falling back to openpyxl: {e}")
-            return self._process_excel_via_openpyxl(original_file_path, input_values)
+            fallbacks.inc("file")
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            path = "openpyxl"
+            with metrics.span("fill_openpyxl"):
+                processed_id = self._process_excel_via_openpyxl(original_file_path, input_values)
+        
+        fill_paths.inc(path, "file")
+        if metrics.enabled:
+            processed_bytes.inc("output", amount=os.path.getsize(self.get_file_path(processed_id, "processed_")))
+        return processed_id
     
-    def process_sample_excel_with_inputs(self, input_values: List[InputValue]) -> str:
+    def stream_excel_with_inputs(self, original_file_path: str, input_values: List[InputValue], session_id: Optional[str] = None) -> Iterator[bytes]:
+        """처리 결과를 저장하지 않고 zip 멤버가 만들어지는 대로 바이트 조각으로 반환합니다.
+
+        첫 조각은 만들어 둔 상태로 반환하므로 입력값 오류와 openpyxl 폴백은 여기서 처리되고,
+        나머지 조각은 응답을 보내면서 만들어집니다.
+        """
+        self.storage_janitor.touch(original_file_path)
+        validate_input_values(input_values)
+        plan = self._template_plan(original_file_path)
+        if plan is not None:
+            plan.validate(input_values)
+        
+        try:
+            if plan is not None and all(PLACEHOLDER_TOKEN.fullmatch(input_value.pattern) for input_value in input_values):
+                path = "plan"
+                chunks = self._iter_plan_fill(plan, input_values, session_id)
+            else:
+                path = "xml"
+                chunks = self._iter_xlsx_via_xml(original_file_path, input_values)
+            first_chunk = next(chunks)
+        
+        except Exception as e:
+            # openpyxl 은 zip 을 순서대로 쓰지 않으므로 임시 버퍼에 저장한 뒤 전송
+            print(f"XML processing failed, falling back to openpyxl: {e}")
+            fallbacks.inc("stream")
+            path = "openpyxl"
+            buffer = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_BYTES)
+            with metrics.span("fill_openpyxl"):
+                self._write_excel_via_openpyxl(original_file_path, input_values, buffer)
+            buffer.seek(0)
+            chunks = _iter_file_chunks(buffer)
+            first_chunk = next(chunks, b"")
+        
+        fill_paths.inc(path, "stream")
+        return metrics.count_bytes(processed_bytes, itertools.chain([first_chunk], chunks), "output")
+    
+    def get_sample_file_path(self) -> str:
+        """프로젝트 루트에 있는 sample.xlsx 파일 경로"""
+        # backend/app/services/excel_service.py -> ../../../sample.xlsx
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        backend_dir = os.path.dirname(os.path.dirname(current_dir))
+        project_root = os.path.dirname(backend_dir)
+        return os.path.join(project_root, "sample.xlsx")
+    
+    def get_template_path(self, file_id: str) -> Optional[str]:
+        """file_id 에 해당하는 원본 템플릿의 로컬 경로 ("sample" 이면 sample.xlsx). 없으면 None."""
+        if file_id == "sample":
+            return self.get_sample_file_path()
+        return self.fetch_file(file_id, "upload_")
+    
+    def process_sample_excel_with_inputs(self, input_values: List[InputValue], session_id: Optional[str] = None) -> str:
         """sample.xlsx 파일을 기반으로 입력값을 처리합니다."""
         try:
-            # 프로젝트 루트에 있는 sample.xlsx 파일 경로
-            # backend/app/services/excel_service.py -> ../../../sample.xlsx
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            backend_dir = os.path.dirname(os.path.dirname(current_dir))
-            project_root = os.path.dirname(backend_dir)
-            sample_file_path = os.path.join(project_root, "sample.xlsx")
+            sample_file_path = self.get_sample_file_path()
             
             if not os.path.exists(sample_file_path):
                 raise Exception("sample.xlsx 파일을 찾을 수 없습니다.")
             
-            return self.process_excel_with_inputs(sample_file_path, input_values)
+            return self.process_excel_with_inputs(sample_file_path, input_values, session_id)
             
         except Exception as e:
             raise Exception(f"Sample Excel 처리 중 오류 발생: {str(e)}")
     
-    def get_file_path(self, file_id: str, prefix: str = "") -> str:
-        filename = f"{prefix}{file_id}.xlsx"
-        return os.path.join(self.upload_dir, filename)
+    def process_excel_batch(
+        self,
+        original_file_path: str,
+        rows: Iterable[Tuple[Optional[str], Union[Dict[str, str], List[InputValue]]]],
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Tuple[str, int]:
+        """하나의 템플릿을 여러 값 세트로 채워 zip 으로 묶고 (batch_id, 파일 수) 를 반환합니다.
+
+        각 행은 InputValue 목록이거나, 해당 패턴이 있는 모든 셀에 적용할 {패턴: 값} 입니다.
+        progress 는 파일 하나를 기록할 때마다 (완료 수, 전체 수) 로 호출됩니다.
+        """
+        self.storage_janitor.touch(original_file_path)
+        plan = self.plan_cache.get(original_file_path)
+        
+        resolved_rows = []
+        for index, (name, values) in enumerate(rows):
+            input_values = plan.input_values_for(values) if isinstance(values, dict) else values
+            try:
+                # 모든 행을 미리 검증하여 작업 프로세스에서 실패하지 않도록 함
+                validate_input_values(input_values)
+                plan.assign(input_values)
+            except (TemplatePlanMiss, ValueError) as e:
+                raise ValueError(f"{index + 1}번째 행을 처리할 수 없습니다: {e}")
+            resolved_rows.append((name, input_values))
+        
+        batch_id = str(uuid.uuid4())
+        output_path = self._new_file_path(batch_id, "batch_", ".zip")
+        
+        try:
+            with metrics.span("batch"):
+                count = self.batch_filler.fill(original_file_path, resolved_rows, output_path, self.compression_level, progress)
+        except Exception:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+        
+        fill_paths.inc("plan", "batch", amount=count)
+        if metrics.enabled:
+            processed_bytes.inc("output", amount=os.path.getsize(output_path))
+        self._publish_file(batch_id, "batch_", ".zip")
+        return batch_id, count
+    
+    def storage_key(self, file_id: str, prefix: str = "", extension: str = ".xlsx") -> str:
+        """저장소 키. file_id 앞 두 글자로 나누어 한곳에 파일이 몰리지 않도록 합니다."""
+        return f"{shard_name(file_id)}/{prefix}{file_id}{extension}"
+    
+    def get_file_path(self, file_id: str, prefix: str = "", extension: str = ".xlsx") -> str:
+        """저장소 키에 해당하는 로컬 경로 (로컬 저장소에서는 원본, 그 외에는 캐시된 사본)"""
+        return os.path.join(self.upload_dir, *self.storage_key(file_id, prefix, extension).split("/"))
+    
+    def _new_file_path(self, file_id: str, prefix: str = "", extension: str = ".xlsx") -> str:
+        """새로 쓸 파일의 경로. 하위 디렉터리가 없으면 만듭니다."""
+        file_path = self.get_file_path(file_id, prefix, extension)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        return file_path
+    
+    def _publish_file(self, file_id: str, prefix: str, extension: str = ".xlsx"):
+        """로컬에 쓴 파일을 저장소에 올립니다. 로컬 저장소에서는 이미 제자리이므로 아무것도 하지 않음."""
+        self.storage.put_file(self.storage_key(file_id, prefix, extension), self.get_file_path(file_id, prefix, extension))
+    
+    def fetch_file(self, file_id: str, prefix: str, extension: str = ".xlsx") -> Optional[str]:
+        """저장된 파일의 로컬 경로를 반환합니다. 필요하면 저장소에서 내려받고, 없으면 None."""
+        file_path = self.get_file_path(file_id, prefix, extension)
+        if os.path.exists(file_path):
+            return file_path
+        
+        key = self.storage_key(file_id, prefix, extension)
+        if self.storage.local_path(key) is not None or not self.storage.exists(key):
+            return None
+        
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        try:
+            self.storage.download_to(key, file_path)
+        except FileNotFoundError:
+            return None
+        return file_path
+    
+    def delete_file(self, file_id: str) -> List[str]:
+        """처리 결과를 저장소와 로컬 사본에서 지우고, 지운 종류 목록을 반환합니다.
+
+        업로드 원본은 내용의 해시가 file_id 이므로 같은 파일을 올린 다른 사용자와 공유됩니다.
+        한 사용자의 삭제 요청으로 지우지 않고 보관 기간(STORAGE_UPLOAD_TTL)이 지나면 정리기가 지웁니다.
+        """
+        deleted = self.storage.delete(self.storage_key(file_id, "processed_"))
+        
+        local_path = self.get_file_path(file_id, "processed_")
+        if os.path.exists(local_path):
+            os.remove(local_path)
+            deleted = True
+        
+        return ["processed"] if deleted else []
+    
+    def has_upload(self, file_id: str) -> bool:
+        """업로드 원본이 저장소나 로컬 사본에 있는지"""
+        return self.storage.exists(self.storage_key(file_id, "upload_")) or os.path.exists(self.get_file_path(file_id, "upload_"))
     
     def save_uploaded_file(self, file_content: bytes, filename: str) -> str:
-        file_id = str(uuid.uuid4())
-        file_path = self.get_file_path(file_id, "upload_")
+        """메모리에 있는 업로드 내용을 저장합니다. save_uploaded_stream 참고."""
+        return self.save_uploaded_stream(io.BytesIO(file_content), filename)
+    
+    def save_uploaded_stream(self, fileobj: BinaryIO, filename: str, max_size: int = 0) -> str:
+        """업로드 파일을 내용의 SHA-256 해시를 file_id 로 하여 저장합니다.
+
+        청크 단위로 임시 파일에 쓰면서 해시를 계산하므로 업로드 전체를 메모리에 올리지 않고,
+        max_size 를 넘으면 UploadTooLarge 를 발생시킵니다. 같은 내용의 파일이 이미 있으면
+        임시 파일만 지우므로 중복 업로드가 디스크를 차지하지 않습니다.
+        """
+        temp_path = os.path.join(self.upload_dir, f"upload_{uuid.uuid4().hex}.tmp")
+        with metrics.span("upload"):
+            file_id, size = spool_upload(fileobj, temp_path, max_size)
+        processed_bytes.inc("upload", amount=size)
+        file_path = self._new_file_path(file_id, "upload_")
+        
+        if os.path.exists(file_path):
+            os.remove(temp_path)
+            self.storage_janitor.touch(file_path)
+        else:
+            # 교체는 원자적이므로 동시에 같은 파일이 올라와도 안전하게 저장
+            os.replace(temp_path, file_path)
         
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        # 분석은 로컬 사본으로 바로 시작하고, 저장소에 없을 때만 올림
+        key = self.storage_key(file_id, "upload_")
+        if not self.storage.exists(key):
+            with metrics.span("storage_put"):
+                self.storage.put_file(key, file_path)
         
-        return file_id
\ No newline at end of file
+        return file_id
@@ -0,0 +1,73 @@
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from app.services.metrics import metrics
+
+T = TypeVar("T")
+
+
+class ExecutorSaturated(Exception):
+    """실행기와 대기열이 가득 차서 작업을 받을 수 없음"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("서버가 처리 중인 작업이 많습니다. 잠시 후 다시 시도해주세요.")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """블로킹 Excel 작업을 이벤트 루프 밖에서 실행하는 제한된 실행기.
+
+    동시에 max_workers 개까지 실행하고 max_queue 개까지 대기시키며, 그 이상은 즉시
+    ExecutorSaturated 를 발생시켜 호출자가 503 으로 응답할 수 있게 합니다.
+    카운터는 이벤트 루프 스레드에서만 변경되므로 별도의 잠금이 필요 없습니다.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, retry_after: int = 1):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="excel-worker")
+        self._pending = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self._pending >= self.capacity:
+            self._rejected += 1
+            raise ExecutorSaturated(self.retry_after)
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # 요청별 contextvar(측정 중인 Server-Timing 등)가 작업 스레드에서도 보이도록 복사하여 실행
+            context = contextvars.copy_context()
+            if metrics.enabled:
+                func = functools.partial(_record_queue_wait, time.perf_counter(), func)
+            return await loop.run_in_executor(self._executor, functools.partial(context.run, func, *args, **kwargs))
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        running = min(self._pending, self.max_workers)
+        return {
+            "running": running,
+            "queued": self._pending - running,
+            "capacity": self.capacity,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _record_queue_wait(submitted: float, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """작업 스레드가 비기를 기다린 시간을 queue 단계로 기록한 뒤 func 실행"""
+    metrics.record("queue", time.perf_counter() - submitted)
+    return func(*args, **kwargs)
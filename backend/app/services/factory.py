@@ -0,0 +1,40 @@
+from app import config
+from app.services.excel_service import ExcelService
+from app.services.storage import create_storage
+
+
+def create_excel_service(**overrides) -> ExcelService:
+    """설정 값으로 ExcelService 를 만듭니다. API 서버와 작업 프로세스가 같은 설정을 쓰도록 합니다."""
+    options = dict(
+        upload_dir=config.UPLOAD_DIR,
+        plan_cache_bytes=config.TEMPLATE_PLAN_CACHE_BYTES,
+        compression_level=config.ZIP_COMPRESSION_LEVEL,
+        batch_workers=config.per_server_process(config.BATCH_MAX_WORKERS),
+        batch_parallel_threshold=config.BATCH_PARALLEL_THRESHOLD,
+        analysis_cache_entries=config.ANALYSIS_CACHE_ENTRIES,
+        storage_ttls={
+            "upload_": config.STORAGE_UPLOAD_TTL,
+            "processed_": config.STORAGE_PROCESSED_TTL,
+            "batch_": config.STORAGE_BATCH_TTL,
+            # placeholder 색인은 원본과 같은 기간 보관 (지워져도 다시 만들어짐)
+            "index_": config.STORAGE_UPLOAD_TTL
+        },
+        storage_quota_bytes=config.STORAGE_QUOTA_BYTES,
+        storage_sweep_interval=config.STORAGE_SWEEP_INTERVAL,
+        storage_temp_grace=config.STORAGE_TEMP_GRACE,
+        preview_cache_entries=config.PREVIEW_CACHE_ENTRIES,
+        preview_max_cells=config.PREVIEW_MAX_CELLS,
+        incremental_fill_bytes=config.INCREMENTAL_FILL_CACHE_BYTES,
+        analysis_workers=config.per_server_process(config.ANALYSIS_WORKERS),
+        analysis_parallel_bytes=config.ANALYSIS_PARALLEL_BYTES,
+    )
+    options.update(overrides)
+    if "storage" not in options:
+        options["storage"] = create_storage(
+            config.STORAGE_BACKEND,
+            config.UPLOAD_DIR,
+            bucket=config.S3_BUCKET,
+            prefix=config.S3_PREFIX,
+            endpoint_url=config.S3_ENDPOINT_URL
+        )
+    return ExcelService(**options)
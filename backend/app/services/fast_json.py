@@ -0,0 +1,35 @@
+import json
+from typing import Any, Union
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    # orjson 이 없으면 표준 json 으로 동작 (느리지만 결과는 같음)
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """value 를 UTF-8 JSON 바이트로 직렬화합니다. orjson 이 있으면 orjson 을 사용합니다.
+
+    표준 json 처럼 문자열이 아닌 dict 키(pandas 프로필의 숫자 열 이름 등)는 문자열로 바꿉니다.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(Response):
+    """pydantic 검증 없이 dict/list 를 바로 직렬화하는 JSON 응답"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,40 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Tuple
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_content_hash(file_path: str) -> str:
+    """파일 내용의 SHA-256 해시를 계산합니다."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileHashMemo:
+    """경로/수정시각/크기가 같은 파일의 해시를 다시 계산하지 않도록 기억합니다."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> str:
+        stat = os.stat(file_path)
+        key = (os.path.realpath(file_path), stat.st_mtime_ns, stat.st_size)
+        content_hash = self._hashes.get(key)
+        if content_hash is None:
+            content_hash = file_content_hash(file_path)
+            with self._lock:
+                if len(self._hashes) >= self.max_entries:
+                    self._hashes.clear()
+                self._hashes[key] = content_hash
+        return content_hash
+
+    def clear(self):
+        with self._lock:
+            self._hashes.clear()
@@ -0,0 +1,236 @@
+import threading
+import zipfile
+import zlib
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from app.models.excel_models import InputValue
+from app.services.metrics import fill_blocks
+from app.services.template_plan import CompiledPart, CompiledTemplate
+from app.services.xlsx_zip import RawMember
+
+# 따로 압축하는 블록의 (치환 전) 크기. 값 하나가 바뀌면 이 크기만큼만 다시 압축함
+BLOCK_BYTES = 64 * 1024
+# 데이터 없는 마지막 deflate 블록. 블록마다 SYNC_FLUSH 로 끝낸 압축 스트림을 이어 붙인 뒤 붙여 마무리
+_FINAL_BLOCK = zlib.compressobj(6, zlib.DEFLATED, -15).flush()
+
+# (시작, 끝, 바꿀 바이트). 원래 part 내용 기준 오프셋
+Edit = Tuple[int, int, bytes]
+
+
+class PartState(NamedTuple):
+    """한 part 를 채운 결과. 블록별로 적용한 편집과 압축된 바이트를 보관합니다."""
+    edits: Tuple[Edit, ...]
+    # 블록 시작 오프셋 (첫 값은 0). 토큰과 셀 범위가 블록 경계에 걸치지 않도록 정해짐
+    edges: Tuple[int, ...]
+    block_edits: Tuple[Tuple[Edit, ...], ...]
+    blocks: Tuple[bytes, ...]
+    crc: int
+    file_size: int
+    compression_level: int
+
+    @property
+    def size(self) -> int:
+        return sum(len(block) for block in self.blocks)
+
+
+def _merge_intervals(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start < merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def block_edges(length: int, protected: Iterable[Tuple[int, int]], block_bytes: int = BLOCK_BYTES) -> Tuple[int, ...]:
+    """길이 length 인 내용을 약 block_bytes 씩 나누는 블록 시작 오프셋.
+
+    protected 범위(토큰, 형식을 바꿀 수 있는 셀) 안에는 경계를 두지 않으므로 편집 하나는 항상
+    한 블록 안에 들어갑니다.
+    """
+    merged = _merge_intervals(protected)
+    starts = [start for start, _ in merged]
+    edges = [0]
+    target = block_bytes
+    while target < length:
+        index = bisect_right(starts, target) - 1
+        if index >= 0 and merged[index][0] < target < merged[index][1]:
+            target = merged[index][1]
+            if target >= length:
+                break
+        edges.append(target)
+        target += block_bytes
+    return tuple(edges)
+
+
+def part_edits(part: CompiledPart, assignments: Dict[int, bytes], spans: Optional[Dict[Tuple[int, int], bytes]]) -> Tuple[Edit, ...]:
+    """CompiledPart.render 와 같은 규칙의 편집 목록. 앞선 편집(형식을 바꾼 셀)과 겹치는 토큰은 제외"""
+    edits = sorted(
+        [(part.offsets[index], part.offsets[index] + len(part.tokens[index]), value) for index, value in assignments.items()]
+        + [(start, end, value) for (start, end), value in (spans or {}).items()]
+    )
+    result = []
+    position = 0
+    for start, end, value in edits:
+        if start < position:
+            continue
+        result.append((start, end, value))
+        position = end
+    return tuple(result)
+
+
+def _apply(content: bytes, start: int, end: int, edits: Tuple[Edit, ...]) -> bytes:
+    if not edits:
+        return content[start:end]
+    chunks = []
+    position = start
+    for edit_start, edit_end, value in edits:
+        chunks.append(content[position:edit_start])
+        chunks.append(value)
+        position = edit_end
+    chunks.append(content[position:end])
+    return b"".join(chunks)
+
+
+def _deflate_block(data: bytes, compression_level: int) -> bytes:
+    """이전 블록을 참조하지 않는 독립된 deflate 조각. 바이트 경계에서 끝나므로 그대로 이어 붙일 수 있음"""
+    compressor = zlib.compressobj(compression_level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def _member(part: CompiledPart, state: PartState) -> RawMember:
+    data = b"".join(state.blocks) + _FINAL_BLOCK
+    return RawMember(
+        name=part.name,
+        compress_type=zipfile.ZIP_DEFLATED,
+        crc=state.crc,
+        compress_size=len(data),
+        file_size=state.file_size,
+        date_time=part.raw.date_time,
+        external_attr=part.raw.external_attr,
+        data=data,
+    )
+
+
+class FillSession:
+    """채우기 한 번에서 CompiledTemplate.iter_fill 의 part 인코더로 쓰입니다.
+
+    part 를 블록으로 나누어 따로 압축하고, 이전 채우기(previous)와 편집이 같은 블록은 압축된 바이트를
+    그대로 재사용합니다. 편집이 모두 같은 part 는 다시 만들지 않습니다. 이번 결과는 states 에 남습니다.
+    """
+
+    def __init__(self, plan: CompiledTemplate, previous: Optional[Dict[str, PartState]] = None):
+        self.plan = plan
+        self.previous = previous or {}
+        self.states: Dict[str, PartState] = {}
+
+    def _edges(self, part: CompiledPart, length: int) -> Tuple[int, ...]:
+        protected = [(offset, offset + len(token)) for offset, token in zip(part.offsets, part.tokens)]
+        for sheet in self.plan.sheets.values():
+            if sheet.part == part.name:
+                protected.extend((cell.start, cell.end) for cell in sheet.cells.values() if cell.start >= 0)
+        return block_edges(length, protected)
+
+    def __call__(
+        self,
+        part: CompiledPart,
+        assignments: Dict[int, bytes],
+        spans: Optional[Dict[Tuple[int, int], bytes]],
+        compression_level: int,
+    ) -> RawMember:
+        edits = part_edits(part, assignments, spans)
+        previous = self.previous.get(part.name)
+        if previous is not None and previous.compression_level != compression_level:
+            previous = None
+        if previous is not None and previous.edits == edits:
+            fill_blocks.inc("reused", amount=len(previous.blocks))
+            self.states[part.name] = previous
+            return _member(part, previous)
+
+        content = part.render({})
+        edges = previous.edges if previous is not None else self._edges(part, len(content))
+        block_edits: List[Tuple[Edit, ...]] = []
+        blocks: List[bytes] = []
+        crc = 0
+        file_size = 0
+        position = 0
+        reused = 0
+        for index, start in enumerate(edges):
+            end = edges[index + 1] if index + 1 < len(edges) else len(content)
+            first = position
+            while position < len(edits) and edits[position][0] < end:
+                position += 1
+            current = edits[first:position]
+            # CRC 는 전체 내용으로 계산해야 하므로 재사용하는 블록도 치환한 내용을 만듦 (압축보다 훨씬 빠름)
+            data = _apply(content, start, end, current)
+            crc = zlib.crc32(data, crc)
+            file_size += len(data)
+            if previous is not None and previous.block_edits[index] == current:
+                blocks.append(previous.blocks[index])
+                reused += 1
+            else:
+                blocks.append(_deflate_block(data, compression_level))
+            block_edits.append(current)
+
+        fill_blocks.inc("reused", amount=reused)
+        fill_blocks.inc("deflated", amount=len(blocks) - reused)
+        state = PartState(edits, edges, tuple(block_edits), tuple(blocks), crc, file_size, compression_level)
+        self.states[part.name] = state
+        return _member(part, state)
+
+
+class IncrementalFillCache:
+    """(템플릿 내용 해시, 세션) 별 마지막 채우기 결과를 보관하는 크기 제한 LRU 캐시.
+
+    같은 템플릿을 값 몇 개만 바꿔 다시 채우면 바뀐 입력값이 있는 블록만 다시 압축하므로 처리 시간이
+    워크북 크기보다 바뀐 입력값 수에 비례합니다. max_bytes 가 0 이면 보관하지 않습니다.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], Dict[str, PartState]]" = OrderedDict()
+        self._sizes: Dict[Tuple[str, Optional[str]], int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: Tuple[str, Optional[str]]) -> Optional[Dict[str, PartState]]:
+        with self._lock:
+            states = self._entries.get(key)
+            if states is not None:
+                self._entries.move_to_end(key)
+            return states
+
+    def put(self, key: Tuple[str, Optional[str]], states: Dict[str, PartState]):
+        size = sum(state.size for state in states.values())
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes.pop(key)
+                del self._entries[key]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = states
+            self._sizes[key] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(evicted)
+
+    def iter_fill(
+        self,
+        plan: CompiledTemplate,
+        input_values: List[InputValue],
+        compression_level: int = 6,
+        session_id: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """plan.iter_fill 과 같은 xlsx 바이트 조각을 만들고, 끝까지 만들면 결과를 다음 채우기를 위해 보관합니다."""
+        key = (plan.content_hash, session_id)
+        session = FillSession(plan, self.get(key))
+        yield from plan.iter_fill(input_values, compression_level, encoder=session)
+        self.put(key, session.states)
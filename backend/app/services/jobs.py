@@ -0,0 +1,412 @@
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.models.excel_models import InputValue
+
+JOB_KINDS = ("analyze", "process", "batch")
+# 우선순위가 높은 순서. 디스패처는 앞의 대기열부터 작업을 꺼냄
+JOB_LANES = ("interactive", "batch")
+JOB_BACKENDS = ("memory", "redis")
+
+# 디스패처가 대기열을 기다리는 최대 시간(초). 종료 요청을 이 간격으로 확인
+_POP_TIMEOUT = 1
+# 일괄 작업 진행률을 보고하는 최소 간격(초)
+_PROGRESS_INTERVAL = 0.25
+
+
+class LocalRedisClient:
+    """JobBroker 가 쓰는 redis-py 명령(get/set/rpush/blpop/llen/delete)만 구현한 프로세스 내 대용품.
+
+    Redis 없이 단일 API 프로세스에서 작업 대기열을 실행할 때 사용합니다. 값은 redis-py 와
+    같이 bytes 로 반환합니다.
+    """
+
+    _PRUNE_EVERY = 256
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lists: Dict[str, deque] = {}
+        self._condition = threading.Condition()
+        self._writes = 0
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._condition:
+            entry = self._values.get(name)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._values[name]
+                return None
+            return value
+
+    def set(self, name: str, value, ex: Optional[int] = None) -> bool:
+        with self._condition:
+            self._values[name] = (self._encode(value), time.monotonic() + ex if ex else None)
+            self._writes += 1
+            if self._writes % self._PRUNE_EVERY == 0:
+                # 아무도 조회하지 않은 만료 값이 쌓이지 않도록 가끔 정리
+                now = time.monotonic()
+                for key in [key for key, (_, expires_at) in self._values.items() if expires_at is not None and expires_at <= now]:
+                    del self._values[key]
+        return True
+
+    def rpush(self, name: str, *values) -> int:
+        with self._condition:
+            items = self._lists.setdefault(name, deque())
+            items.extend(self._encode(value) for value in values)
+            self._condition.notify_all()
+            return len(items)
+
+    def blpop(self, keys, timeout: float = 0) -> Optional[Tuple[bytes, bytes]]:
+        """keys 순서대로 처음 비어 있지 않은 목록의 첫 값을 꺼냅니다. timeout 이 0 이면 계속 기다림."""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        deadline = time.monotonic() + timeout if timeout else None
+        with self._condition:
+            while True:
+                for key in keys:
+                    items = self._lists.get(key)
+                    if items:
+                        return key.encode("utf-8"), items.popleft()
+                if deadline is None:
+                    self._condition.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def llen(self, name: str) -> int:
+        with self._condition:
+            return len(self._lists.get(name, ()))
+
+    def delete(self, *names: str) -> int:
+        deleted = 0
+        with self._condition:
+            for name in names:
+                deleted += (self._values.pop(name, None) is not None) + (self._lists.pop(name, None) is not None)
+        return deleted
+
+
+class JobBroker:
+    """작업 상태와 우선순위 대기열을 Redis 명령으로 관리합니다.
+
+    작업은 JSON 으로 '{prefix}job:<id>' 에 ttl 초 동안 보관하고, 작업 id 는 대기열마다
+    '{prefix}lane:<lane>' 목록에 넣습니다. 실제 Redis 를 쓰면 여러 API 서버가 같은 대기열과
+    상태를 공유합니다.
+    """
+
+    def __init__(self, client, prefix: str = "excel:jobs:", ttl: int = 3600):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}job:{job_id}"
+
+    def _lane_key(self, lane: str) -> str:
+        return f"{self.prefix}lane:{lane}"
+
+    def _save(self, job: Dict[str, Any]):
+        self.client.set(self._job_key(job["job_id"]), json.dumps(job, ensure_ascii=False, default=str), ex=self.ttl or None)
+
+    def submit(self, kind: str, payload: Dict[str, Any], lane: str) -> Dict[str, Any]:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"지원하지 않는 작업 종류입니다: {kind}")
+        if lane not in JOB_LANES:
+            raise ValueError(f"지원하지 않는 대기열입니다: {lane}")
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "lane": lane,
+            "status": "queued",
+            "progress": 0.0,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "download_url": None,
+            "result": None,
+            "error": None,
+            "payload": payload,
+        }
+        self._save(job)
+        self.client.rpush(self._lane_key(lane), job["job_id"])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        value = self.client.get(self._job_key(job_id))
+        return json.loads(value) if value is not None else None
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self.get(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            self._save(job)
+            return job
+
+    def pop(self, lanes: Sequence[str], timeout: float = _POP_TIMEOUT) -> Optional[Dict[str, Any]]:
+        """lanes 순서대로 대기 중인 작업 하나를 꺼냅니다. 없거나 이미 만료된 작업이면 None."""
+        popped = self.client.blpop([self._lane_key(lane) for lane in lanes], timeout=timeout)
+        if popped is None:
+            return None
+        job_id = popped[1].decode("utf-8") if isinstance(popped[1], bytes) else popped[1]
+        return self.get(job_id)
+
+    def queue_lengths(self) -> Dict[str, int]:
+        return {lane: self.client.llen(self._lane_key(lane)) for lane in JOB_LANES}
+
+
+def create_job_broker(backend: str, redis_url: str = "", ttl: int = 3600) -> JobBroker:
+    """설정 값으로 작업 브로커를 만듭니다. redis 는 redis-py 를 필요할 때만 불러옵니다."""
+    if backend == "memory":
+        return JobBroker(LocalRedisClient(), ttl=ttl)
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("redis 작업 대기열에는 JOB_REDIS_URL 설정이 필요합니다.")
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("redis 작업 대기열을 사용하려면 redis 를 설치해야 합니다: pip install redis")
+        return JobBroker(redis.Redis.from_url(redis_url), ttl=ttl)
+    raise ValueError(f"지원하지 않는 작업 대기열입니다: {backend}")
+
+
+# 작업 실행기(프로세스 또는 스레드)마다 하나씩 두는 상태
+_worker_service = None
+_worker_progress = None
+
+
+def _init_worker(progress_queue, service=None):
+    """작업 실행기 초기화. service 가 없으면(작업 프로세스) 설정 값으로 새로 만듭니다."""
+    global _worker_service, _worker_progress
+    if service is None:
+        from app.services.factory import create_excel_service
+
+        # 작업 프로세스 안에서 또 프로세스 풀을 만들지 않도록 일괄 처리와 시트 분석은 직렬로 실행
+        service = create_excel_service(batch_workers=1, analysis_workers=1)
+    _worker_service = service
+    _worker_progress = progress_queue
+
+
+class _ProgressReporter:
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._last = 0.0
+
+    def __call__(self, done: int, total: int):
+        now = time.monotonic()
+        if done < total and now - self._last < _PROGRESS_INTERVAL:
+            return
+        self._last = now
+        _worker_progress.put((self.job_id, round(done / total, 4)))
+
+
+def _run_job(job_id: str, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """작업 실행기에서 실행: {"result": ..., "download_url": ...} 를 반환합니다."""
+    service = _worker_service
+    file_id = payload["file_id"]
+    template_path = service.get_template_path(file_id)
+    if template_path is None or not os.path.exists(template_path):
+        raise FileNotFoundError("원본 파일을 찾을 수 없습니다.")
+
+    if kind == "analyze":
+        options = dict(
+            engine=payload.get("engine", "openpyxl"),
+            profile=payload.get("profile", False),
+            profile_engine=payload.get("profile_engine", "stream")
+        )
+        if payload.get("format") == "compact":
+            result = service.analyze_excel_compact(template_path, **options)
+        else:
+            result = service.analyze_excel_file(template_path, **options).model_dump()
+        result["file_id"] = file_id
+        return {"result": result, "download_url": None}
+
+    if kind == "process":
+        input_values = [InputValue(**value) for value in payload["input_values"]]
+        processed_file_id = service.process_excel_with_inputs(template_path, input_values)
+        return {
+            "result": {"processed_file_id": processed_file_id},
+            "download_url": f"/api/download/{processed_file_id}",
+        }
+
+    if kind == "batch":
+        rows = ((None, [InputValue(**value) for value in row]) for row in payload["rows"])
+        batch_id, total_files = service.process_excel_batch(template_path, rows, progress=_ProgressReporter(job_id))
+        return {
+            "result": {"batch_id": batch_id, "total_files": total_files},
+            "download_url": f"/api/download/batch/{batch_id}",
+        }
+
+    raise ValueError(f"지원하지 않는 작업 종류입니다: {kind}")
+
+
+class JobRunner:
+    """대기열의 작업을 작업 프로세스 풀에서 실행하는 디스패처.
+
+    workers 개의 디스패처 스레드가 각각 작업 하나를 풀에 맡기고 끝날 때까지 기다리므로 동시에
+    workers 개까지 실행됩니다. 그중 interactive_reserved 개는 interactive 대기열만 보므로 큰
+    일괄 작업이 몰려 있어도 작은 작업이 바로 실행되고, 나머지는 interactive 를 먼저 보고
+    비어 있을 때 batch 를 가져옵니다.
+
+    use_processes 가 False 이면 service 를 공유하는 스레드에서 실행합니다 (memory 저장소처럼
+    다른 프로세스와 파일을 공유할 수 없을 때).
+    """
+
+    def __init__(
+        self,
+        broker: JobBroker,
+        workers: int = 2,
+        interactive_reserved: int = 1,
+        use_processes: bool = True,
+        service=None,
+    ):
+        self.broker = broker
+        self.workers = max(1, workers)
+        self.interactive_reserved = min(max(0, interactive_reserved), self.workers - 1)
+        self.use_processes = use_processes
+        self.service = service
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._progress = multiprocessing.get_context("spawn").Queue() if use_processes else queue.Queue()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._running: Dict[str, str] = {}
+        self._running_lock = threading.Lock()
+        self._stats = {"succeeded": 0, "failed": 0}
+
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                if self.use_processes:
+                    # 서버 스레드 상태를 물려받지 않도록 spawn 으로 시작
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(self._progress,),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="job-worker",
+                        initializer=_init_worker,
+                        initargs=(self._progress, self.service),
+                    )
+            return self._executor
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for index in range(self.workers):
+            lanes = JOB_LANES[:1] if index < self.interactive_reserved else JOB_LANES
+            thread = threading.Thread(target=self._dispatch, args=(lanes,), name=f"job-dispatcher-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._relay_progress, name="job-progress", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=_POP_TIMEOUT + 1)
+        self._threads = []
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+        # 중단된 작업이 계속 실행 중으로 보이지 않도록 실패로 기록
+        with self._running_lock:
+            running = list(self._running)
+            self._running.clear()
+        for job_id in running:
+            self.broker.update(job_id, status="failed", finished_at=time.time(), error="서버가 종료되어 작업이 중단되었습니다.")
+
+    def _dispatch(self, lanes: Sequence[str]):
+        while not self._stop.is_set():
+            try:
+                job = self.broker.pop(lanes)
+            except Exception as e:
+                print(f"Job queue pop failed: {e}")
+                self._stop.wait(_POP_TIMEOUT)
+                continue
+            if job is not None:
+                self._execute(job)
+
+    def _execute(self, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        with self._running_lock:
+            self._running[job_id] = job["lane"]
+        self.broker.update(job_id, status="running", started_at=time.time())
+        try:
+            future = self._get_executor().submit(_run_job, job_id, job["kind"], job["payload"])
+            outcome = future.result()
+        except BrokenProcessPool as e:
+            # 작업 프로세스가 죽으면 다음 작업을 위해 풀을 새로 만듦
+            with self._executor_lock:
+                self._executor = None
+            self._finish(job_id, error=f"작업 프로세스가 비정상 종료되었습니다: {e}")
+        except Exception as e:
+            self._finish(job_id, error=str(e))
+        else:
+            self._finish(job_id, outcome=outcome)
+
+    def _finish(self, job_id: str, outcome: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        with self._running_lock:
+            if self._running.pop(job_id, None) is None:
+                return
+            self._stats["failed" if outcome is None else "succeeded"] += 1
+        if outcome is None:
+            self.broker.update(job_id, status="failed", finished_at=time.time(), error=error)
+        else:
+            self.broker.update(
+                job_id,
+                status="succeeded",
+                progress=1.0,
+                finished_at=time.time(),
+                result=outcome["result"],
+                download_url=outcome["download_url"],
+            )
+
+    def _relay_progress(self):
+        while not self._stop.is_set():
+            try:
+                job_id, progress = self._progress.get(timeout=_POP_TIMEOUT)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            # 잠금을 잡은 채 기록하여 완료 기록 뒤에 늦은 진행률이 덮어쓰지 않도록 함
+            with self._running_lock:
+                if job_id in self._running:
+                    self.broker.update(job_id, progress=progress)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._running_lock:
+            running = {lane: 0 for lane in JOB_LANES}
+            for lane in self._running.values():
+                running[lane] += 1
+            stats = dict(self._stats)
+        stats["running"] = running
+        stats["queued"] = self.broker.queue_lengths()
+        stats["workers"] = self.workers
+        stats["interactive_reserved"] = self.interactive_reserved
+        return stats
@@ -0,0 +1,338 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# 초 단위 지연 히스토그램 경계 (Prometheus 기본값에 가까운 값)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+# 요청마다 Server-Timing 에 넣을 (단계, 초) 목록. 작업 실행기 스레드에도 전달됨 (BoundedExecutor)
+_request_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, registry: "Metrics", name: str, help_text: str, labels: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_label_text(self.labels, labels)} {_number(value)}" for labels, value in values)
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        registry: "Metrics",
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # 라벨 값별 [구간별 개수..., 합계, 개수]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        if not self.registry.enabled:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @staticmethod
+    def _le(bound: float) -> str:
+        return f'le="{_number(bound)}"'
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted((labels, list(state)) for labels, state in self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, state in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, labels, self._le(bound))} {_number(cumulative)}")
+            lines.append(f"{self.name}_bucket{_label_text(self.labels, labels, self._le(float('inf')))} {_number(state[-1])}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, labels)} {_number(state[-2])}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, labels)} {_number(state[-1])}")
+        return lines
+
+
+class _Span:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.metrics.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class StageTimer:
+    """멤버마다 반복되는 단계처럼 여러 번 나누어 재는 구간의 시간을 단계별로 합산했다가 flush() 에서
+    한 번씩 기록합니다. 히스토그램에 멤버 수만큼 관측값이 쌓이지 않도록 요청당 하나로 모읍니다."""
+
+    def __init__(self, metrics: "Metrics"):
+        self.metrics = metrics
+        self.totals: Dict[str, float] = {}
+
+    @contextmanager
+    def __call__(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[stage] = self.totals.get(stage, 0.0) + time.perf_counter() - start
+
+    def flush(self):
+        for stage, seconds in self.totals.items():
+            self.metrics.record(stage, seconds)
+        self.totals.clear()
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __call__(self, stage: str):
+        return _NULL_SPAN
+
+    def flush(self):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """프로세스 안의 카운터/히스토그램 모음과 Prometheus 텍스트 형식 출력.
+
+    span(단계) 로 감싼 구간의 시간은 excel_stage_duration_seconds 히스토그램에 기록되고, 요청
+    처리 중이면 Server-Timing 헤더에도 들어갑니다. 비활성화되어 있으면 span 은 아무것도 하지 않는
+    공유 객체를 반환하고 카운터는 값을 바꾸지 않으므로 측정 코드를 그대로 두어도 비용이 거의 없습니다.
+    """
+
+    def __init__(self, enabled: bool = False, server_timing: bool = False):
+        self.enabled = enabled
+        self.server_timing = server_timing
+        self._metrics: List = []
+        self._collectors: List[Callable[[], List[str]]] = []
+        self.stage_seconds = self.histogram(
+            "excel_stage_duration_seconds", "Excel 처리 단계별 소요 시간", ("stage",)
+        )
+
+    def configure(self, enabled: bool, server_timing: bool = False):
+        self.enabled = enabled
+        self.server_timing = enabled and server_timing
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(self, name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(self, name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str], collect: Callable[[], Iterable[Tuple[LabelValues, float]]]):
+        """출력할 때마다 collect() 로 (라벨 값, 값) 목록을 읽는 게이지를 등록합니다."""
+        def lines() -> List[str]:
+            output = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            output.extend(f"{name}{_label_text(labels, label_values)} {_number(value)}" for label_values, value in collect())
+            return output
+        self._collectors.append(lines)
+
+    def span(self, stage: str):
+        """with metrics.span("단계"): 로 구간 시간을 기록합니다."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def timer(self):
+        """with timer("단계"): 로 나누어 잰 시간을 합산하는 StageTimer. 끝나면 timer.flush()."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return StageTimer(self)
+
+    def record(self, stage: str, seconds: float):
+        """이미 잰 구간 시간(여러 번 나누어 잰 합계 등)을 기록합니다."""
+        if not self.enabled:
+            return
+        self.stage_seconds.observe(seconds, stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, seconds))
+
+    def count_bytes(self, counter: Counter, chunks: Iterator[bytes], *label_values: str) -> Iterator[bytes]:
+        """바이트 조각을 그대로 넘기면서 전체 크기를 counter 에 더합니다."""
+        if not self.enabled:
+            return chunks
+        return self._count_bytes(counter, chunks, label_values)
+
+    @staticmethod
+    def _count_bytes(counter: Counter, chunks: Iterator[bytes], label_values: LabelValues) -> Iterator[bytes]:
+        size = 0
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                yield chunk
+        finally:
+            counter.inc(*label_values, amount=size)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+# 처리 경로별 사용 횟수 (plan: 컴파일된 템플릿, xml: XML 치환, openpyxl: 폴백)
+fill_paths = metrics.counter("excel_fill_total", "채우기 처리 경로별 횟수", ("path", "mode"))
+fallbacks = metrics.counter("excel_fallback_total", "XML 처리 실패로 openpyxl 로 처리한 횟수", ("mode",))
+analyses = metrics.counter("excel_analyze_total", "분석 엔진별 횟수와 캐시 적중 여부", ("engine", "cache"))
+processed_bytes = metrics.counter("excel_bytes_total", "처리한 바이트 수 (upload: 업로드, output: 생성한 파일)", ("kind",))
+# 점진 채우기(incremental_fill)에서 압축된 블록을 재사용(reused)하거나 다시 압축(deflated)한 수
+fill_blocks = metrics.counter("excel_fill_blocks_total", "점진 채우기에서 재사용하거나 다시 압축한 블록 수", ("result",))
+request_seconds = metrics.histogram(
+    "http_request_duration_seconds", "엔드포인트별 응답 시간 (스트리밍 응답은 마지막 조각까지)", ("method", "route", "status")
+)
+
+
+class MetricsMiddleware:
+    """엔드포인트별 응답 시간을 기록하고, 설정되어 있으면 Server-Timing 헤더에 단계별 시간을 넣는
+    ASGI 미들웨어.
+
+    Server-Timing 은 응답 헤더를 보내기 전까지 끝난 단계만 포함합니다 (스트리밍 응답의 나머지 조각을
+    만드는 시간은 히스토그램에만 기록).
+    """
+
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings: Optional[List[Tuple[str, float]]] = [] if self.registry.server_timing else None
+        token = _request_timings.set(timings)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timings is not None:
+                    header = server_timing_header(timings, time.perf_counter() - start)
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            request_seconds.observe(time.perf_counter() - start, scope["method"], route_template(scope), str(status))
+
+
+def route_template(scope) -> str:
+    """경로 매개변수별로 라벨이 나뉘지 않도록 요청 경로를 라우트 템플릿(/api/download/{file_id})으로 바꿉니다.
+
+    include_router 의 prefix 가 라우트 경로에 포함되지 않는 FastAPI 버전도 있으므로, 라우트 경로에
+    실제 매개변수 값을 넣은 부분을 요청 경로 끝에서 찾아 그 앞부분을 prefix 로 붙입니다.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    path = scope.get("path", "")
+    try:
+        concrete = getattr(route, "path_format", template).format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    if path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+
+def server_timing_header(timings: List[Tuple[str, float]], total: float) -> str:
+    """같은 단계는 합쳐서 'stage;dur=밀리초' 목록으로 만들고 마지막에 전체(app) 시간을 붙입니다."""
+    merged: Dict[str, float] = {}
+    for stage, seconds in timings:
+        merged[stage] = merged.get(stage, 0.0) + seconds
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in merged.items()]
+    entries.append(f"app;dur={total * 1000:.1f}")
+    return ", ".join(entries)
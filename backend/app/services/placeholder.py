@@ -0,0 +1,117 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.excel_models import InputValue
+
+_XML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_WORD_CHAR = re.compile(r'[A-Za-z0-9_]')
+_LEADING_GUARD = r'(?<![A-Za-z0-9_])'
+_XML_ATTRIBUTE_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+
+def escape_xml_text(value: str) -> str:
+    """XML 텍스트 노드에 넣을 수 있도록 &, <, > 를 이스케이프합니다."""
+    return value.translate(_XML_ESCAPES)
+
+
+def escape_xml_attribute(value: str) -> str:
+    """큰따옴표로 감싼 XML 속성 값에 넣을 수 있도록 &, <, >, " 를 이스케이프합니다."""
+    return value.translate(_XML_ATTRIBUTE_ESCAPES)
+
+
+def _build_trie_regex(patterns: Iterable[str]) -> str:
+    """패턴 목록을 trie 형태의 정규식으로 만듭니다.
+
+    같은 접두사를 공유하는 패턴은 한 분기로 합쳐지고, 더 긴 패턴을 먼저 시도하므로
+    input1 이 input10 의 앞부분을 잘못 치환하지 않습니다. 숫자로 끝나는 패턴 뒤에는
+    숫자가 이어지지 않아야 하고, 영문자/숫자로 시작하는 패턴 앞에는 영문자/숫자/_ 가 없어야
+    일치하므로 myinput1 이나 xinput12 는 치환하지 않습니다.
+    """
+    trie: Dict = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def render(node: Dict, last_char: str) -> str:
+        alternatives = [
+            # 패턴의 첫 글자(최상위 분기)에만 앞 글자 검사를 둠
+            (_LEADING_GUARD if not last_char and _WORD_CHAR.fullmatch(char) else "") + re.escape(char) + render(child, char)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if "" in node:
+            # 더 긴 일치를 먼저 시도하도록 종료 분기는 마지막에 둠
+            alternatives.append(r"(?!\d)" if last_char.isdigit() else "")
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return "(?:" + "|".join(alternatives) + ")"
+
+    return render(trie, "")
+
+
+class PlaceholderSubstituter:
+    """여러 placeholder 를 한 번의 스캔으로 치환하는 엔진.
+
+    모든 패턴을 하나의 trie 정규식으로 컴파일하므로 비용이 패턴 수가 아니라 문서 길이에
+    비례합니다. 대소문자는 구분하지 않으며, 같은 패턴이 여러 번 주어지면 처음 값이 쓰입니다.
+    """
+
+    def __init__(self, replacements: Iterable[Tuple[str, str]], escape_xml: bool = False):
+        self._values: Dict[str, str] = {}
+        for pattern, value in replacements:
+            if pattern:
+                self._values.setdefault(pattern.lower(), escape_xml_text(value) if escape_xml else value)
+
+        self._regex: Optional[re.Pattern] = None
+        if self._values:
+            self._regex = re.compile(_build_trie_regex(self._values), re.IGNORECASE)
+        # XML 원문(이스케이프된 텍스트)에서 찾기 위한 정규식과 값. 필요할 때 만듦
+        self._xml_regex: Optional[re.Pattern] = None
+        self._xml_values: Dict[str, str] = {}
+
+    @classmethod
+    def from_input_values(cls, input_values: Iterable[InputValue], escape_xml: bool = False) -> "PlaceholderSubstituter":
+        return cls(((input_value.pattern, input_value.value) for input_value in input_values), escape_xml)
+
+    def __bool__(self) -> bool:
+        return self._regex is not None
+
+    def _replace(self, match: re.Match) -> str:
+        return self._values[match.group().lower()]
+
+    def edits(self, text: str) -> List[Tuple[int, int, str]]:
+        """text 에서 일치하는 (시작, 끝, 값) 목록"""
+        if self._regex is None:
+            return []
+        return [(match.start(), match.end(), self._values[match.group().lower()]) for match in self._regex.finditer(text)]
+
+    def _xml(self) -> re.Pattern:
+        if self._xml_regex is None:
+            self._xml_values = {escape_xml_text(pattern): escape_xml_text(value) for pattern, value in self._values.items()}
+            self._xml_regex = re.compile(_build_trie_regex(self._xml_values), re.IGNORECASE)
+        return self._xml_regex
+
+    def search_xml(self, xml: str) -> bool:
+        """XML 원문에 일치하는 패턴이 있는지 (태그 안인지는 따지지 않음)"""
+        return self._regex is not None and self._xml().search(xml) is not None
+
+    def sub_xml_text(self, xml: str) -> str:
+        """XML 원문의 텍스트 노드에서만 치환하고 값은 이스케이프하여 넣습니다. escape_xml=False 로 만든 경우에 사용합니다."""
+        if self._regex is None:
+            return xml
+        return self._xml().sub(self._replace_xml_text, xml)
+
+    def _replace_xml_text(self, match: re.Match) -> str:
+        xml = match.string
+        # 마지막 '<' 가 마지막 '>' 보다 뒤에 있으면 태그 안(요소 이름, 속성)이므로 그대로 둠
+        if xml.rfind("<", 0, match.start()) > xml.rfind(">", 0, match.start()):
+            return match.group()
+        return self._xml_values[match.group().lower()]
+
+    def sub(self, text: str) -> str:
+        """text 의 모든 placeholder 를 치환한 문자열을 반환합니다."""
+        if self._regex is None:
+            return text
+        return self._regex.sub(self._replace, text)
@@ -0,0 +1,60 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from app.services import fast_json
+from app.services.storage_janitor import shard_name
+
+# 색인 형식이 바뀌면 올려서 이전 sidecar 를 무시
+INDEX_VERSION = 5
+
+
+class PlaceholderIndexStore:
+    """템플릿의 placeholder 색인(CompiledTemplate.to_index)을 sidecar JSON 으로 보관합니다.
+
+    색인은 root/<해시 앞 두 글자>/index_<콘텐츠 해시>.json 에 저장되므로 업로드 원본
+    (upload_<해시>.xlsx) 바로 옆에 놓입니다. 파일 이름과 내용에 콘텐츠 해시를 기록하므로
+    템플릿 내용이 바뀌면 이전 색인은 쓰이지 않습니다.
+    """
+
+    def __init__(self, root: str, on_load: Optional[Callable[[str], None]] = None):
+        self.root = os.path.abspath(root)
+        # 색인을 읽을 때 호출 (저장 파일 정리기의 마지막 사용 시각 기록)
+        self.on_load = on_load
+
+    def path(self, content_hash: str) -> str:
+        return os.path.join(self.root, shard_name(content_hash), f"index_{content_hash}.json")
+
+    def load(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """저장된 색인. 없거나 버전/해시가 맞지 않으면 None."""
+        path = self.path(content_hash)
+        try:
+            with open(path, "rb") as f:
+                index = fast_json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION or index.get("content_hash") != content_hash:
+            return None
+        if self.on_load is not None:
+            self.on_load(path)
+        return index
+
+    def save(self, index: Dict[str, Any]):
+        path = self.path(index["content_hash"])
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(fast_json.dumps(dict(index, version=INDEX_VERSION)))
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Failed to save placeholder index: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def delete(self, content_hash: str) -> bool:
+        try:
+            os.remove(self.path(content_hash))
+            return True
+        except FileNotFoundError:
+            return False
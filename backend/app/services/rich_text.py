@@ -0,0 +1,142 @@
+import re
+from bisect import bisect_right
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.placeholder import escape_xml_text
+
+# (시작, 끝, 바꿀 텍스트) - 이어 붙인 문자열 안의 위치
+TextEdit = Tuple[int, int, str]
+
+# 생성기에 따라 'x:' 같은 네임스페이스 접두사가 붙을 수 있음
+_PREFIX = r'(?:[A-Za-z_][\w.-]*:)?'
+# 공유 문자열 <si> 와 인라인 문자열 <is>
+_STRING_ITEM = re.compile(r'<(' + _PREFIX + r'(?:si|is))\b[^>]*?(?:/>|>(.*?)</\1>)', re.DOTALL)
+_TEXT_NODE = re.compile(r'<(' + _PREFIX + r't)\b([^>]*?)(?:/>|>(.*?)</\1>)', re.DOTALL)
+# 윗주(phonetic) 텍스트는 셀 값에 포함되지 않음
+_PHONETIC = re.compile(r'<(' + _PREFIX + r'rPh)\b[^>]*?(?:/>|>.*?</\1>)', re.DOTALL)
+_RUN_START = re.compile(r'<' + _PREFIX + r'r[\s>]')
+_ENTITY = re.compile(r'&(#x[0-9A-Fa-f]+|#\d+|amp|lt|gt|quot|apos);')
+_ENTITIES = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "apos": "'"}
+_SPACE_PRESERVE = ' xml:space="preserve"'
+
+
+def _unescape_entity(match: re.Match) -> str:
+    name = match.group(1)
+    if name.startswith("#x"):
+        return chr(int(name[2:], 16))
+    if name.startswith("#"):
+        return chr(int(name[1:]))
+    return _ENTITIES[name]
+
+
+def unescape_xml_text(text: str) -> str:
+    return _ENTITY.sub(_unescape_entity, text) if "&" in text else text
+
+
+def _text_node(open_name: str, attributes: str, text: str) -> str:
+    # 앞뒤 공백이 있으면 Excel 이 지우지 않도록 xml:space="preserve" 를 붙임
+    if text != text.strip() and "xml:space" not in attributes:
+        attributes += _SPACE_PRESERVE
+    return f"<{open_name}{attributes}>{escape_xml_text(text)}</{open_name}>"
+
+
+def _text_nodes(inner: str) -> List[re.Match]:
+    phonetic = [(match.start(), match.end()) for match in _PHONETIC.finditer(inner)]
+    return [
+        match for match in _TEXT_NODE.finditer(inner)
+        if not any(start <= match.start() < end for start, end in phonetic)
+    ]
+
+
+def item_text(inner: str) -> str:
+    """<si>/<is> 내용(inner)의 텍스트 (윗주 제외)"""
+    return "".join(unescape_xml_text(node.group(3) or "") for node in _text_nodes(inner))
+
+
+def iter_string_items(content: str) -> Iterator[str]:
+    """XML 의 <si>/<is> 내용을 순서대로 반환합니다."""
+    for item in _STRING_ITEM.finditer(content):
+        yield item.group(2) or ""
+
+
+def rewrite_string_item(inner: str, find: Callable[[str, List[int]], Iterable[TextEdit]]) -> Optional[str]:
+    """<si>/<is> 의 내용(inner)을 run 구조를 유지한 채 텍스트 기준으로 바꿉니다.
+
+    각 <t> 의 텍스트(윗주 제외)를 이어 붙인 문자열과 run 경계 목록으로 find 를 호출하고, 돌려받은
+    편집을 적용합니다. 여러 run 에 걸친 편집은 시작 run 에 바꿀 텍스트 전체를 넣고 나머지 run 에서는
+    해당 부분을 지우므로 시작 run 의 서식을 따릅니다. 바뀐 것이 없으면 None.
+    """
+    nodes = _text_nodes(inner)
+    if not nodes:
+        return None
+
+    texts = [unescape_xml_text(node.group(3) or "") for node in nodes]
+    starts = []
+    position = 0
+    for text in texts:
+        starts.append(position)
+        position += len(text)
+
+    edits = sorted(find("".join(texts), starts))
+    if not edits:
+        return None
+
+    new_texts = list(texts)
+    # 뒤의 편집부터 적용하여 앞 편집의 위치가 바뀌지 않도록 함
+    for edit_start, edit_end, replacement in reversed(edits):
+        first = _segment_at(starts, edit_start)
+        last = _segment_at(starts, max(edit_end - 1, edit_start))
+        head = new_texts[first][:edit_start - starts[first]]
+        if first == last:
+            new_texts[first] = head + replacement + new_texts[first][edit_end - starts[first]:]
+            continue
+        new_texts[first] = head + replacement
+        for index in range(first + 1, last):
+            new_texts[index] = ""
+        new_texts[last] = new_texts[last][edit_end - starts[last]:]
+
+    chunks = []
+    position = 0
+    for node, old_text, new_text in zip(nodes, texts, new_texts):
+        if new_text == old_text:
+            continue
+        chunks.append(inner[position:node.start()])
+        chunks.append(_text_node(node.group(1), node.group(2), new_text))
+        position = node.end()
+    chunks.append(inner[position:])
+    return "".join(chunks)
+
+
+def _segment_at(starts: List[int], offset: int) -> int:
+    # 길이가 0 인 run 은 건너뛰도록 시작 위치가 offset 이하인 마지막 run 을 고름
+    return max(bisect_right(starts, offset) - 1, 0)
+
+
+def join_split_matches(content: str, pattern: re.Pattern) -> str:
+    """<si>/<is> 에서 여러 run 에 나뉘어 있는 pattern 일치를 시작 run 으로 모읍니다.
+
+    모은 뒤에는 일치 전체가 하나의 <t> 안에 있으므로 바이트 단위로 위치를 찾는 컴파일된 템플릿이
+    서식 있는 텍스트도 처리할 수 있습니다. 나뉜 일치가 없으면 content 를 그대로 반환합니다.
+    """
+    def find_split(text: str, starts: List[int]) -> List[TextEdit]:
+        edits = []
+        for match in pattern.finditer(text):
+            if _segment_at(starts, match.start()) != _segment_at(starts, match.end() - 1):
+                edits.append((match.start(), match.end(), match.group()))
+        return edits
+
+    chunks = []
+    position = 0
+    for item in _STRING_ITEM.finditer(content):
+        inner = item.group(2)
+        if not inner or not _RUN_START.search(inner):
+            continue
+        new_inner = rewrite_string_item(inner, find_split)
+        if new_inner is not None:
+            chunks.append(content[position:item.start(2)])
+            chunks.append(new_inner)
+            position = item.end(2)
+    if not chunks:
+        return content
+    chunks.append(content[position:])
+    return "".join(chunks)
@@ -0,0 +1,111 @@
+import heapq
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.analysis_table import FieldRow
+from app.services.xlsx_reader import INPUT_PATTERN, SheetExtent, SheetPart, iter_sheet_cells
+
+# (최대 행, 최대 열, 행 우선 순서의 필드)
+SheetResult = Tuple[int, int, List[FieldRow]]
+
+
+def analyze_sheet(zf: zipfile.ZipFile, part: str, shared_string: Callable[[int], Optional[str]]) -> SheetResult:
+    """worksheet part 하나를 스트리밍으로 읽어 placeholder 가 있는 셀과 시트 크기를 구합니다."""
+    sheet_fields: List[FieldRow] = []
+    extent = SheetExtent()
+
+    for cell in iter_sheet_cells(zf, part, shared_string, extent):
+        if cell.data_type not in ("s", "f") or not cell.value:
+            continue
+
+        input_pattern = INPUT_PATTERN.search(cell.value)
+        if input_pattern:
+            sheet_fields.append((cell.row, cell.column, input_pattern.group(), cell.value))
+
+    # openpyxl 방식과 동일하게 행 우선 순서로 정렬
+    sheet_fields.sort(key=lambda field: (field[0], field[1]))
+    return max(extent.max_row, 1), max(extent.max_column, 1), sheet_fields
+
+
+def _analyze_sheets(file_path: str, parts: List[Tuple[int, str]], matched_strings: Dict[int, str]) -> List[Tuple[int, SheetResult]]:
+    """작업 프로세스에서 실행: 같은 파일의 여러 시트를 분석하여 (시트 순번, 결과) 목록을 반환"""
+    with zipfile.ZipFile(file_path) as zf:
+        return [(index, analyze_sheet(zf, part, matched_strings.get)) for index, part in parts]
+
+
+def _balanced_groups(sizes: List[Tuple[int, int]], count: int) -> List[List[int]]:
+    """(순번, 크기) 를 큰 것부터 가장 가벼운 묶음에 넣어 count 개 이하의 묶음으로 나눕니다."""
+    heap = [(0, group) for group in range(count)]
+    groups: List[List[int]] = [[] for _ in range(count)]
+    for index, size in sorted(sizes, key=lambda item: item[1], reverse=True):
+        total, group = heapq.heappop(heap)
+        groups[group].append(index)
+        heapq.heappush(heap, (total + size, group))
+    return [group for group in groups if group]
+
+
+class SheetAnalyzer:
+    """스트리밍 분석기의 시트 단위 실행기.
+
+    시트 XML 의 압축 해제 크기 합이 parallel_bytes 이상이고 시트가 둘 이상이면 시트를 크기가 고르게
+    max_workers 묶음으로 나누어 프로세스 풀에서 분석하고, 아니면 현재 스레드에서 차례로 분석합니다.
+    작업 프로세스에는 패턴이 있는 공유 문자열만 묶음마다 한 번 넘기며, 각 프로세스가 zip 을 직접 열어
+    자기 시트만 읽습니다. 결과는 항상 시트 순서대로 반환됩니다.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, parallel_bytes: int = 16 * 1024 * 1024):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel_bytes = parallel_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 서버 스레드 상태를 물려받지 않도록 spawn 으로 시작
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def use_parallel(self, sizes: List[int]) -> bool:
+        """시트별 압축 해제 크기로 프로세스 풀을 쓸지 정합니다."""
+        return self.max_workers > 1 and len(sizes) > 1 and sum(sizes) >= self.parallel_bytes
+
+    def analyze(
+        self,
+        file_path: str,
+        zf: zipfile.ZipFile,
+        sheet_parts: List[SheetPart],
+        matched_strings: Dict[int, str],
+        parallel: Optional[bool] = None,
+    ) -> List[SheetResult]:
+        """sheet_parts 순서대로 시트별 분석 결과를 반환합니다. parallel 이 None 이면 크기로 정합니다."""
+        sizes = [zf.getinfo(part.path).file_size for part in sheet_parts]
+        if parallel is None:
+            parallel = self.use_parallel(sizes)
+        if not parallel or len(sheet_parts) < 2:
+            return [analyze_sheet(zf, part.path, matched_strings.get) for part in sheet_parts]
+
+        groups = _balanced_groups(list(enumerate(sizes)), min(self.max_workers, len(sheet_parts)))
+        executor = self._get_executor()
+        futures = [
+            executor.submit(_analyze_sheets, file_path, [(index, sheet_parts[index].path) for index in group], matched_strings)
+            for group in groups
+        ]
+        results: List[Optional[SheetResult]] = [None] * len(sheet_parts)
+        for future in futures:
+            for index, result in future.result():
+                results[index] = result
+        return results
@@ -0,0 +1,442 @@
+import csv
+import html
+import io
+import itertools
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, List, NamedTuple, Optional, Tuple, Union
+
+
+from app.models.excel_models import InputValue
+from app.services.cell_values import is_typed, matches_whole_cell, python_value, shared_string_texts
+from app.services.hashing import FileHashMemo
+from app.services.placeholder import PlaceholderSubstituter
+from app.services.template_plan import normalize_cell_ref
+from app.services.xlsx_reader import (
+    INPUT_PATTERN,
+    SheetPart,
+    column_letter,
+    find_shared_strings_part,
+    iter_sheet_cells,
+    resolve_sheet_parts,
+    split_range_ref,
+)
+
+# 범위를 지정하지 않았을 때 보여 주는 영역 (내용이 없는 뒤쪽 행/열은 잘라냄)
+DEFAULT_PREVIEW_RANGE = "A1:Z50"
+
+_PREFIX = rb'(?:[A-Za-z_][\w.-]*:)?'
+_SHEET_DATA_START = re.compile(rb'<(' + _PREFIX + rb')sheetData\b[^>]*>')
+# 행 여는 태그의 속성
+_ROW_ATTRIBUTES = re.compile(rb'<' + _PREFIX + rb'row(\s[^>]*|/?)>')
+_ROW_NUMBER = re.compile(rb'\br\s*=\s*["\'](\d+)')
+_MERGE_CELL = re.compile(rb'<' + _PREFIX + rb'mergeCell\b[^>]*?\bref\s*=\s*["\']([^"\']+)["\']')
+# 행/mergeCell 여는 태그 하나보다 충분히 긴 길이. 조각 경계에 걸친 태그를 다음 조각과 이어서 찾음
+_TAG_OVERLAP = 2048
+_READ_CHUNK = 256 * 1024
+
+# (min_row, min_column, max_row, max_column)
+Bounds = Tuple[int, int, int, int]
+
+
+class _SharedRef(int):
+    """시트를 읽는 동안 공유 문자열 순번만 기억해 두고, 보이는 영역의 문자열만 나중에 찾기 위한 표시"""
+
+
+class Viewport(NamedTuple):
+    """템플릿 시트 한 영역의 원래 셀 텍스트. 입력값과 무관하므로 캐시하여 입력값만 바꿔 다시 그림"""
+    sheet: str
+    bounds: Bounds
+    # {(행, 열): 텍스트}. 값이 없는 셀은 포함하지 않음
+    cells: Dict[Tuple[int, int], str]
+    # 영역과 겹치는 병합 범위 (min_row, min_column, max_row, max_column)
+    merges: List[Bounds]
+
+
+class SheetPreview(NamedTuple):
+    """입력값을 가상으로 적용한 영역. rows 는 bounds 의 행 x 열 크기이며 빈 셀은 None."""
+    sheet: str
+    bounds: Bounds
+    rows: List[List[Optional[str]]]
+    merges: List[Bounds]
+    # 입력값이 들어간 셀의 (행, 열)
+    filled: List[Tuple[int, int]]
+
+    @property
+    def range_ref(self) -> str:
+        return _range_ref(self.bounds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sheet": self.sheet,
+            "range": self.range_ref,
+            "rows": self.rows,
+            "merges": [_range_ref(merge) for merge in self.merges],
+            "filled": [f"{column_letter(column)}{row}" for row, column in self.filled],
+        }
+
+
+def _range_ref(bounds: Bounds) -> str:
+    min_row, min_column, max_row, max_column = bounds
+    return f"{column_letter(min_column)}{min_row}:{column_letter(max_column)}{max_row}"
+
+
+def parse_bounds(cell_range: str) -> Bounds:
+    """'A1:H30' 을 Bounds 로 변환합니다. 시작과 끝이 뒤바뀐 범위도 허용합니다."""
+    (first_row, first_column), (last_row, last_column) = split_range_ref(cell_range)
+    return (
+        min(first_row, last_row), min(first_column, last_column),
+        max(first_row, last_row), max(first_column, last_column),
+    )
+
+
+def _overlaps(bounds: Bounds, other: Bounds) -> bool:
+    return not (other[2] < bounds[0] or other[0] > bounds[2] or other[3] < bounds[1] or other[1] > bounds[3])
+
+
+def find_sheet_part(zf: zipfile.ZipFile, sheet: Optional[str]) -> SheetPart:
+    """시트 이름(없으면 0부터 시작하는 인덱스 문자열)의 worksheet part. None 이면 첫 시트."""
+    sheets = resolve_sheet_parts(zf)
+    if not sheets:
+        raise KeyError("워크시트가 없습니다.")
+    if sheet is None:
+        return sheets[0]
+    for part in sheets:
+        if part.name == sheet:
+            return part
+    if sheet.isdigit() and int(sheet) < len(sheets):
+        return sheets[int(sheet)]
+    raise KeyError(f"시트를 찾을 수 없습니다: {sheet}")
+
+
+class _SheetStream(io.RawIOBase):
+    """worksheet part 를 읽으면서 first_row 이전 행은 XML 을 해석하지 않고 바이트 검색으로 건너뛰고,
+    내보내는 내용에서 mergeCell 범위를 모으는 읽기 스트림.
+
+    <sheetData> 여는 태그까지는 그대로 내보내므로 이름공간 선언이 유지됩니다. 건너뛴 행 뒤에 r 속성이
+    없는 행이 오면 마지막으로 건너뛴 행 번호의 빈 <row> 를 넣어 이후 행 번호가 어긋나지 않게 합니다.
+    """
+
+    def __init__(self, stream: BinaryIO, first_row: int):
+        self._stream = stream
+        self._first_row = first_row
+        self._output = bytearray()
+        self._skipping = True
+        self._merge_carry = b""
+        self.merges: List[str] = []
+
+    def readable(self) -> bool:
+        return True
+
+    def _read_chunk(self) -> bytes:
+        return self._stream.read(_READ_CHUNK)
+
+    def _skip_rows(self):
+        """<sheetData> 여는 태그까지 내보내고, first_row 이상인 첫 행 또는 </sheetData> 앞까지 버림"""
+        buffer = b""
+        sheet_data = None
+        while sheet_data is None:
+            chunk = self._read_chunk()
+            if not chunk:
+                self._emit(buffer)
+                return
+            buffer += chunk
+            sheet_data = _SHEET_DATA_START.search(buffer)
+        self._output += buffer[:sheet_data.end()]
+        buffer = buffer[sheet_data.end():]
+        if sheet_data.group().endswith(b"/>"):
+            self._emit(buffer)
+            return
+
+        # 행은 <sheetData> 와 같은 이름공간 접두사를 씀
+        prefix = sheet_data.group(1)
+        row_tag = b"<" + prefix + b"row"
+        end_tag = b"</" + prefix + b"sheetData>"
+        last_row = 0
+        while True:
+            end = buffer.find(end_tag)
+            # 조각의 마지막 행도 영역 위쪽이면 조각 안의 행을 하나씩 보지 않고 통째로 버림
+            tail = _last_row_tag(buffer, row_tag)
+            if end < 0 and tail is not None and tail[1] is not None and tail[1] < self._first_row:
+                last_row = tail[1]
+                buffer = buffer[tail[0]:]
+            else:
+                for position, number in _iter_row_tags(buffer, row_tag, end):
+                    if number is not None and number < self._first_row:
+                        last_row = number
+                        continue
+                    if number is None and last_row:
+                        self._output += row_tag + b' r="' + str(last_row).encode() + b'"/>'
+                    self._emit(buffer[position:])
+                    return
+                if end >= 0:
+                    # 영역 안의 행이 없음
+                    self._emit(buffer[end:])
+                    return
+                # 태그가 조각 경계에 걸칠 수 있으므로 끝부분은 남겨 두고 다음 조각을 이어 붙임
+                buffer = buffer[max(len(buffer) - _TAG_OVERLAP, 0):]
+            chunk = self._read_chunk()
+            if not chunk:
+                return
+            buffer += chunk
+
+    def _emit(self, data: bytes):
+        """내보낼 내용을 쌓고 mergeCell 범위를 찾습니다. 조각 경계에 걸친 요소는 다음 조각과 이어서 찾음"""
+        self._output += data
+        buffer = self._merge_carry + data
+        last_end = 0
+        # 병합 범위는 </sheetData> 뒤에만 있으므로 대부분의 조각은 바이트 검색 한 번으로 지나감
+        if b"mergeCell" in buffer:
+            for match in _MERGE_CELL.finditer(buffer):
+                last_end = match.end()
+                self.merges.append(match.group(1).decode("ascii", "replace"))
+        self._merge_carry = buffer[max(last_end, len(buffer) - _TAG_OVERLAP):]
+
+    def read(self, size: int = -1) -> bytes:
+        if self._skipping:
+            self._skipping = False
+            self._skip_rows()
+        while size < 0 or len(self._output) < size:
+            chunk = self._read_chunk()
+            if not chunk:
+                break
+            self._emit(chunk)
+        if size < 0:
+            size = len(self._output)
+        data = bytes(self._output[:size])
+        del self._output[:size]
+        return data
+
+    def drain(self):
+        """나머지 내용을 해석하지 않고 읽어 mergeCell 범위만 모읍니다."""
+        self._output.clear()
+        for chunk in iter(self._read_chunk, b""):
+            self._emit(chunk)
+            self._output.clear()
+
+
+def _row_tag_at(buffer: bytes, position: int) -> Optional[Tuple[int, Optional[int]]]:
+    """position 의 행 여는 태그의 (위치, 행 번호). 태그가 조각 끝에서 잘렸거나 행 태그가 아니면 None"""
+    close = buffer.find(b">", position)
+    if close < 0:
+        return None
+    match = _ROW_ATTRIBUTES.match(buffer, position, close + 1)
+    if match is None:
+        return None
+    number = _ROW_NUMBER.search(match.group(1))
+    return position, (int(number.group(1)) if number is not None else None)
+
+
+def _last_row_tag(buffer: bytes, row_tag: bytes) -> Optional[Tuple[int, Optional[int]]]:
+    position = buffer.rfind(row_tag)
+    while position >= 0:
+        tag = _row_tag_at(buffer, position)
+        if tag is not None:
+            return tag
+        position = buffer.rfind(row_tag, 0, position)
+    return None
+
+
+def _iter_row_tags(buffer: bytes, row_tag: bytes, end: int):
+    """buffer 에서 end(음수면 끝까지) 앞에 있는 행 여는 태그의 (위치, 행 번호)"""
+    limit = end if end >= 0 else len(buffer)
+    position = buffer.find(row_tag, 0, limit)
+    while position >= 0:
+        tag = _row_tag_at(buffer, position)
+        if tag is not None:
+            yield tag
+        position = buffer.find(row_tag, position + 1, limit)
+
+
+def read_viewport(zf: zipfile.ZipFile, sheet: Optional[str], bounds: Bounds) -> Viewport:
+    """시트의 bounds 영역 셀 텍스트와 병합 범위를 읽습니다.
+
+    영역 위쪽 행은 바이트 검색으로 건너뛰고, 영역의 마지막 행을 지나면 셀 해석을 멈추고 나머지는
+    병합 범위만 찾습니다. 공유 문자열은 영역 안의 셀이 가리키는 순번까지만 읽습니다.
+    수식 셀은 저장된 계산 결과를 보여 줍니다.
+    """
+    sheet_part = find_sheet_part(zf, sheet)
+    min_row, min_column, max_row, max_column = bounds
+
+    cells: Dict[Tuple[int, int], Union[str, _SharedRef]] = {}
+    with zf.open(sheet_part.path) as raw:
+        stream = _SheetStream(raw, min_row)
+        for record in iter_sheet_cells(zf, sheet_part.path, _SharedRef, formulas=False, stream=stream):
+            if record.row > max_row:
+                break
+            if record.row < min_row or not min_column <= record.column <= max_column or record.value is None:
+                continue
+            if record.data_type == "b":
+                cells[(record.row, record.column)] = "TRUE" if record.value == "1" else "FALSE"
+            else:
+                cells[(record.row, record.column)] = record.value
+        stream.drain()
+
+    shared_text = None
+    shared_strings_part = find_shared_strings_part(zf)
+    if shared_strings_part is not None and any(isinstance(value, _SharedRef) for value in cells.values()):
+        # ElementTree 로 항목마다 해석하는 것보다 정규식으로 필요한 순번까지 건너뛰는 편이 빠름
+        shared_text = shared_string_texts(zf.read(shared_strings_part).decode("utf-8"))
+    resolved = {
+        position: ((shared_text(value) or "") if isinstance(value, _SharedRef) else value)
+        for position, value in cells.items()
+    }
+
+    merges = []
+    for ref in stream.merges:
+        try:
+            merge = parse_bounds(ref)
+        except ValueError:
+            continue
+        if _overlaps(bounds, merge):
+            merges.append(merge)
+    return Viewport(sheet_part.name, bounds, resolved, merges)
+
+
+def _trimmed(viewport: Viewport) -> Viewport:
+    """내용도 병합도 없는 뒤쪽 행/열을 잘라낸 영역 (범위를 지정하지 않은 미리보기용)"""
+    min_row, min_column, max_row, max_column = viewport.bounds
+    last_row, last_column = min_row, min_column
+    for row, column in viewport.cells:
+        last_row, last_column = max(last_row, row), max(last_column, column)
+    for merge in viewport.merges:
+        last_row, last_column = max(last_row, min(merge[2], max_row)), max(last_column, min(merge[3], max_column))
+    return viewport._replace(bounds=(min_row, min_column, last_row, last_column))
+
+
+def _display_value(input_value: InputValue) -> str:
+    """형식을 지정한 입력값을 셀에 보이는 텍스트로 (수식은 계산하지 않고 그대로 표시)"""
+    value = python_value(input_value)
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if input_value.type == "date":
+        return value.isoformat(sep=" ") if hasattr(value, "hour") else value.isoformat()
+    return str(value)
+
+
+def apply_values(
+    viewport: Viewport,
+    values: Union[Dict[str, str], List[InputValue]],
+) -> SheetPreview:
+    """영역의 셀 텍스트에 입력값을 적용합니다. 파일을 만들지 않고 채우기와 같은 규칙을 따릅니다.
+
+    InputValue 목록은 가리키는 셀에만, {패턴: 값} 은 패턴이 있는 모든 셀에 적용됩니다. 형식을
+    지정한 값은 셀 전체가 placeholder 일 때만 그 형식으로 표시되고, 그 밖에는 텍스트로 치환됩니다.
+    """
+    by_cell: Dict[str, List[InputValue]] = {}
+    everywhere: Optional[PlaceholderSubstituter] = None
+    if isinstance(values, dict):
+        everywhere = PlaceholderSubstituter(values.items())
+    else:
+        for input_value in values:
+            if input_value.sheet == viewport.sheet:
+                by_cell.setdefault(normalize_cell_ref(input_value.cell), []).append(input_value)
+
+    min_row, min_column, max_row, max_column = viewport.bounds
+    rows: List[List[Optional[str]]] = [[None] * (max_column - min_column + 1) for _ in range(max_row - min_row + 1)]
+    filled = []
+    for (row, column), text in viewport.cells.items():
+        if row > max_row or column > max_column:
+            continue
+        new_text = text
+        if everywhere is not None:
+            new_text = everywhere.sub(text)
+        else:
+            cell_values = by_cell.get(f"{column_letter(column)}{row}")
+            if cell_values:
+                typed = next(
+                    (value for value in cell_values if is_typed(value) and matches_whole_cell(text, value.pattern)), None
+                )
+                if typed is not None:
+                    new_text = _display_value(typed)
+                else:
+                    # 셀 자신의 값이 우선이고 그 셀의 나머지 패턴은 요청 전체의 값으로
+                    new_text = PlaceholderSubstituter.from_input_values(itertools.chain(cell_values, values)).sub(text)
+        if new_text != text:
+            filled.append((row, column))
+        rows[row - min_row][column - min_column] = new_text
+    filled.sort()
+    return SheetPreview(viewport.sheet, viewport.bounds, rows, viewport.merges, filled)
+
+
+def render_csv(preview: SheetPreview) -> str:
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    for row in preview.rows:
+        writer.writerow(["" if value is None else value for value in row])
+    return output.getvalue()
+
+
+def render_html(preview: SheetPreview) -> str:
+    """병합 범위를 colspan/rowspan 으로 나타낸 <table>. 입력값이 들어간 셀은 class="filled",
+    아직 채워지지 않은 placeholder 가 남은 셀은 class="placeholder" 입니다."""
+    min_row, min_column, max_row, max_column = preview.bounds
+    spans: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    covered = set()
+    for top, left, bottom, right in preview.merges:
+        # 영역 밖에서 시작한 병합은 영역 안의 첫 셀을 기준으로 자름
+        top, left = max(top, min_row), max(left, min_column)
+        bottom, right = min(bottom, max_row), min(right, max_column)
+        spans[(top, left)] = (bottom - top + 1, right - left + 1)
+        covered.update((row, column) for row in range(top, bottom + 1) for column in range(left, right + 1))
+    filled = set(preview.filled)
+
+    lines = [f'<table class="excel-preview" data-sheet="{html.escape(preview.sheet)}" data-range="{preview.range_ref}">']
+    lines.append("<tr><th></th>" + "".join(
+        f"<th>{column_letter(column)}</th>" for column in range(min_column, max_column + 1)
+    ) + "</tr>")
+    for row_offset, values in enumerate(preview.rows):
+        row = min_row + row_offset
+        cells = [f"<th>{row}</th>"]
+        for column_offset, value in enumerate(values):
+            position = (row, min_column + column_offset)
+            if position in covered and position not in spans:
+                continue
+            attributes = ""
+            if position in spans:
+                row_span, column_span = spans[position]
+                attributes += f' rowspan="{row_span}"' if row_span > 1 else ""
+                attributes += f' colspan="{column_span}"' if column_span > 1 else ""
+            if position in filled:
+                attributes += ' class="filled"'
+            elif value and INPUT_PATTERN.search(value):
+                attributes += ' class="placeholder"'
+            text = "" if value is None else html.escape(value).replace("\n", "<br>")
+            cells.append(f"<td{attributes}>{text}</td>")
+        lines.append("<tr>" + "".join(cells) + "</tr>")
+    lines.append("</table>")
+    return "\n".join(lines)
+
+
+class ViewportCache:
+    """(파일 내용 해시, 시트, 범위) 를 키로 Viewport 를 보관하는 LRU 캐시.
+
+    입력값을 바꿔 가며 같은 영역을 반복해서 미리 보는 경우 템플릿은 처음 한 번만 읽습니다.
+    """
+
+    def __init__(self, max_entries: int = 64, hashes: Optional[FileHashMemo] = None):
+        self.max_entries = max_entries
+        self._hashes = hashes or FileHashMemo()
+        self._entries: "OrderedDict[Tuple[str, Optional[str], Bounds, bool], Viewport]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str, sheet: Optional[str], bounds: Bounds, trim: bool = False) -> Viewport:
+        key = (self._hashes.get(file_path), sheet, bounds, trim)
+        with self._lock:
+            viewport = self._entries.get(key)
+            if viewport is not None:
+                self._entries.move_to_end(key)
+                return viewport
+
+        with zipfile.ZipFile(file_path) as zf:
+            viewport = read_viewport(zf, sheet, bounds)
+        if trim:
+            viewport = _trimmed(viewport)
+
+        with self._lock:
+            self._entries[key] = viewport
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return viewport
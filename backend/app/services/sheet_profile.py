@@ -0,0 +1,137 @@
+import functools
+import importlib.metadata
+import zipfile
+from typing import Any, Dict, List, Set
+
+from app.services.xlsx_reader import CellRecord, iter_sheet_cells, iter_shared_strings, resolve_sheet_parts
+
+
+@functools.lru_cache(maxsize=None)
+def _string_dtype() -> str:
+    """문자열 열의 dtype 이름. pandas 3 부터는 "str", 그 이전은 "object" 입니다."""
+    # pandas 를 가져오지 않고 설치된 버전만 확인
+    try:
+        major = int(importlib.metadata.version("pandas").split(".")[0])
+    except (importlib.metadata.PackageNotFoundError, ValueError):
+        return "object"
+    return "str" if major >= 3 else "object"
+
+
+def _convert_value(cell: CellRecord) -> Any:
+    """캐시된 셀 값을 pandas.read_excel 이 보는 값으로 변환합니다. 빈 값은 None."""
+    if cell.value is None or cell.data_type == "e":
+        return None
+    if cell.data_type == "s":
+        return cell.value if cell.value != "" else None
+    if cell.data_type == "b":
+        return cell.value not in ("0", "false")
+    if cell.data_type == "d":
+        return cell.value
+    try:
+        number = float(cell.value)
+    except ValueError:
+        return cell.value
+    return int(number) if number.is_integer() else number
+
+
+def _kind(value: Any, data_type: str) -> str:
+    if data_type == "d":
+        return "datetime"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "object"
+
+
+class SheetProfiler:
+    """셀 스트림에서 pandas.read_excel(header=0) 과 같은 기준으로 shape/columns/dtypes 를 계산합니다.
+
+    pandas 와 마찬가지로 1행을 헤더로, 마지막으로 값이 있는 행까지를 데이터로 보고 A열부터
+    값이 있는 마지막 열까지를 열로 셉니다. 열 단위로 값의 종류와 개수만 모으므로 메모리
+    사용량은 열 수에 비례합니다. 날짜 서식이 적용된 숫자 셀은 스타일을 읽지 않으므로
+    숫자로 분류됩니다.
+    """
+
+    def __init__(self):
+        self.header: Dict[int, Any] = {}
+        self.last_row = 0
+        self.width = 0
+        self.kinds: Dict[int, Set[str]] = {}
+        self.counts: Dict[int, int] = {}
+
+    def add(self, cell: CellRecord):
+        value = _convert_value(cell)
+        if value is None:
+            return
+
+        self.last_row = max(self.last_row, cell.row)
+        self.width = max(self.width, cell.column)
+        if cell.row == 1:
+            self.header[cell.column] = value
+            return
+
+        self.kinds.setdefault(cell.column, set()).add(_kind(value, cell.data_type))
+        self.counts[cell.column] = self.counts.get(cell.column, 0) + 1
+
+    @property
+    def data_rows(self) -> int:
+        return max(self.last_row - 1, 0)
+
+    def _columns(self) -> List[Any]:
+        columns = []
+        seen: Dict[Any, int] = {}
+        for column in range(1, self.width + 1):
+            name = self.header.get(column, f"Unnamed: {column - 1}")
+            # pandas 와 같이 중복된 열 이름에는 .1, .2 를 붙임
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            columns.append(name)
+        return columns
+
+    def _dtype(self, column: int) -> str:
+        kinds = self.kinds.get(column, set())
+        has_missing = self.counts.get(column, 0) < self.data_rows
+        if not self.data_rows:
+            return "object"
+        if not kinds:
+            return "float64"
+        if kinds == {"int"}:
+            return "float64" if has_missing else "int64"
+        if kinds <= {"int", "float"}:
+            return "float64"
+        if kinds == {"bool"} and not has_missing:
+            return "bool"
+        if kinds == {"datetime"}:
+            return "datetime64[ns]"
+        if kinds == {"object"}:
+            return _string_dtype()
+        return "object"
+
+    def result(self) -> Dict[str, Any]:
+        columns = self._columns()
+        return {
+            "shape": (self.data_rows, len(columns)),
+            "columns": columns,
+            "dtypes": {str(name): self._dtype(index + 1) for index, name in enumerate(columns)},
+        }
+
+
+def profile_workbook_stream(file_path: str) -> Dict[str, Dict[str, Any]]:
+    """openpyxl/pandas 없이 시트 XML 을 스트리밍으로 읽어 시트별 프로필을 계산합니다."""
+    profiles = {}
+    with zipfile.ZipFile(file_path) as zf:
+        shared_strings = list(iter_shared_strings(zf))
+        lookup = lambda index: shared_strings[index] if index < len(shared_strings) else None
+
+        for sheet_name, part in resolve_sheet_parts(zf):
+            profiler = SheetProfiler()
+            for cell in iter_sheet_cells(zf, part, lookup, formulas=False):
+                profiler.add(cell)
+            profiles[sheet_name] = profiler.result()
+    return profiles
@@ -0,0 +1,338 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from app.services.hashing import HASH_CHUNK_SIZE
+
+STORAGE_BACKENDS = ("local", "memory", "s3")
+
+
+class StoredObject(NamedTuple):
+    size: int
+    etag: str
+    modified: float
+
+
+class StorageBackend:
+    """업로드/처리 결과 파일을 보관하는 저장소 인터페이스.
+
+    키는 'ab/upload_<id>.xlsx' 와 같은 '/' 구분 경로입니다. 읽기/쓰기는 모두 청크 단위로
+    스트리밍하므로 파일 전체를 메모리에 올리지 않습니다.
+    """
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) is not None
+
+    def open_read(self, key: str) -> BinaryIO:
+        """키의 내용을 읽는 파일 객체. 없으면 FileNotFoundError."""
+        raise NotImplementedError
+
+    def iter_chunks(
+        self,
+        key: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = HASH_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """offset 부터 length 바이트(None 이면 끝까지)를 청크 단위로 읽습니다."""
+        with self.open_read(key) as f:
+            if offset:
+                f.seek(offset)
+            yield from _read_chunks(f, length, chunk_size)
+
+    def put_file(self, key: str, file_path: str):
+        """로컬 파일 file_path 의 내용을 key 로 저장합니다."""
+        raise NotImplementedError
+
+    def download_to(self, key: str, file_path: str):
+        """key 의 내용을 file_path 로 내려받습니다. 임시 파일에 쓴 뒤 교체합니다."""
+        temp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with self.open_read(key) as source, open(temp_path, "wb") as target:
+                shutil.copyfileobj(source, target, HASH_CHUNK_SIZE)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def delete(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """내용이 그대로 로컬 파일로 있으면 그 경로, 아니면 None."""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """root 디렉터리 아래에 키 그대로 저장하는 로컬 파일 시스템 저장소."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            st = os.stat(self._path(key))
+        except OSError:
+            return None
+        return StoredObject(st.st_size, f'"{st.st_mtime_ns:x}-{st.st_size:x}"', st.st_mtime)
+
+    def open_read(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def put_file(self, key: str, file_path: str):
+        path = self._path(key)
+        if os.path.abspath(file_path) == path:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        shutil.copyfile(file_path, temp_path)
+        os.replace(temp_path, path)
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+
+class MemoryStorage(StorageBackend):
+    """프로세스 메모리에 보관하는 저장소. 테스트와 단일 프로세스 실행용입니다."""
+
+    def __init__(self):
+        self._objects: Dict[str, Tuple[bytes, StoredObject]] = {}
+        self._lock = threading.Lock()
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        entry = self._objects.get(key)
+        return entry[1] if entry is not None else None
+
+    def open_read(self, key: str) -> BinaryIO:
+        entry = self._objects.get(key)
+        if entry is None:
+            raise FileNotFoundError(key)
+        return io.BytesIO(entry[0])
+
+    def put_file(self, key: str, file_path: str):
+        with open(file_path, "rb") as f:
+            content = f.read()
+        info = StoredObject(len(content), f'"{hashlib.md5(content).hexdigest()}"', time.time())
+        with self._lock:
+            self._objects[key] = (content, info)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._objects.pop(key, None) is not None
+
+
+class S3Storage(StorageBackend):
+    """S3 호환 객체 저장소. client 는 boto3 S3 클라이언트와 같은 메소드를 제공하면 됩니다.
+
+    여러 API 서버가 디스크를 공유하지 않고도 템플릿과 결과 파일을 함께 쓸 수 있습니다.
+    """
+
+    def __init__(self, client, bucket: str, prefix: str = ""):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    @staticmethod
+    def _is_not_found(error: Exception) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except Exception as e:
+            if self._is_not_found(e):
+                return None
+            raise
+        return StoredObject(head["ContentLength"], head["ETag"], head["LastModified"].timestamp())
+
+    def open_read(self, key: str) -> BinaryIO:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"]
+        except Exception as e:
+            if self._is_not_found(e):
+                raise FileNotFoundError(key)
+            raise
+
+    def iter_chunks(
+        self,
+        key: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = HASH_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        if not offset and length is None:
+            body = self.open_read(key)
+        else:
+            # 필요한 구간만 받도록 Range 요청
+            end = "" if length is None else offset + length - 1
+            try:
+                body = self.client.get_object(Bucket=self.bucket, Key=self._key(key), Range=f"bytes={offset}-{end}")["Body"]
+            except Exception as e:
+                if self._is_not_found(e):
+                    raise FileNotFoundError(key)
+                raise
+        with body:
+            yield from _read_chunks(body, length, chunk_size)
+
+    def put_file(self, key: str, file_path: str):
+        # upload_fileobj 는 큰 파일을 멀티파트로 나누어 스트리밍 업로드함
+        with open(file_path, "rb") as f:
+            self.client.upload_fileobj(f, self.bucket, self._key(key))
+
+    def delete(self, key: str) -> bool:
+        if self.stat(key) is None:
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+        return True
+
+
+class ObjectStoreError(Exception):
+    """botocore ClientError 와 같은 모양의 response 를 갖는 오류"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.response = {"Error": {"Code": code, "Message": message}}
+
+
+class LocalObjectStoreClient:
+    """로컬 디렉터리를 버킷으로 쓰는 S3 클라이언트 대용품.
+
+    S3Storage 가 사용하는 boto3 메소드만 구현하며, 외부 서비스 없이 S3 백엔드를 실행하거나
+    여러 프로세스가 같은 디렉터리를 객체 저장소로 공유할 때 사용합니다.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _paths(self, bucket: str, key: str) -> Tuple[str, str]:
+        # '..' 이 들어간 키로 버킷 밖을 가리키지 않도록 정규화한 뒤 확인
+        path = os.path.abspath(os.path.join(self.root, bucket, *key.split("/")))
+        if not path.startswith(os.path.join(self.root, bucket) + os.sep):
+            raise ObjectStoreError("InvalidKey", key)
+        return path, f"{path}.meta.json"
+
+    def head_object(self, Bucket: str, Key: str) -> Dict:
+        path, meta_path = self._paths(Bucket, Key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            size = os.path.getsize(path)
+        except OSError:
+            raise ObjectStoreError("404", "Not Found")
+        return {
+            "ContentLength": size,
+            "ETag": meta["ETag"],
+            "LastModified": datetime.fromtimestamp(meta["LastModified"], timezone.utc),
+        }
+
+    def get_object(self, Bucket: str, Key: str, Range: Optional[str] = None) -> Dict:
+        head = self.head_object(Bucket, Key)
+        path, _ = self._paths(Bucket, Key)
+        try:
+            body = open(path, "rb")
+        except OSError:
+            raise ObjectStoreError("NoSuchKey", "The specified key does not exist.")
+        if Range is None:
+            return dict(head, Body=body)
+
+        # 'bytes=start-end' 형식의 단일 구간만 지원
+        start, _, end = Range[len("bytes="):].partition("-")
+        start = int(start)
+        end = min(int(end), head["ContentLength"] - 1) if end else head["ContentLength"] - 1
+        with body:
+            body.seek(start)
+            data = body.read(end - start + 1)
+        return dict(head, Body=io.BytesIO(data), ContentLength=len(data))
+
+    def upload_fileobj(self, Fileobj: BinaryIO, Bucket: str, Key: str):
+        path, meta_path = self._paths(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        digest = hashlib.md5()
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                for chunk in iter(lambda: Fileobj.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    f.write(chunk)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        with open(f"{meta_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"ETag": f'"{digest.hexdigest()}"', "LastModified": time.time()}, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def delete_object(self, Bucket: str, Key: str) -> Dict:
+        path, meta_path = self._paths(Bucket, Key)
+        for target in (meta_path, path):
+            try:
+                os.remove(target)
+            except FileNotFoundError:
+                pass
+        return {}
+
+
+def _read_chunks(fileobj: BinaryIO, length: Optional[int], chunk_size: int) -> Iterator[bytes]:
+    remaining = length
+    while remaining is None or remaining > 0:
+        chunk = fileobj.read(chunk_size if remaining is None else min(chunk_size, remaining))
+        if not chunk:
+            return
+        if remaining is not None:
+            remaining -= len(chunk)
+        yield chunk
+
+
+def create_storage(
+    backend: str,
+    root: str,
+    bucket: str = "",
+    prefix: str = "",
+    endpoint_url: str = "",
+) -> StorageBackend:
+    """설정 값으로 저장소를 만듭니다.
+
+    s3 백엔드의 endpoint_url 이 'file://' 로 시작하면 해당 디렉터리를 쓰는
+    LocalObjectStoreClient 를, 아니면 boto3 클라이언트를 사용합니다.
+    """
+    if backend == "local":
+        return LocalStorage(root)
+    if backend == "memory":
+        return MemoryStorage()
+    if backend == "s3":
+        if not bucket:
+            raise ValueError("S3 저장소에는 S3_BUCKET 설정이 필요합니다.")
+        if endpoint_url.startswith("file://"):
+            return S3Storage(LocalObjectStoreClient(endpoint_url[len("file://"):]), bucket, prefix)
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("S3 저장소를 사용하려면 boto3 를 설치해야 합니다: pip install boto3")
+        return S3Storage(boto3.client("s3", endpoint_url=endpoint_url or None), bucket, prefix)
+    raise ValueError(f"지원하지 않는 저장소입니다: {backend}")
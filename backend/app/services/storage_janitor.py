@@ -0,0 +1,262 @@
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 파일 이름 접두사로 구분하는 저장 파일 종류 (index_ 는 업로드 옆의 placeholder 색인)
+FILE_CLASSES = ("upload_", "processed_", "batch_", "index_")
+
+_SHARD_NAME = re.compile(r'[0-9a-zA-Z]{2}')
+_TEMP_SUFFIX = ".tmp"
+_LEGACY_TEMP_DIR_PREFIX = "temp_"
+
+
+def shard_name(file_id: str) -> str:
+    """file_id 앞 두 글자로 하위 디렉터리 이름을 정합니다. 경로로 쓸 수 없는 값은 '__'."""
+    prefix = file_id[:2]
+    return prefix.lower() if _SHARD_NAME.fullmatch(prefix) else "__"
+
+
+def file_class(filename: str) -> Optional[str]:
+    for prefix in FILE_CLASSES:
+        if filename.startswith(prefix) and not filename.endswith(_TEMP_SUFFIX):
+            return prefix
+    return None
+
+
+class StorageJanitor:
+    """업로드 디렉터리의 파일 수명을 관리하는 백그라운드 정리기.
+
+    - 종류별 TTL: 마지막 사용 후 ttls[종류] 초가 지나면 삭제 (0 이면 만료 없음)
+    - 용량 한도: 전체 크기가 quota_bytes 를 넘으면 가장 오래 사용하지 않은 파일부터 삭제
+    - 고아 임시 파일: temp_grace 초 이상 지난 *.tmp 파일과 예전 temp_<id> 디렉터리 삭제
+
+    마지막 사용 시각은 touch() 가 기록하는 atime 과 mtime 중 늦은 값입니다. mtime 은 바꾸지
+    않으므로 내용 해시 캐시(FileHashMemo)가 무효화되지 않습니다.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        ttls: Optional[Dict[str, int]] = None,
+        quota_bytes: int = 0,
+        interval: int = 300,
+        temp_grace: int = 900,
+        on_evict: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.root = os.path.abspath(root)
+        self.ttls = dict(ttls or {})
+        self.quota_bytes = quota_bytes
+        self.interval = interval
+        self.temp_grace = temp_grace
+        self.on_evict = on_evict
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sweep_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "sweeps": 0,
+            "last_sweep_at": None,
+            "last_sweep_seconds": None,
+            "files": 0,
+            "bytes": 0,
+            "reclaimed_files": 0,
+            "reclaimed_bytes": 0,
+            "reclaimed": {reason: {"files": 0, "bytes": 0} for reason in ("ttl", "quota", "orphan")},
+        }
+
+    def path_for(self, filename: str, file_id: str) -> str:
+        return os.path.join(self.root, shard_name(file_id), filename)
+
+    def touch(self, path: str):
+        """파일을 방금 사용한 것으로 표시합니다 (atime 만 갱신). 업로드 디렉터리 밖은 무시."""
+        if not os.path.abspath(path).startswith(self.root + os.sep):
+            return
+        try:
+            os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+        except OSError:
+            pass
+
+    def start(self):
+        """예전 평면 구조의 파일을 하위 디렉터리로 옮기고 정리 스레드를 시작합니다."""
+        self.migrate_flat_files()
+        if self.interval > 0 and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="storage-janitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        # 시작 직후 한 번 정리하여 이전 실행에서 남은 임시 파일을 지움
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Storage sweep failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def migrate_flat_files(self) -> int:
+        """root 바로 아래에 있는 upload_/processed_/batch_ 파일을 하위 디렉터리로 옮깁니다."""
+        moved = 0
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return 0
+        for entry in entries:
+            prefix = file_class(entry.name)
+            if prefix is None or not entry.is_file(follow_symlinks=False):
+                continue
+            target = self.path_for(entry.name, entry.name[len(prefix):])
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.replace(entry.path, target)
+                moved += 1
+            except OSError:
+                pass
+        return moved
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """한 번 정리하고 이번에 삭제한 파일 수/크기를 반환합니다."""
+        with self._sweep_lock:
+            started = time.monotonic()
+            now = time.time() if now is None else now
+            reclaimed = {"files": 0, "bytes": 0}
+
+            files, orphans = self._scan(now)
+
+            for path, size, is_dir in orphans:
+                if self._remove(path, is_dir):
+                    self._record("orphan", size, reclaimed)
+
+            kept: List[Tuple[float, int, str, str]] = []
+            for last_used, size, path, prefix in files:
+                ttl = self.ttls.get(prefix, 0)
+                if ttl and now - last_used > ttl:
+                    if self._evict(path, prefix):
+                        self._record("ttl", size, reclaimed)
+                    continue
+                kept.append((last_used, size, path, prefix))
+
+            total = sum(size for _, size, _, _ in kept)
+            if self.quota_bytes and total > self.quota_bytes:
+                # 가장 오래 사용하지 않은 파일부터 한도 아래로 내려갈 때까지 삭제
+                kept.sort()
+                remaining = []
+                for index, (last_used, size, path, prefix) in enumerate(kept):
+                    if total <= self.quota_bytes:
+                        remaining.extend(kept[index:])
+                        break
+                    if self._evict(path, prefix):
+                        total -= size
+                        self._record("quota", size, reclaimed)
+                    else:
+                        remaining.append((last_used, size, path, prefix))
+                kept = remaining
+
+            with self._stats_lock:
+                self._stats["sweeps"] += 1
+                self._stats["last_sweep_at"] = now
+                self._stats["last_sweep_seconds"] = round(time.monotonic() - started, 3)
+                self._stats["files"] = len(kept)
+                self._stats["bytes"] = total
+            return reclaimed
+
+    def _scan(self, now: float) -> Tuple[List[Tuple[float, int, str, str]], List[Tuple[str, int, bool]]]:
+        files = []
+        orphans = []
+        for directory in self._directories():
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.name.endswith(_TEMP_SUFFIX) and entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        if now - stat.st_mtime > self.temp_grace:
+                            orphans.append((entry.path, stat.st_size, False))
+                    elif (
+                        directory == self.root
+                        and entry.name.startswith(_LEGACY_TEMP_DIR_PREFIX)
+                        and entry.is_dir(follow_symlinks=False)
+                    ):
+                        stat = entry.stat(follow_symlinks=False)
+                        if now - stat.st_mtime > self.temp_grace:
+                            orphans.append((entry.path, _tree_size(entry.path), True))
+                    elif directory != self.root:
+                        prefix = file_class(entry.name)
+                        if prefix is not None and entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            last_used = max(stat.st_atime, stat.st_mtime)
+                            files.append((last_used, stat.st_size, entry.path, prefix))
+                except OSError:
+                    continue
+        return files, orphans
+
+    def _directories(self) -> List[str]:
+        directories = [self.root]
+        try:
+            for entry in os.scandir(self.root):
+                if entry.is_dir(follow_symlinks=False) and not entry.name.startswith(_LEGACY_TEMP_DIR_PREFIX):
+                    directories.append(entry.path)
+        except OSError:
+            pass
+        return directories
+
+    def _evict(self, path: str, prefix: str) -> bool:
+        if not self._remove(path, False):
+            return False
+        if self.on_evict is not None:
+            try:
+                self.on_evict(path, prefix)
+            except Exception as e:
+                print(f"Storage eviction callback failed: {e}")
+        return True
+
+    @staticmethod
+    def _remove(path: str, is_dir: bool) -> bool:
+        try:
+            if is_dir:
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"Failed to remove {path}: {e}")
+            return False
+
+    def _record(self, reason: str, size: int, reclaimed: Dict[str, int]):
+        reclaimed["files"] += 1
+        reclaimed["bytes"] += size
+        with self._stats_lock:
+            self._stats["reclaimed_files"] += 1
+            self._stats["reclaimed_bytes"] += size
+            self._stats["reclaimed"][reason]["files"] += 1
+            self._stats["reclaimed"][reason]["bytes"] += size
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats["reclaimed"] = {reason: dict(values) for reason, values in self._stats["reclaimed"].items()}
+        return stats
+
+
+def _tree_size(path: str) -> int:
+    total = 0
+    for directory, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(directory, filename))
+            except OSError:
+                pass
+    return total
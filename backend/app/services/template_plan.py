@@ -0,0 +1,630 @@
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from bisect import bisect_left
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from app.models.excel_models import InputValue
+from app.services.cell_values import (
+    DateStyles,
+    cell_text,
+    inline_string_cell,
+    is_date1904,
+    is_typed,
+    matches_whole_cell,
+    retype_cell,
+    set_full_calc_on_load,
+)
+from app.services.hashing import FileHashMemo, file_content_hash
+from app.services.metrics import metrics
+from app.services.placeholder import escape_xml_text
+from app.services.placeholder_index import PlaceholderIndexStore
+from app.services.rich_text import item_text, join_split_matches
+from app.services.xlsx_reader import find_shared_strings_part, find_styles_part, find_workbook_part, resolve_sheet_parts
+from app.services.xlsx_zip import ChunkSink, RawMember, ZipStreamWriter, deflate_member, inflate_member, read_raw_member
+
+# 단어 중간(myinput1)의 input 은 placeholder 가 아님 (PlaceholderSubstituter 와 같은 규칙)
+PLACEHOLDER_TOKEN = re.compile(r'(?<![A-Za-z0-9_])input\d+', re.IGNORECASE)
+_PLACEHOLDER_TOKEN_BYTES = re.compile(rb'(?<![A-Za-z0-9_])input\d+', re.IGNORECASE)
+
+# 생성기에 따라 'x:' 같은 네임스페이스 접두사가 붙을 수 있음
+_PREFIX = rb'(?:[A-Za-z_][\w.-]*:)?'
+_SHEET_DATA = re.compile(rb'<' + _PREFIX + rb'sheetData\b[^>]*?(?:/>|>(.*?)</' + _PREFIX + rb'sheetData>)', re.DOTALL)
+_CELL = re.compile(rb'<' + _PREFIX + rb'c\b([^>]*?)(?:/>|>(.*?)</' + _PREFIX + rb'c>)', re.DOTALL)
+_SHARED_STRING = re.compile(rb'<' + _PREFIX + rb'si\b[^>]*?(?:/>|>(.*?)</' + _PREFIX + rb'si>)', re.DOTALL)
+_CELL_VALUE = re.compile(rb'<' + _PREFIX + rb'v>\s*(\d+)\s*</' + _PREFIX + rb'v>')
+# 서식 있는 텍스트의 run. <rPr>, <rFont> 와 구분되도록 이름 뒤에 단어 경계를 둠
+_RUN = re.compile(rb'<' + _PREFIX + rb'r\b[^>]*?(?:/>|>.*?</' + _PREFIX + rb'r>)', re.DOTALL)
+_RUN_START = re.compile(rb'<' + _PREFIX + rb'r[\s>]')
+_ATTRIBUTE = re.compile(rb'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+
+class TemplatePlanMiss(Exception):
+    """컴파일된 템플릿으로 처리할 수 없는 요청 (다른 처리 경로로 넘겨야 함)"""
+
+
+def normalize_cell_ref(ref: str) -> str:
+    return ref.replace("$", "").strip().upper()
+
+
+def _read_part(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """part 내용. 서식 있는 텍스트에서 여러 run 에 나뉜 placeholder 는 시작 run 으로 모아 토큰 하나로 만듭니다."""
+    content = zf.read(info)
+    if not _RUN_START.search(content):
+        return content
+    text = content.decode("utf-8")
+    joined = join_split_matches(text, PLACEHOLDER_TOKEN)
+    return content if joined is text else joined.encode("utf-8")
+
+
+def _attributes(raw: bytes) -> Dict[bytes, bytes]:
+    return {match.group(1): match.group(2) if match.group(2) is not None else match.group(3)
+            for match in _ATTRIBUTE.finditer(raw)}
+
+
+class CompiledPart:
+    """placeholder 위치를 미리 계산해 둔 XML part.
+
+    segments[i] 와 segments[i + 1] 사이에 tokens[i] 가 위치합니다. runs[i] 는 토큰이 서식 있는
+    텍스트의 몇 번째 <r> 안에 있는지이며, run 이 없는 텍스트이면 -1 입니다.
+    """
+
+    def __init__(self, raw: RawMember, content: bytes):
+        self.raw = raw
+        self.segments: List[bytes] = []
+        self.tokens: List[str] = []
+        self.offsets: List[int] = []
+
+        position = 0
+        for match in _PLACEHOLDER_TOKEN_BYTES.finditer(content):
+            self.segments.append(content[position:match.start()])
+            self.tokens.append(match.group().decode("ascii").lower())
+            self.offsets.append(match.start())
+            position = match.end()
+        self.segments.append(content[position:])
+        self.runs: List[int] = [-1] * len(self.tokens)
+        # 치환하지 않는 토큰은 원래 표기를 그대로 복원하기 위해 보관
+        self._originals = [content[offset:offset + len(token)] for offset, token in zip(self.offsets, self.tokens)]
+
+    @property
+    def name(self) -> str:
+        return self.raw.name
+
+    @property
+    def size(self) -> int:
+        return len(self.raw.data) + sum(len(segment) for segment in self.segments)
+
+    def occurrences_between(self, start: int, end: int) -> List[int]:
+        """[start, end) 바이트 범위에 있는 토큰의 순번 목록"""
+        first = bisect_left(self.offsets, start)
+        last = bisect_left(self.offsets, end)
+        return list(range(first, last))
+
+    def record_runs(self, content: bytes, start: int, end: int, occurrences: List[int]):
+        """[start, end) 범위(<si> 또는 <c>)의 <r> 위치로 occurrences 토큰의 run 순번을 기록합니다."""
+        runs = [(match.start(), match.end()) for match in _RUN.finditer(content, start, end)]
+        if not runs:
+            return
+        run_starts = [run_start for run_start, _ in runs]
+        for occurrence in occurrences:
+            offset = self.offsets[occurrence]
+            run_index = bisect_left(run_starts, offset + 1) - 1
+            if run_index >= 0 and offset < runs[run_index][1]:
+                self.runs[occurrence] = run_index
+
+    def render(self, assignments: Dict[int, bytes], spans: Optional[Dict[Tuple[int, int], bytes]] = None) -> bytes:
+        """assignments 에 지정된 토큰 순번만 치환한 XML 을 반환합니다.
+
+        spans({(시작, 끝): 바이트}) 가 있으면 원래 XML 의 해당 범위(형식을 바꾼 셀)를 통째로 바꾸며,
+        범위 안의 토큰은 치환하지 않습니다.
+        """
+        if spans:
+            content = self.render({})
+            edits = sorted(
+                [(self.offsets[index], self.offsets[index] + len(self._originals[index]), value)
+                 for index, value in assignments.items()]
+                + [(start, end, value) for (start, end), value in spans.items()]
+            )
+            chunks = []
+            position = 0
+            for start, end, value in edits:
+                if start < position:
+                    continue
+                chunks.append(content[position:start])
+                chunks.append(value)
+                position = end
+            chunks.append(content[position:])
+            return b"".join(chunks)
+
+        chunks = [self.segments[0]]
+        for index in range(len(self.tokens)):
+            chunks.append(assignments.get(index, self._originals[index]))
+            chunks.append(self.segments[index + 1])
+        return b"".join(chunks)
+
+
+# (part, {토큰 순번: 바이트}, {(시작, 끝): 셀 XML} 또는 None, 압축 수준) -> 압축된 멤버
+PartEncoder = Callable[[CompiledPart, Dict[int, bytes], Optional[Dict[Tuple[int, int], bytes]], int], RawMember]
+
+
+class PlannedCell(NamedTuple):
+    """placeholder 가 있는 셀. 공유 문자열 셀이면 shared_index 가, 아니면 occurrences 가 채워집니다.
+
+    start/end 는 시트 XML 에서 <c> 요소의 바이트 범위이고, whole 은 셀의 텍스트 전체가 placeholder
+    하나인지입니다 (형식을 지정한 입력값은 이 경우에만 셀 형식으로 기록).
+    """
+    shared_index: Optional[int]
+    occurrences: Tuple[int, ...]
+    start: int = -1
+    end: int = -1
+    whole: bool = False
+
+
+class SheetPlan(NamedTuple):
+    name: str
+    part: str
+    cells: Dict[str, PlannedCell]
+
+
+class CompiledTemplate:
+    """한 번 파싱한 xlsx 템플릿.
+
+    placeholder 가 있는 part 는 토큰 기준으로 잘라 두고 토큰이 어느 셀(또는 공유 문자열)에
+    속하는지 기록합니다. 나머지 멤버는 압축된 바이트 그대로 보관하여 채우기 작업을
+    세그먼트 이어 붙이기와 멤버 복사로 처리합니다.
+    """
+
+    def __init__(
+        self,
+        content_hash: str,
+        members: List[Union[RawMember, CompiledPart]],
+        sheets: Dict[str, SheetPlan],
+        shared_strings_part: Optional[str],
+        shared_string_tokens: Dict[int, Tuple[int, ...]],
+        workbook_part: str = "xl/workbook.xml",
+        styles_part: Optional[str] = None,
+    ):
+        self.content_hash = content_hash
+        self.members = members
+        self.sheets = sheets
+        self.shared_strings_part = shared_strings_part
+        self.shared_string_tokens = shared_string_tokens
+        self.workbook_part = workbook_part
+        self.styles_part = styles_part
+        self.parts = {member.name: member for member in members if isinstance(member, CompiledPart)}
+        self.size = sum(len(member.data) if isinstance(member, RawMember) else member.size for member in members)
+        # 형식을 지정한 입력값이 처음 올 때 workbook.xml 에서 읽어 둠 (압축 수준, date1904, fullCalcOnLoad 를 설정한 멤버)
+        self._workbook: Optional[Tuple[int, bool, RawMember]] = None
+        # 날짜 값이 처음 올 때 읽어 두는 styles.xml 내용
+        self._styles: Optional[str] = None
+        # 공유 문자열 셀에 값이 처음 올 때 만들어 두는 (sharedStrings part 내용, <si> 내용의 바이트 범위 목록)
+        self._shared_items: Optional[Tuple[bytes, List[Tuple[int, int]]]] = None
+
+    @classmethod
+    def compile(cls, file_path: str, content_hash: Optional[str] = None) -> "CompiledTemplate":
+        with zipfile.ZipFile(file_path) as zf:
+            sheet_parts = resolve_sheet_parts(zf)
+            shared_strings_part = find_shared_strings_part(zf)
+            compiled: Dict[str, CompiledPart] = {}
+
+            # 공유 문자열: 토큰이 있는 <si> 순번 → 토큰 순번
+            shared_string_tokens: Dict[int, Tuple[int, ...]] = {}
+            # 텍스트 전체가 placeholder 하나인 공유 문자열 순번
+            whole_shared_strings = set()
+            if shared_strings_part is not None:
+                info = zf.getinfo(shared_strings_part)
+                content = _read_part(zf, info)
+                part = CompiledPart(read_raw_member(zf, info), content)
+                if part.tokens:
+                    compiled[part.name] = part
+                    for index, match in enumerate(_SHARED_STRING.finditer(content)):
+                        occurrences = part.occurrences_between(match.start(), match.end())
+                        if occurrences:
+                            shared_string_tokens[index] = tuple(occurrences)
+                            part.record_runs(content, match.start(), match.end(), occurrences)
+                            if len(occurrences) == 1 and matches_whole_cell(
+                                item_text((match.group(1) or b"").decode("utf-8")), part.tokens[occurrences[0]]
+                            ):
+                                whole_shared_strings.add(index)
+
+            sheets: Dict[str, SheetPlan] = {}
+            for sheet_name, part_name in sheet_parts:
+                info = zf.getinfo(part_name)
+                content = _read_part(zf, info)
+                part = CompiledPart(read_raw_member(zf, info), content)
+                cells = cls._plan_cells(part, content, shared_string_tokens, whole_shared_strings)
+                # 공유 문자열 셀만 있는 시트도 형식을 지정한 입력값으로 셀을 바꿀 수 있도록 보관
+                if part.tokens or cells:
+                    compiled[part_name] = part
+                sheets[sheet_name] = SheetPlan(sheet_name, part_name, cells)
+
+            members: List[Union[RawMember, CompiledPart]] = [
+                compiled[info.filename] if info.filename in compiled else read_raw_member(zf, info)
+                for info in zf.infolist()
+            ]
+            workbook_part = find_workbook_part(zf)
+            styles_part = find_styles_part(zf)
+        return cls(content_hash or file_content_hash(file_path), members, sheets,
+                   shared_strings_part, shared_string_tokens, workbook_part, styles_part)
+
+    @staticmethod
+    def _plan_cells(
+        part: CompiledPart,
+        content: bytes,
+        shared_string_tokens: Dict[int, Tuple[int, ...]],
+        whole_shared_strings: set,
+    ) -> Dict[str, PlannedCell]:
+        """시트 XML 에서 placeholder 를 포함하거나 참조하는 셀만 골라 기록합니다."""
+        sheet_data = _SHEET_DATA.search(content)
+        if sheet_data is None or sheet_data.group(1) is None:
+            return {}
+
+        cells: Dict[str, PlannedCell] = {}
+        for match in _CELL.finditer(content, sheet_data.start(1), sheet_data.end(1)):
+            attributes = _attributes(match.group(1))
+            ref = attributes.get(b"r")
+            if ref is None or match.group(2) is None:
+                continue
+            ref = ref.decode("ascii").upper()
+
+            if attributes.get(b"t") == b"s":
+                value = _CELL_VALUE.search(match.group(2))
+                if value is not None and int(value.group(1)) in shared_string_tokens:
+                    shared_index = int(value.group(1))
+                    cells[ref] = PlannedCell(shared_index, (), match.start(), match.end(), shared_index in whole_shared_strings)
+                continue
+
+            occurrences = part.occurrences_between(match.start(), match.end())
+            if occurrences:
+                whole = len(occurrences) == 1 and matches_whole_cell(
+                    cell_text(match.group(1).decode("utf-8"), match.group(2).decode("utf-8"), lambda index: None),
+                    part.tokens[occurrences[0]],
+                )
+                cells[ref] = PlannedCell(None, tuple(occurrences), match.start(), match.end(), whole)
+                part.record_runs(content, match.start(), match.end(), occurrences)
+        return cells
+
+    def to_index(self) -> Dict[str, Any]:
+        """placeholder 위치 정보를 JSON 으로 저장할 수 있는 dict 로 반환합니다 (PlaceholderIndexStore).
+
+        part 별 토큰/바이트 오프셋/run 순번, 시트별 셀 주소와 공유 문자열 순번을 담습니다.
+        """
+        return {
+            "content_hash": self.content_hash,
+            "shared_strings_part": self.shared_strings_part,
+            "workbook_part": self.workbook_part,
+            "styles_part": self.styles_part,
+            "shared_strings": {str(index): list(occurrences) for index, occurrences in self.shared_string_tokens.items()},
+            "parts": {
+                name: {"tokens": part.tokens, "offsets": part.offsets, "runs": part.runs}
+                for name, part in self.parts.items()
+            },
+            "sheets": {
+                name: {
+                    "part": sheet.part,
+                    "cells": {
+                        ref: [cell.shared_index, list(cell.occurrences), cell.start, cell.end, cell.whole]
+                        for ref, cell in sheet.cells.items()
+                    },
+                }
+                for name, sheet in self.sheets.items()
+            },
+        }
+
+    @classmethod
+    def from_index(cls, file_path: str, index: Dict[str, Any]) -> "CompiledTemplate":
+        """저장된 색인으로 템플릿을 복원합니다. placeholder 가 있는 part 만 압축을 풀고 나머지는
+        압축된 바이트 그대로 읽으므로 전체를 다시 검사하지 않습니다. 색인이 파일과 맞지 않으면 ValueError.
+        """
+        with zipfile.ZipFile(file_path) as zf:
+            compiled: Dict[str, CompiledPart] = {}
+            for name, entry in index["parts"].items():
+                info = zf.getinfo(name)
+                part = CompiledPart(read_raw_member(zf, info), _read_part(zf, info))
+                if part.offsets != entry["offsets"] or part.tokens != entry["tokens"]:
+                    raise ValueError(f"색인이 템플릿과 일치하지 않습니다: {name}")
+                part.runs = list(entry["runs"])
+                compiled[name] = part
+
+            members: List[Union[RawMember, CompiledPart]] = [
+                compiled[info.filename] if info.filename in compiled else read_raw_member(zf, info)
+                for info in zf.infolist()
+            ]
+
+        sheets = {
+            name: SheetPlan(name, entry["part"], {
+                ref: PlannedCell(shared_index, tuple(occurrences), start, end, whole)
+                for ref, (shared_index, occurrences, start, end, whole) in entry["cells"].items()
+            })
+            for name, entry in index["sheets"].items()
+        }
+        shared_string_tokens = {int(key): tuple(occurrences) for key, occurrences in index["shared_strings"].items()}
+        return cls(index["content_hash"], members, sheets, index["shared_strings_part"], shared_string_tokens,
+                   index["workbook_part"], index["styles_part"])
+
+    def validate(self, input_values: List[InputValue]):
+        """어느 처리 경로로도 처리할 수 없는 요청(없는 시트)이면 ValueError 를 발생시킵니다."""
+        for input_value in input_values:
+            if input_value.sheet not in self.sheets:
+                raise ValueError(f"시트를 찾을 수 없습니다: {input_value.sheet}")
+
+    def cell_tokens(self, sheet: SheetPlan, cell: PlannedCell) -> List[str]:
+        """셀에 들어 있는 placeholder 토큰 (소문자) 목록"""
+        if cell.shared_index is not None:
+            part = self.parts[self.shared_strings_part]
+            occurrences = self.shared_string_tokens[cell.shared_index]
+        else:
+            part = self.parts[sheet.part]
+            occurrences = cell.occurrences
+        return [part.tokens[occurrence] for occurrence in occurrences]
+
+    def input_values_for(self, values: Dict[str, str]) -> List[InputValue]:
+        """{패턴: 값} 을 해당 패턴이 있는 모든 셀의 InputValue 목록으로 펼칩니다."""
+        values = {pattern.lower(): value for pattern, value in values.items()}
+        input_values = []
+        for sheet in self.sheets.values():
+            for ref, cell in sheet.cells.items():
+                for token in dict.fromkeys(self.cell_tokens(sheet, cell)):
+                    if token in values:
+                        input_values.append(InputValue(pattern=token, value=values[token], cell=ref, sheet=sheet.name))
+        return input_values
+
+    def assign(self, input_values: List[InputValue]) -> Tuple[
+        Dict[str, Dict[int, bytes]], Dict[str, Dict[Tuple[int, int], InputValue]], Dict[str, Dict[Tuple[int, int], bytes]]
+    ]:
+        """입력값이 가리키는 셀의 토큰을 찾아 part 별 {토큰 순번: 치환 바이트} 로 만듭니다.
+
+        셀에 placeholder 가 여러 개이면 입력값이 셀의 첫 패턴만 담고 있어도 요청 전체에서 값이 주어진
+        패턴은 모두 치환합니다. 셀을 가리키는 입력값의 값이 우선이고, 나머지 패턴은 요청에서 처음 주어진
+        값으로 치환합니다. 형식을 지정한 입력값이 셀
+        전체를 차지하는 placeholder 를 가리키면 토큰 대신 시트 part 별 {(셀 시작, 셀 끝): 입력값} 으로
+        모아 두 번째 값으로 반환합니다. 공유 문자열은 다른 셀도 가리킬 수 있으므로 제자리에서 바꾸지 않고,
+        값을 넣은 <si> 내용을 시트 part 별 {(셀 시작, 셀 끝): 바이트} 로 모아 세 번째 값으로 반환합니다
+        (그 셀만 인라인 문자열로 기록).
+        """
+        replacements: Dict[str, bytes] = {}
+        for input_value in input_values:
+            replacements.setdefault(input_value.pattern.lower(), escape_xml_text(input_value.value).encode("utf-8"))
+
+        assignments: Dict[str, Dict[int, bytes]] = {}
+        typed_cells: Dict[str, Dict[Tuple[int, int], InputValue]] = {}
+        # {시트 part: {(셀 시작, 셀 끝): (공유 문자열 순번, {토큰 순번: 치환 바이트})}}
+        shared_cells: Dict[str, Dict[Tuple[int, int], Tuple[int, Dict[int, bytes]]]] = {}
+        # (토큰 목록, 토큰 순번들, 치환을 기록할 dict, 입력값) - 셀 자신의 값을 모두 넣은 뒤 남은 토큰을 요청 전체의 값으로 채움
+        targets: List[Tuple[List[str], Tuple[int, ...], Dict[int, bytes], InputValue]] = []
+        for input_value in input_values:
+            sheet = self.sheets.get(input_value.sheet)
+            if sheet is None:
+                raise TemplatePlanMiss(f"시트를 찾을 수 없습니다: {input_value.sheet}")
+            cell = sheet.cells.get(normalize_cell_ref(input_value.cell))
+            if cell is None:
+                raise TemplatePlanMiss(f"placeholder 가 없는 셀입니다: {input_value.sheet}!{input_value.cell}")
+
+            if is_typed(input_value) and cell.whole and input_value.pattern.lower() in self.cell_tokens(sheet, cell):
+                typed_cells.setdefault(sheet.part, {}).setdefault((cell.start, cell.end), input_value)
+                continue
+
+            if cell.shared_index is not None:
+                tokens = self.parts[self.shared_strings_part].tokens
+                occurrences = self.shared_string_tokens[cell.shared_index]
+                target = shared_cells.setdefault(sheet.part, {}).setdefault((cell.start, cell.end), (cell.shared_index, {}))[1]
+            else:
+                tokens = self.parts[sheet.part].tokens
+                occurrences = cell.occurrences
+                target = assignments.setdefault(sheet.part, {})
+
+            targets.append((tokens, occurrences, target, input_value))
+
+        for tokens, occurrences, target, input_value in targets:
+            pattern = input_value.pattern.lower()
+            for occurrence in occurrences:
+                if tokens[occurrence] == pattern:
+                    target.setdefault(occurrence, escape_xml_text(input_value.value).encode("utf-8"))
+        for tokens, occurrences, target, _ in targets:
+            for occurrence in occurrences:
+                replacement = replacements.get(tokens[occurrence])
+                if replacement is not None:
+                    target.setdefault(occurrence, replacement)
+
+        inline_cells: Dict[str, Dict[Tuple[int, int], bytes]] = {}
+        for part_name, cells in shared_cells.items():
+            for span, (shared_index, item_assignments) in cells.items():
+                # 형식을 지정한 셀로 바뀌는 셀은 제외
+                if item_assignments and span not in typed_cells.get(part_name, {}):
+                    inline_cells.setdefault(part_name, {})[span] = self._string_item(shared_index, item_assignments)
+        return assignments, typed_cells, inline_cells
+
+    def _string_item(self, shared_index: int, item_assignments: Dict[int, bytes]) -> bytes:
+        """shared_index 번째 <si> 의 내용에 item_assignments({토큰 순번: 치환 바이트}) 를 적용한 바이트"""
+        part = self.parts[self.shared_strings_part]
+        if self._shared_items is None:
+            content = part.render({})
+            self._shared_items = (content, [(match.start(1), match.end(1)) for match in _SHARED_STRING.finditer(content)])
+        content, items = self._shared_items
+        start, end = items[shared_index]
+
+        chunks = []
+        position = start
+        for occurrence in sorted(item_assignments):
+            offset = part.offsets[occurrence]
+            chunks.append(content[position:offset])
+            chunks.append(item_assignments[occurrence])
+            position = offset + len(part.tokens[occurrence])
+        chunks.append(content[position:end])
+        return b"".join(chunks)
+
+    def _workbook_member(self, compression_level: int = 6) -> Tuple[bool, RawMember]:
+        """(date1904 여부, fullCalcOnLoad 를 설정한 workbook part) - 압축 수준마다 처음 필요할 때 한 번 만듭니다."""
+        workbook = self._workbook
+        if workbook is None or workbook[0] != compression_level:
+            raw = next(member for member in self.members if isinstance(member, RawMember) and member.name == self.workbook_part)
+            content = inflate_member(raw).decode("utf-8")
+            member = deflate_member(
+                raw.name, set_full_calc_on_load(content).encode("utf-8"), compression_level, raw.date_time, raw.external_attr,
+            )
+            workbook = self._workbook = (compression_level, is_date1904(content), member)
+        return workbook[1], workbook[2]
+
+    def _date_styles(self, typed_cells: Dict[str, Dict[Tuple[int, int], InputValue]]) -> Optional[DateStyles]:
+        """날짜 값이 있으면 이번 채우기에서 날짜 서식을 더할 DateStyles (styles part 가 없으면 None)"""
+        if self.styles_part is None or not any(
+            input_value.type == "date" for cells in typed_cells.values() for input_value in cells.values()
+        ):
+            return None
+        if self._styles is None:
+            raw = next(member for member in self.members if isinstance(member, RawMember) and member.name == self.styles_part)
+            self._styles = inflate_member(raw).decode("utf-8")
+        return DateStyles(self._styles)
+
+    def _render_cells(
+        self,
+        part: CompiledPart,
+        typed_cells: Dict[Tuple[int, int], InputValue],
+        inline_cells: Dict[Tuple[int, int], bytes],
+        date1904: bool,
+        date_styles: Optional[DateStyles] = None,
+    ) -> Dict[Tuple[int, int], bytes]:
+        content = part.render({})
+        spans = {
+            (start, end): inline_string_cell(content[start:end].decode("utf-8"), item.decode("utf-8")).encode("utf-8")
+            for (start, end), item in inline_cells.items()
+        }
+        spans.update(
+            ((start, end), retype_cell(content[start:end].decode("utf-8"), input_value, date1904, date_styles).encode("utf-8"))
+            for (start, end), input_value in typed_cells.items()
+        )
+        return spans
+
+    def fill(self, input_values: List[InputValue], fileobj: BinaryIO, compression_level: int = 6, encoder: Optional[PartEncoder] = None):
+        """입력값을 적용한 xlsx 를 fileobj 에 기록합니다."""
+        for chunk in self.iter_fill(input_values, compression_level, encoder):
+            fileobj.write(chunk)
+
+    def iter_fill(self, input_values: List[InputValue], compression_level: int = 6, encoder: Optional[PartEncoder] = None) -> Iterator[bytes]:
+        """입력값을 적용한 xlsx 를 멤버 단위로 만들어지는 대로 바이트 조각으로 반환합니다.
+
+        입력값 검증(assign)은 첫 조각을 만들기 전에 끝나므로 TemplatePlanMiss 는 첫 next() 에서
+        발생합니다. encoder 가 있으면 값이 들어가는 part 를 렌더링하고 압축하는 일을 맡깁니다
+        (incremental_fill.FillSession).
+        """
+        assignments, typed_cells, inline_cells = self.assign(input_values)
+        date1904, workbook_member = self._workbook_member(compression_level) if typed_cells else (False, None)
+
+        timer = metrics.timer()
+        # 날짜 셀이 쓸 서식을 styles part 보다 먼저 정해야 하므로 형식을 지정한 셀과 공유 문자열 셀은 미리 렌더링
+        part_spans: Dict[str, Dict[Tuple[int, int], bytes]] = {}
+        styles_member: Optional[RawMember] = None
+        date_styles = self._date_styles(typed_cells) if typed_cells else None
+        if typed_cells or inline_cells:
+            with timer("render"):
+                part_spans = {
+                    name: self._render_cells(
+                        self.parts[name], typed_cells.get(name, {}), inline_cells.get(name, {}), date1904, date_styles
+                    )
+                    for name in typed_cells.keys() | inline_cells.keys()
+                }
+            if date_styles is not None and date_styles.changed:
+                raw = next(member for member in self.members if isinstance(member, RawMember) and member.name == self.styles_part)
+                styles_member = deflate_member(
+                    raw.name, date_styles.render().encode("utf-8"), compression_level, raw.date_time, raw.external_attr,
+                )
+
+        sink = ChunkSink()
+        writer = ZipStreamWriter(sink)
+        for member in self.members:
+            if isinstance(member, CompiledPart):
+                part_assignments = assignments.get(member.name)
+                spans = part_spans.get(member.name)
+                if (part_assignments or spans) and encoder is not None:
+                    with timer("deflate"):
+                        member = encoder(member, part_assignments or {}, spans, compression_level)
+                elif part_assignments or spans:
+                    with timer("render"):
+                        content = member.render(part_assignments or {}, spans)
+                    with timer("deflate"):
+                        member = deflate_member(
+                            member.name, content, compression_level, member.raw.date_time, member.raw.external_attr,
+                        )
+                else:
+                    member = member.raw
+            elif workbook_member is not None and member.name == self.workbook_part:
+                # 형식을 지정한 값이 들어가면 Excel 이 열 때 수식을 모두 다시 계산하도록 함
+                member = workbook_member
+            elif styles_member is not None and member.name == self.styles_part:
+                # 날짜 셀이 가리키는 날짜 서식을 더한 styles part
+                member = styles_member
+            writer.write_member(member)
+            yield from sink.drain()
+        writer.close()
+        yield from sink.drain()
+        timer.flush()
+
+
+class TemplatePlanCache:
+    """파일 내용 해시를 키로 CompiledTemplate 을 보관하는 크기 제한 LRU 캐시.
+
+    index_store 가 있으면 메모리에 없는 템플릿은 저장된 색인으로 복원하고, 새로 컴파일한
+    템플릿의 색인은 저장하여 다른 프로세스나 재시작 후에도 전체를 다시 검사하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        hashes: Optional[FileHashMemo] = None,
+        index_store: Optional[PlaceholderIndexStore] = None,
+    ):
+        self.max_bytes = max_bytes
+        self._plans: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+        self._bytes = 0
+        self._hashes = hashes or FileHashMemo()
+        self.index_store = index_store
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> CompiledTemplate:
+        """템플릿의 컴파일 결과를 반환하며, 캐시에 없으면 색인으로 복원하거나 컴파일하여 저장합니다."""
+        content_hash = self._hashes.get(file_path)
+        with self._lock:
+            plan = self._plans.get(content_hash)
+            if plan is not None:
+                self._plans.move_to_end(content_hash)
+                return plan
+
+        plan = self._load_indexed(file_path, content_hash)
+        if plan is None:
+            plan = CompiledTemplate.compile(file_path, content_hash)
+            if self.index_store is not None:
+                self.index_store.save(plan.to_index())
+        self.put(plan)
+        return plan
+
+    def _load_indexed(self, file_path: str, content_hash: str) -> Optional[CompiledTemplate]:
+        if self.index_store is None:
+            return None
+        index = self.index_store.load(content_hash)
+        if index is None:
+            return None
+        try:
+            return CompiledTemplate.from_index(file_path, index)
+        except (KeyError, TypeError, ValueError, zipfile.BadZipFile) as e:
+            # 색인이 손상되었거나 파일과 맞지 않으면 다시 컴파일하여 덮어씀
+            print(f"Placeholder index rejected, recompiling: {e}")
+            return None
+
+    def put(self, plan: CompiledTemplate):
+        size = plan.size
+        with self._lock:
+            if plan.content_hash in self._plans:
+                return
+            if size > self.max_bytes:
+                return
+            self._plans[plan.content_hash] = plan
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._plans.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+            self._bytes = 0
@@ -0,0 +1,95 @@
+import hashlib
+import os
+from typing import BinaryIO, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from app.services.hashing import HASH_CHUNK_SIZE
+
+# multipart 경계와 폼 필드에 쓰이는 여유분: 본문 한도 = 파일 한도 + 이 값
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(HTTPException):
+    """업로드 크기가 허용된 최대 크기를 넘음 (413)"""
+
+    def __init__(self, max_size: int):
+        super().__init__(
+            status_code=413,
+            detail=f"업로드 파일이 너무 큽니다. 최대 {max_size / (1024 * 1024):.1f}MB까지 업로드할 수 있습니다."
+        )
+        self.max_size = max_size
+
+
+def spool_upload(fileobj: BinaryIO, temp_path: str, max_size: int = 0) -> Tuple[str, int]:
+    """fileobj 를 청크 단위로 temp_path 에 쓰면서 SHA-256 해시를 계산합니다.
+
+    max_size 를 넘는 순간 쓰던 파일을 지우고 UploadTooLarge 를 발생시키므로 업로드 전체를
+    메모리에 올리지 않습니다. (해시, 크기) 를 반환합니다.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(temp_path, "wb") as f:
+            for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b""):
+                size += len(chunk)
+                if max_size and size > max_size:
+                    raise UploadTooLarge(max_size)
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return digest.hexdigest(), size
+
+
+class RequestSizeLimitMiddleware:
+    """요청 본문이 max_file_size + FORM_OVERHEAD_BYTES 를 넘으면 본문을 다 받기 전에 413 으로
+    거절하는 ASGI 미들웨어.
+
+    Content-Length 가 있으면 읽기 전에 바로 거절하고, 없으면(chunked) 받은 바이트를 세다가
+    한도를 넘는 순간 UploadTooLarge 를 발생시킵니다.
+    """
+
+    def __init__(self, app, max_file_size: int):
+        self.app = app
+        self.max_file_size = max_file_size
+        self.max_body_size = max_file_size + FORM_OVERHEAD_BYTES if max_file_size else 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.max_body_size:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    break
+                if content_length > self.max_body_size:
+                    # 본문을 읽지 않고 응답하므로 연결을 닫아 남은 본문을 버리도록 함
+                    response = JSONResponse(
+                        status_code=413,
+                        content={"detail": UploadTooLarge(self.max_file_size).detail},
+                        headers={"Connection": "close"}
+                    )
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    raise UploadTooLarge(self.max_file_size)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
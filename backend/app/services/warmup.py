@@ -0,0 +1,39 @@
+import os
+import time
+from typing import Dict, List, Sequence
+
+from app.services.excel_service import ANALYZE_ENGINES, ExcelService
+from app.services.metrics import metrics
+
+
+def parse_names(value: str) -> List[str]:
+    """쉼표로 구분한 설정 값을 목록으로 (빈 항목은 제외)"""
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def warm_templates(service: ExcelService, templates: Sequence[str], engines: Sequence[str] = ANALYZE_ENGINES) -> Dict[str, float]:
+    """자주 쓰는 템플릿을 미리 분석하고 컴파일하여 첫 요청이 캐시에서 처리되도록 합니다.
+
+    templates 의 각 항목은 "sample", 업로드된 file_id 또는 xlsx 경로입니다. 분석하면서 무거운
+    라이브러리(openpyxl 엔진)도 함께 불러오므로 서버가 요청을 받기 전에 호출합니다. 찾을 수 없거나
+    분석에 실패한 템플릿은 건너뛰며, {템플릿: 걸린 초} 를 반환합니다.
+    """
+    timings: Dict[str, float] = {}
+    with metrics.span("warmup"):
+        for name in templates:
+            path = name if name.lower().endswith(".xlsx") and os.path.isfile(name) else service.get_template_path(name)
+            if path is None or not os.path.exists(path):
+                print(f"Warmup skipped, template not found: {name}")
+                continue
+
+            start = time.perf_counter()
+            try:
+                for engine in engines:
+                    # 분석 결과를 캐시하고 채우기에 쓰는 컴파일된 템플릿도 만들어 둠
+                    service.analyze_excel_table(path, engine)
+            except Exception as e:
+                print(f"Warmup failed for {name}: {e}")
+                continue
+            timings[name] = time.perf_counter() - start
+            print(f"Warmed template {name} in {timings[name] * 1000:.0f}ms")
+    return timings
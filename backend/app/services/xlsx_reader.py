@@ -0,0 +1,306 @@
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+SHEET_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+DOC_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+REL_OFFICE_DOCUMENT = f"{DOC_REL_NS}/officeDocument"
+REL_WORKSHEET = f"{DOC_REL_NS}/worksheet"
+REL_SHARED_STRINGS = f"{DOC_REL_NS}/sharedStrings"
+REL_COMMENTS = f"{DOC_REL_NS}/comments"
+REL_STYLES = f"{DOC_REL_NS}/styles"
+
+INPUT_PATTERN = re.compile(r'(?<![A-Za-z0-9_])input\d+', re.IGNORECASE)
+
+_TAG_SI = f"{{{SHEET_MAIN_NS}}}si"
+_TAG_T = f"{{{SHEET_MAIN_NS}}}t"
+_TAG_R = f"{{{SHEET_MAIN_NS}}}r"
+_TAG_IS = f"{{{SHEET_MAIN_NS}}}is"
+_TAG_V = f"{{{SHEET_MAIN_NS}}}v"
+_TAG_F = f"{{{SHEET_MAIN_NS}}}f"
+_TAG_C = f"{{{SHEET_MAIN_NS}}}c"
+_TAG_ROW = f"{{{SHEET_MAIN_NS}}}row"
+_TAG_SHEET_DATA = f"{{{SHEET_MAIN_NS}}}sheetData"
+_TAG_MERGE_CELL = f"{{{SHEET_MAIN_NS}}}mergeCell"
+_TAG_HYPERLINK = f"{{{SHEET_MAIN_NS}}}hyperlink"
+_TAG_COMMENT = f"{{{SHEET_MAIN_NS}}}comment"
+_TAG_SHEET = f"{{{SHEET_MAIN_NS}}}sheet"
+_TAG_RELATIONSHIP = f"{{{PKG_REL_NS}}}Relationship"
+_ATTR_REL_ID = f"{{{DOC_REL_NS}}}id"
+
+_CELL_REF = re.compile(r'\$?([A-Za-z]{1,3})\$?(\d+)')
+
+
+class SheetPart(NamedTuple):
+    name: str
+    path: str
+
+
+class CellRecord(NamedTuple):
+    row: int
+    column: int
+    data_type: str
+    value: Optional[str]
+
+
+def column_index(letters: str) -> int:
+    """열 문자(A, AB ...)를 1부터 시작하는 인덱스로 변환합니다."""
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + (ord(char) - 64)
+    return index
+
+
+@lru_cache(maxsize=None)
+def column_letter(index: int) -> str:
+    """1부터 시작하는 열 인덱스를 열 문자(A, AB ...)로 변환합니다 (openpyxl 을 불러오지 않음)."""
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def split_cell_ref(ref: str) -> Tuple[int, int]:
+    """'B12' 형태의 셀 주소를 (row, column) 으로 변환합니다."""
+    match = _CELL_REF.fullmatch(ref.strip())
+    if not match:
+        raise ValueError(f"잘못된 셀 주소입니다: {ref}")
+    letters, row = match.groups()
+    return int(row), column_index(letters)
+
+
+def split_range_ref(ref: str) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """'A1:C3' 형태의 범위를 ((min_row, min_col), (max_row, max_col)) 로 변환합니다."""
+    start, _, end = ref.partition(":")
+    first = split_cell_ref(start)
+    last = split_cell_ref(end) if end else first
+    return first, last
+
+
+def _rels_path(part: str) -> str:
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+def _resolve_target(source_part: str, target: str) -> str:
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+
+def read_relationships(zf: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, str]]:
+    """part 의 관계(.rels)를 {rId: (type, 대상 part 경로)} 로 읽습니다."""
+    rels_path = _rels_path(part)
+    if rels_path not in zf.NameToInfo:
+        return {}
+
+    relationships = {}
+    root = ET.fromstring(zf.read(rels_path))
+    for rel in root.iter(_TAG_RELATIONSHIP):
+        if rel.get("TargetMode") == "External":
+            continue
+        relationships[rel.get("Id")] = (rel.get("Type"), _resolve_target(part, rel.get("Target", "")))
+    return relationships
+
+
+def find_workbook_part(zf: zipfile.ZipFile) -> str:
+    """패키지 관계에서 workbook part 경로를 찾습니다."""
+    for rel_type, target in read_relationships(zf, "").values():
+        if rel_type == REL_OFFICE_DOCUMENT:
+            return target
+    return "xl/workbook.xml"
+
+
+def resolve_sheet_parts(zf: zipfile.ZipFile) -> List[SheetPart]:
+    """workbook.xml 의 시트 순서대로 (시트 이름, worksheet part 경로) 목록을 반환합니다."""
+    workbook_part = find_workbook_part(zf)
+    relationships = read_relationships(zf, workbook_part)
+
+    sheets = []
+    for _, elem in ET.iterparse(zf.open(workbook_part)):
+        if elem.tag == _TAG_SHEET:
+            rel_type, target = relationships.get(elem.get(_ATTR_REL_ID), (None, None))
+            # chartsheet 등 셀 데이터가 없는 시트는 제외
+            if rel_type == REL_WORKSHEET and target in zf.NameToInfo:
+                sheets.append(SheetPart(elem.get("name"), target))
+    return sheets
+
+
+def find_shared_strings_part(zf: zipfile.ZipFile) -> Optional[str]:
+    """workbook 관계에서 sharedStrings part 경로를 찾습니다."""
+    for rel_type, target in read_relationships(zf, find_workbook_part(zf)).values():
+        if rel_type == REL_SHARED_STRINGS and target in zf.NameToInfo:
+            return target
+    return None
+
+
+def find_styles_part(zf: zipfile.ZipFile) -> Optional[str]:
+    """workbook 관계에서 styles part 경로를 찾습니다."""
+    for rel_type, target in read_relationships(zf, find_workbook_part(zf)).values():
+        if rel_type == REL_STYLES and target in zf.NameToInfo:
+            return target
+    return None
+
+
+def _text_content(elem: ET.Element) -> str:
+    """<si>/<is> 요소에서 서식을 제외한 텍스트를 추출합니다 (윗주 rPh 제외)."""
+    snippets = []
+    for child in elem:
+        if child.tag == _TAG_T:
+            snippets.append(child.text or "")
+        elif child.tag == _TAG_R:
+            snippets.append(child.findtext(_TAG_T) or "")
+    return "".join(snippets).replace("x005F_", "")
+
+
+def iter_shared_strings(zf: zipfile.ZipFile, part: Optional[str] = None) -> Iterator[str]:
+    """sharedStrings.xml 을 스트리밍으로 읽어 각 문자열을 순서대로 반환합니다."""
+    part = part or find_shared_strings_part(zf)
+    if part is None:
+        return
+
+    context = ET.iterparse(zf.open(part), events=("start", "end"))
+    root = None
+    for event, elem in context:
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag == _TAG_SI:
+            yield _text_content(elem)
+            root.clear()
+
+
+class SheetExtent:
+    """openpyxl 의 max_row/max_column 과 동일한 기준으로 시트 크기를 추적합니다."""
+
+    def __init__(self):
+        self.max_row = 0
+        self.max_column = 0
+
+    def add(self, row: int, column: int):
+        if row > self.max_row:
+            self.max_row = row
+        if column > self.max_column:
+            self.max_column = column
+
+    def add_range(self, ref: str):
+        try:
+            _, (row, column) = split_range_ref(ref)
+        except ValueError:
+            return
+        self.add(row, column)
+
+
+def iter_sheet_cells(
+    zf: zipfile.ZipFile,
+    part: str,
+    shared_string: Callable[[int], Optional[str]],
+    extent: Optional[SheetExtent] = None,
+    formulas: bool = True,
+    stream: Optional[BinaryIO] = None,
+) -> Iterator[CellRecord]:
+    """worksheet part 를 스트리밍으로 읽어 실제로 존재하는 <c> 요소만 반환합니다.
+
+    값은 openpyxl(data_only=False) 가 돌려주는 문자열 표현을 따릅니다.
+    수식은 '=' 로 시작하고, 공유 문자열은 shared_string 콜백으로 조회합니다.
+    formulas=False 이면 data_only=True 와 같이 수식 대신 캐시된 값을 반환합니다.
+    stream 을 주면 part 대신 그 내용(앞부분을 건너뛴 part 등)을 읽습니다.
+    """
+    shared_formulae: Dict[str, Tuple[str, str]] = {}
+    row_counter = 0
+    col_counter = 0
+    sheet_data = None
+
+    for event, elem in ET.iterparse(stream if stream is not None else zf.open(part), events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _TAG_ROW:
+                row_attr = elem.get("r")
+                row_counter = int(float(row_attr)) if row_attr else row_counter + 1
+                col_counter = 0
+            elif tag == _TAG_SHEET_DATA:
+                sheet_data = elem
+            continue
+
+        if tag == _TAG_C:
+            coordinate = elem.get("r")
+            if coordinate:
+                row, column = split_cell_ref(coordinate)
+                col_counter = column
+            else:
+                col_counter += 1
+                row, column = row_counter, col_counter
+
+            if extent is not None:
+                extent.add(row, column)
+
+            yield CellRecord(row, column, *_cell_value(elem, coordinate, shared_string, shared_formulae, formulas))
+        elif tag == _TAG_ROW:
+            # 처리가 끝난 행은 버려서 메모리 사용량을 일정하게 유지
+            if sheet_data is not None:
+                sheet_data.clear()
+        elif extent is not None and tag in (_TAG_MERGE_CELL, _TAG_HYPERLINK):
+            extent.add_range(elem.get("ref", ""))
+
+    if extent is not None:
+        _add_comment_refs(zf, part, extent)
+
+
+def _cell_value(
+    elem: ET.Element,
+    coordinate: Optional[str],
+    shared_string: Callable[[int], Optional[str]],
+    shared_formulae: Dict[str, Tuple[str, str]],
+    formulas: bool = True,
+) -> Tuple[str, Optional[str]]:
+    data_type = elem.get("t", "n")
+
+    formula = elem.find(_TAG_F) if formulas else None
+    if formula is not None:
+        text = formula.text or ""
+        if formula.get("t") == "shared":
+            index = formula.get("si")
+            if text:
+                shared_formulae[index] = (coordinate, text)
+            elif index in shared_formulae and coordinate:
+                text = _translate_shared_formula(shared_formulae[index], coordinate)
+        return "f", f"={text}"
+
+    if data_type == "inlineStr":
+        inline = elem.find(_TAG_IS)
+        return ("s", _text_content(inline)) if inline is not None else ("n", None)
+
+    value = elem.findtext(_TAG_V) or None
+    if value is None:
+        return data_type, None
+    if data_type == "s":
+        return "s", shared_string(int(value))
+    if data_type == "str":
+        return "s", value
+    return data_type, value
+
+
+def _translate_shared_formula(master: Tuple[str, str], coordinate: str) -> str:
+    origin, text = master
+    # 'inputN' 토큰이 없는 수식은 번역해도 분석 결과에 영향이 없으므로 생략
+    if not INPUT_PATTERN.search(text):
+        return text
+    from openpyxl.formula.translate import Translator
+    return Translator(f"={text}", origin).translate_formula(coordinate)[1:]
+
+
+def _add_comment_refs(zf: zipfile.ZipFile, part: str, extent: SheetExtent):
+    for rel_type, target in read_relationships(zf, part).values():
+        if rel_type != REL_COMMENTS or target not in zf.NameToInfo:
+            continue
+        for _, elem in ET.iterparse(zf.open(target)):
+            if elem.tag == _TAG_COMMENT:
+                extent.add_range(elem.get("ref", ""))
+                elem.clear()
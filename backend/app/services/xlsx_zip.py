@@ -0,0 +1,184 @@
+import struct
+import zipfile
+import zlib
+from typing import BinaryIO, Iterator, List, NamedTuple, Tuple
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+
+_LOCAL_SIGNATURE = 0x04034B50
+_CENTRAL_SIGNATURE = 0x02014B50
+_END_SIGNATURE = 0x06054B50
+
+_VERSION = 20
+_FLAG_ENCRYPTED = 0x01
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_ZIP32_LIMIT = 0xFFFFFFFF
+_COALESCE_BYTES = 64 * 1024
+
+
+class RawMember(NamedTuple):
+    """압축을 풀지 않은 zip 멤버 (압축된 바이트 그대로)"""
+    name: str
+    compress_type: int
+    crc: int
+    compress_size: int
+    file_size: int
+    date_time: Tuple[int, int, int, int, int, int]
+    external_attr: int
+    data: bytes
+
+
+def read_raw_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> RawMember:
+    """압축 해제 없이 zip 멤버의 압축된 데이터를 그대로 읽습니다."""
+    if info.flag_bits & _FLAG_ENCRYPTED:
+        raise ValueError(f"암호화된 zip 멤버는 지원하지 않습니다: {info.filename}")
+
+    fp = zf.fp
+    fp.seek(info.header_offset)
+    header = fp.read(_LOCAL_HEADER.size)
+    if len(header) != _LOCAL_HEADER.size or _LOCAL_HEADER.unpack(header)[0] != _LOCAL_SIGNATURE:
+        raise zipfile.BadZipFile(f"잘못된 로컬 헤더입니다: {info.filename}")
+    name_length, extra_length = _LOCAL_HEADER.unpack(header)[9:11]
+    fp.seek(info.header_offset + _LOCAL_HEADER.size + name_length + extra_length)
+    data = fp.read(info.compress_size)
+
+    return RawMember(
+        name=info.filename,
+        compress_type=info.compress_type,
+        crc=info.CRC,
+        compress_size=info.compress_size,
+        file_size=info.file_size,
+        date_time=info.date_time,
+        external_attr=info.external_attr,
+        data=data,
+    )
+
+
+def inflate_member(member: RawMember) -> bytes:
+    """RawMember 의 압축을 풀어 원래 바이트를 반환합니다."""
+    if member.compress_type == zipfile.ZIP_STORED:
+        return member.data
+    if member.compress_type != zipfile.ZIP_DEFLATED:
+        raise ValueError(f"지원하지 않는 압축 방식입니다: {member.name}")
+    return zlib.decompress(member.data, -15)
+
+
+def deflate_member(
+    name: str,
+    data: bytes,
+    compression_level: int = 6,
+    date_time: Tuple[int, int, int, int, int, int] = (1980, 1, 1, 0, 0, 0),
+    external_attr: int = 0,
+) -> RawMember:
+    """바이트를 deflate 로 압축하여 바로 쓸 수 있는 RawMember 로 만듭니다."""
+    compressor = zlib.compressobj(compression_level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    return RawMember(
+        name=name,
+        compress_type=zipfile.ZIP_DEFLATED,
+        crc=zlib.crc32(data),
+        compress_size=len(compressed),
+        file_size=len(data),
+        date_time=date_time,
+        external_attr=external_attr,
+        data=compressed,
+    )
+
+
+def _dos_datetime(date_time: Tuple[int, int, int, int, int, int]) -> Tuple[int, int]:
+    year, month, day, hour, minute, second = date_time
+    year = max(year, 1980)
+    dos_date = (year - 1980) << 9 | month << 5 | day
+    dos_time = hour << 11 | minute << 5 | (second // 2)
+    return dos_time, dos_date
+
+
+class ChunkSink:
+    """ZipStreamWriter 가 쓰는 바이트를 복사하지 않고 모아 두었다가 drain() 으로 내보냅니다.
+
+    응답 스트림처럼 멤버 단위로 바로 흘려보낼 때 사용합니다. 작은 조각(로컬 헤더 등)만
+    합쳐서 내보내고, 압축된 멤버 데이터처럼 큰 조각은 그대로 전달합니다.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes):
+        if data:
+            self._chunks.append(data)
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        pending: List[bytes] = []
+        for chunk in chunks:
+            if len(chunk) >= _COALESCE_BYTES:
+                if pending:
+                    yield b"".join(pending)
+                    pending = []
+                yield chunk
+            else:
+                pending.append(chunk)
+        if pending:
+            yield b"".join(pending)
+
+
+class ZipStreamWriter:
+    """미리 압축된 멤버를 순서대로 기록하는 zip 작성기.
+
+    CRC 와 크기를 미리 알고 있으므로 seek 이 필요 없고, 소켓이나 응답 스트림처럼
+    되감을 수 없는 파일 객체에도 그대로 쓸 수 있습니다.
+    """
+
+    def __init__(self, fileobj: BinaryIO):
+        self._fp = fileobj
+        self._offset = 0
+        self._central: List[bytes] = []
+        self._names = set()
+
+    def _write(self, data: bytes):
+        self._fp.write(data)
+        self._offset += len(data)
+
+    def write_member(self, member: RawMember):
+        if member.name in self._names:
+            raise ValueError(f"중복된 zip 멤버입니다: {member.name}")
+        if max(member.compress_size, member.file_size, self._offset) >= _ZIP32_LIMIT:
+            raise ValueError("ZIP64 크기의 파일은 지원하지 않습니다.")
+
+        name = member.name.encode("utf-8")
+        flags = 0 if member.name.isascii() else _FLAG_UTF8
+        dos_time, dos_date = _dos_datetime(member.date_time)
+        header_offset = self._offset
+
+        self._write(_LOCAL_HEADER.pack(
+            _LOCAL_SIGNATURE, _VERSION, flags, member.compress_type, dos_time, dos_date,
+            member.crc, member.compress_size, member.file_size, len(name), 0,
+        ))
+        self._write(name)
+        self._write(member.data)
+
+        self._central.append(_CENTRAL_HEADER.pack(
+            _CENTRAL_SIGNATURE, _VERSION, _VERSION, flags & ~_FLAG_DATA_DESCRIPTOR,
+            member.compress_type, dos_time, dos_date, member.crc, member.compress_size,
+            member.file_size, len(name), 0, 0, 0, 0, member.external_attr, header_offset,
+        ) + name)
+        self._names.add(member.name)
+
+    def close(self):
+        """central directory 를 기록하여 zip 을 마무리합니다."""
+        if len(self._central) > 0xFFFF:
+            raise ValueError("ZIP64 개수의 멤버는 지원하지 않습니다.")
+
+        directory_offset = self._offset
+        for record in self._central:
+            self._write(record)
+        directory_size = self._offset - directory_offset
+
+        self._write(_END_RECORD.pack(
+            _END_SIGNATURE, 0, 0, len(self._central), len(self._central),
+            directory_size, directory_offset, 0,
+        ))
+        self._central = []
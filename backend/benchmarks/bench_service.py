@@ -0,0 +1,293 @@
+"""ExcelService 분석/채우기 벤치마크
+
+합성 워크북(benchmarks.workbook_gen)으로 분석 엔진과 채우기 경로를 측정하여 경과 시간, 최대 RSS,
+처리량을 출력하고 JSON 기록 파일에 추가합니다. 같은 워크북 모양의 이전 기록과 비교하여 허용치를 넘게
+느려지거나 메모리를 더 쓰면 종료 코드 1 로 끝나므로 CI 에서 회귀 검사로 쓸 수 있습니다.
+각 측정은 새 프로세스에서 실행되어 최대 RSS 가 다른 측정의 영향을 받지 않습니다.
+
+    cd backend
+    python -m benchmarks.bench_service --rows 2000 --columns 20 --sheets 2
+    python -m benchmarks.bench_service --cases analyze-stream,fill-plan --repeat 5 --max-regression 0.2
+    python -m benchmarks.bench_service --sheets 16 --cases analyze-stream,analyze-parallel --analysis-workers 4
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.workbook_gen import WorkbookSpec, add_spec_arguments, spec_from_args, write_workbook
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "history.json")
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 바이트 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _input_values(service, path: str):
+    """분석 결과의 모든 placeholder 셀에 값을 넣는 입력값 목록"""
+    from app.models.excel_models import InputValue
+
+    table = service.analyze_excel_table(path, engine="stream")
+    return [
+        InputValue(pattern=field["pattern"], value=f"값 {index} <&>", cell=field["cell"], sheet=field["sheet"])
+        for index, field in enumerate(table.fields()[1])
+    ]
+
+
+def _cell_count(service, path: str) -> int:
+    """시트 크기(최대 행 x 최대 열)의 합. --workbook 으로 지정한 파일도 같은 기준으로 셈"""
+    table = service.analyze_excel_table(path, engine="stream")
+    return sum(sheet["max_row"] * sheet["max_column"] for sheet in table.sheets)
+
+
+def _analyze(engine: str, parallel: Optional[bool] = None) -> Callable:
+    def setup(service, path: str, spec: WorkbookSpec, options: Dict[str, Any]) -> Tuple[Callable[[], Any], int, str]:
+        if parallel is not None:
+            from app.services.analysis_table import AnalysisTable
+
+            # 시트 분석 방식을 크기와 관계없이 고정하여 순차/병렬을 비교
+            return (lambda: service._analyze_via_stream(path, AnalysisTable(), parallel)), _cell_count(service, path), "cells"
+        return (lambda: service.analyze_excel_table(path, engine=engine, use_cache=False)), _cell_count(service, path), "cells"
+    return setup
+
+
+def _compile(service, path: str, spec: WorkbookSpec, options: Dict[str, Any]):
+    from app.services.template_plan import CompiledTemplate
+
+    return (lambda: CompiledTemplate.compile(path)), _cell_count(service, path), "cells"
+
+
+def _fill_plan(service, path: str, spec: WorkbookSpec, options: Dict[str, Any]):
+    input_values = _input_values(service, path)
+    return (lambda: b"".join(service.stream_excel_with_inputs(path, input_values))), 1, "files"
+
+
+def _fill_xml(service, path: str, spec: WorkbookSpec, options: Dict[str, Any]):
+    input_values = _input_values(service, path)
+    # 컴파일된 템플릿을 거치지 않는 XML 치환 경로만 측정
+    return (lambda: service._rewrite_xlsx_via_xml(path, input_values, io.BytesIO())), 1, "files"
+
+
+def _fill_openpyxl(service, path: str, spec: WorkbookSpec, options: Dict[str, Any]):
+    input_values = _input_values(service, path)
+    return (lambda: service._write_excel_via_openpyxl(path, input_values, io.BytesIO())), 1, "files"
+
+
+def _batch(service, path: str, spec: WorkbookSpec, options: Dict[str, Any]):
+    input_values = _input_values(service, path)
+    rows = options["batch_rows"]
+    return (lambda: service.process_excel_batch(path, [(None, input_values)] * rows)), rows, "files"
+
+
+CASES: Dict[str, Callable] = {
+    "analyze-stream": _analyze("stream", parallel=False),
+    "analyze-parallel": _analyze("stream", parallel=True),
+    "analyze-openpyxl": _analyze("openpyxl"),
+    "compile": _compile,
+    "fill-plan": _fill_plan,
+    "fill-xml": _fill_xml,
+    "fill-openpyxl": _fill_openpyxl,
+    "batch": _batch,
+}
+# openpyxl 경로는 큰 워크북에서 오래 걸리므로 --cases 로 지정할 때만 실행
+DEFAULT_CASES = ("analyze-stream", "analyze-parallel", "compile", "fill-plan", "fill-xml", "batch")
+# (측정 항목, 기준 항목): 둘 다 실행하면 기준 대비 속도 향상 비율을 출력하고 기록
+SPEEDUPS = (("analyze-parallel", "analyze-stream"),)
+
+
+def run_case(case: str, path: str, spec: WorkbookSpec, repeat: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    """작업 프로세스에서 실행: 한 번 데운 뒤 repeat 번 측정합니다."""
+    from app.services.excel_service import ExcelService
+
+    upload_dir = tempfile.mkdtemp(prefix="bench_")
+    try:
+        service = ExcelService(
+            upload_dir=upload_dir,
+            batch_workers=options["batch_workers"],
+            analysis_workers=options["analysis_workers"],
+        )
+        run, units, unit = CASES[case](service, path, spec, options)
+        base_rss = _peak_rss_mb()
+        run()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        peak_rss = _peak_rss_mb()
+        service.storage_janitor.stop()
+        service.sheet_analyzer.shutdown()
+    finally:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    median = statistics.median(timings)
+    return {
+        "wall_best": min(timings),
+        "wall_median": median,
+        "peak_rss_mb": peak_rss,
+        "rss_delta_mb": None if peak_rss is None else peak_rss - base_rss,
+        "throughput": units / median if median else None,
+        "unit": f"{unit}/s",
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_history(path: str, history: List[Dict[str, Any]]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=1)
+    os.replace(temp_path, path)
+
+
+def find_regressions(
+    history: List[Dict[str, Any]],
+    run: Dict[str, Any],
+    max_regression: float,
+    max_rss_regression: float,
+    baseline_runs: int,
+) -> List[str]:
+    """같은 워크북 모양의 최근 baseline_runs 개 기록의 중앙값과 비교하여 허용치를 넘은 항목을 반환합니다."""
+    regressions = []
+    # 회귀로 판정된 기록은 기준에서 제외
+    previous = [entry for entry in history
+                if entry["spec_key"] == run["spec_key"] and not entry.get("regressions")][-baseline_runs:]
+    for case, result in run["results"].items():
+        checks = (("wall_median", max_regression), ("rss_delta_mb", max_rss_regression))
+        for metric, allowed in checks:
+            values = [entry["results"][case][metric] for entry in previous
+                      if case in entry["results"] and entry["results"][case].get(metric) is not None]
+            if not values or result.get(metric) is None:
+                continue
+            baseline = statistics.median(values)
+            # RSS 증가량은 작은 값에서 흔들리므로 1MB 미만 차이는 무시
+            if metric == "rss_delta_mb" and result[metric] - baseline < 1:
+                continue
+            if baseline > 0 and result[metric] > baseline * (1 + allowed):
+                regressions.append(f"{case} {metric}: {result[metric]:.4f} > {baseline:.4f} (+{allowed:.0%})")
+    return regressions
+
+
+def _format_row(case: str, result: Dict[str, Any]) -> str:
+    rss = "-" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:8.1f}"
+    delta = "-" if result["rss_delta_mb"] is None else f"{result['rss_delta_mb']:8.1f}"
+    return (
+        f"{case:18s} best={result['wall_best'] * 1000:10.1f}ms median={result['wall_median'] * 1000:10.1f}ms "
+        f"rss={rss}MB (+{delta}MB) throughput={result['throughput']:12,.1f} {result['unit']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_spec_arguments(parser)
+    parser.add_argument("--cases", default=",".join(DEFAULT_CASES), help=f"쉼표로 구분 ({', '.join(CASES)})")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch-rows", type=int, default=20)
+    parser.add_argument("--batch-workers", type=int, default=0, help="일괄 처리 프로세스 수 (0 이면 CPU 수)")
+    parser.add_argument("--analysis-workers", type=int, default=0, help="시트 분석 프로세스 수 (0 이면 CPU 수)")
+    parser.add_argument("--workbook", help="합성 워크북 대신 측정할 xlsx 경로")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="기록 JSON 경로")
+    parser.add_argument("--no-save", action="store_true", help="기록 파일에 추가하지 않음")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="허용하는 경과 시간 증가 비율")
+    parser.add_argument("--max-rss-regression", type=float, default=0.25, help="허용하는 RSS 증가량 증가 비율")
+    parser.add_argument("--baseline-runs", type=int, default=5, help="비교할 최근 기록 수")
+    args = parser.parse_args()
+
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"알 수 없는 측정 항목: {', '.join(unknown)}")
+
+    spec = spec_from_args(args)
+    options = {
+        "batch_rows": args.batch_rows,
+        "batch_workers": args.batch_workers or None,
+        "analysis_workers": args.analysis_workers or None,
+    }
+    workdir = tempfile.mkdtemp(prefix="bench_workbook_")
+    try:
+        if args.workbook:
+            path = os.path.abspath(args.workbook)
+            spec_key = f"file={os.path.basename(path)},size={os.path.getsize(path)}"
+        else:
+            path = os.path.join(workdir, "synthetic.xlsx")
+            stats = write_workbook(path, spec)
+            spec_key = spec.key()
+            print(f"workbook: {spec.cells:,} cells, " + ", ".join(f"{name}={value:,}" for name, value in stats.items()))
+
+        results = {}
+        for case in cases:
+            # 측정마다 새 프로세스를 써서 최대 RSS 와 캐시 상태를 분리
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                results[case] = executor.submit(run_case, case, path, spec, args.repeat, options).result()
+            print(_format_row(case, results[case]))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    speedups = {}
+    for case, baseline in SPEEDUPS:
+        if case in results and baseline in results and results[case]["wall_median"]:
+            speedups[case] = results[baseline]["wall_median"] / results[case]["wall_median"]
+            print(f"speedup {case}: {speedups[case]:.2f}x (vs {baseline})")
+
+    run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "spec_key": spec_key,
+        "spec": None if args.workbook else spec._asdict(),
+        "repeat": args.repeat,
+        "results": results,
+        "speedups": speedups,
+    }
+    history = load_history(args.history)
+    regressions = find_regressions(history, run, args.max_regression, args.max_rss_regression, args.baseline_runs)
+    run["regressions"] = regressions
+    if not args.no_save:
+        save_history(args.history, history + [run])
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""동시 업로드 부하 테스트
+
+서버를 같은 프로세스에서 띄운 뒤 여러 클라이언트가 동시에 /api/analyze-excel 에
+업로드하는 동안 /health 응답 시간을 함께 측정하여 처리량과 p50/p99 지연을 출력합니다.
+외부 패키지 없이 표준 라이브러리만 사용합니다.
+
+    cd backend
+    python -m benchmarks.load_test --clients 16 --requests 200 --file ../sample.xlsx
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _multipart(path: str):
+    boundary = uuid.uuid4().hex
+    with open(path, "rb") as f:
+        content = f.read()
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{os.path.basename(path)}"\r\n'
+        "Content-Type: application/vnd.openxmlformats-officedocument.spreadsheetml.sheet\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _request(url: str, body=None, content_type=None):
+    request = urllib.request.Request(url, data=body, method="POST" if body else "GET")
+    if content_type:
+        request.add_header("Content-Type", content_type)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _report(name, timings, statuses, elapsed):
+    ok = sum(1 for status in statuses if status == 200)
+    rejected = sum(1 for status in statuses if status == 503)
+    print(
+        f"{name:8s} n={len(timings):5d} ok={ok:5d} 503={rejected:4d} "
+        f"throughput={len(timings) / elapsed:8.1f}/s "
+        f"p50={_percentile(timings, 50) * 1000:8.1f}ms "
+        f"p99={_percentile(timings, 99) * 1000:8.1f}ms "
+        f"mean={statistics.fmean(timings) * 1000 if timings else 0:8.1f}ms"
+    )
+
+
+def _start_server(port: int):
+    import uvicorn
+
+    config = uvicorn.Config("app.main:app", host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--file", default=os.path.join("..", "sample.xlsx"))
+    parser.add_argument("--engine", default="openpyxl")
+    parser.add_argument("--url", help="이미 실행 중인 서버 주소 (없으면 직접 띄움)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="loadtest_"))
+        server, thread = _start_server(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    body, content_type = _multipart(args.file)
+    upload_url = f"{base_url}/api/analyze-excel?engine={args.engine}"
+
+    upload_results = []
+    health_results = []
+    done = threading.Event()
+
+    def probe_health():
+        while not done.is_set():
+            health_results.append(_request(f"{base_url}/health"))
+            time.sleep(0.01)
+
+    probe = threading.Thread(target=probe_health, daemon=True)
+    start = time.perf_counter()
+    probe.start()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        upload_results = list(pool.map(lambda _: _request(upload_url, body, content_type), range(args.requests)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    probe.join()
+
+    print(f"clients={args.clients} requests={args.requests} file={args.file} engine={args.engine}")
+    _report("upload", [t for _, t in upload_results], [s for s, _ in upload_results], elapsed)
+    _report("health", [t for _, t in health_results], [s for s, _ in health_results], elapsed)
+
+    if server is not None:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
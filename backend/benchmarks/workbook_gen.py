@@ -0,0 +1,204 @@
+"""벤치마크용 합성 xlsx 생성기
+
+행/열/시트 수, placeholder 셀 비율, 서식 있는 텍스트 비율, 공유 문자열 수를 지정하여
+템플릿과 비슷한 xlsx 를 만듭니다. openpyxl 없이 XML 을 직접 기록하므로 큰 파일도 빠르게 만들어집니다.
+
+    cd backend
+    python -m benchmarks.workbook_gen /tmp/synthetic.xlsx --rows 5000 --columns 30 --sheets 3 --density 0.02
+"""
+import argparse
+import random
+import zipfile
+from typing import Any, Dict, List, NamedTuple
+from xml.sax.saxutils import escape
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_STYLES = (
+    f'{_XML_HEADER}<styleSheet xmlns="{_MAIN_NS}">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+class WorkbookSpec(NamedTuple):
+    """합성 워크북의 모양"""
+    sheets: int = 1
+    rows: int = 1000
+    columns: int = 20
+    # placeholder 가 들어가는 셀의 비율
+    density: float = 0.05
+    # placeholder 셀 중 서식 있는 텍스트(run 여러 개, 절반은 placeholder 가 run 경계에 걸침)의 비율
+    rich_ratio: float = 0.1
+    # placeholder 가 아닌 텍스트 셀이 나누어 쓰는 서로 다른 공유 문자열 수
+    shared_strings: int = 1000
+    # placeholder 가 아닌 셀 중 텍스트 셀의 비율 (나머지는 숫자)
+    text_ratio: float = 0.5
+    # 서로 다른 inputN 의 수
+    placeholders: int = 100
+    seed: int = 0
+
+    @property
+    def cells(self) -> int:
+        return self.sheets * self.rows * self.columns
+
+    def key(self) -> str:
+        """벤치마크 기록에서 같은 모양의 워크북끼리 비교하기 위한 키"""
+        return ",".join(f"{name}={value}" for name, value in self._asdict().items())
+
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _text(text: str) -> str:
+    preserve = ' xml:space="preserve"' if text != text.strip() else ""
+    return f"<t{preserve}>{escape(text)}</t>"
+
+
+def _placeholder_item(rng: random.Random, pattern: str, rich: bool) -> str:
+    """placeholder 가 들어간 <si>. 셀 전체가 placeholder 이거나 앞뒤에 안내 문구가 붙습니다."""
+    kind = rng.random()
+    if kind < 0.4:
+        prefix, suffix = "", ""
+    elif kind < 0.8:
+        prefix, suffix = "성명 : ", " (인)"
+    else:
+        prefix, suffix = "동의자 ", " 서명"
+    if not rich:
+        return f"<si>{_text(prefix + pattern + suffix)}</si>"
+
+    bold = '<rPr><b/><sz val="11"/></rPr>'
+    if rng.random() < 0.5:
+        # placeholder 를 두 run 에 나누어 둠 (Excel 에서 일부 글자만 서식을 바꾼 경우)
+        split = rng.randint(1, len(pattern) - 1)
+        runs = [(bold, prefix + pattern[:split]), ("", pattern[split:] + suffix)]
+    else:
+        runs = [(bold, prefix), ("", pattern), (bold, suffix)]
+    return "<si>" + "".join(f"<r>{properties}{_text(text)}</r>" for properties, text in runs if text) + "</si>"
+
+
+def write_workbook(path: str, spec: WorkbookSpec) -> Dict[str, Any]:
+    """spec 모양의 xlsx 를 path 에 기록하고 만들어진 셀 수를 반환합니다."""
+    rng = random.Random(spec.seed)
+    pool = [f"일반 텍스트 {index} " + "가나다라마바사" * (index % 4 + 1) for index in range(max(spec.shared_strings, 1))]
+    # 공유 문자열 표: 일반 텍스트를 먼저 두고 placeholder 문자열을 뒤에 이어 붙임
+    placeholder_items: List[str] = []
+    stats = {"placeholder_cells": 0, "rich_cells": 0, "text_cells": 0, "number_cells": 0}
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _content_types(spec.sheets))
+        zf.writestr("_rels/.rels", (
+            f'{_XML_HEADER}<Relationships xmlns="{_PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ))
+        zf.writestr("xl/workbook.xml", (
+            f'{_XML_HEADER}<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>'
+            + "".join(f'<sheet name="Sheet{index}" sheetId="{index}" r:id="rId{index}"/>' for index in range(1, spec.sheets + 1))
+            + '</sheets><calcPr calcId="191029"/></workbook>'
+        ))
+        zf.writestr("xl/_rels/workbook.xml.rels", (
+            f'{_XML_HEADER}<Relationships xmlns="{_PKG_REL_NS}">'
+            + "".join(
+                f'<Relationship Id="rId{index}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{index}.xml"/>'
+                for index in range(1, spec.sheets + 1)
+            )
+            + f'<Relationship Id="rId{spec.sheets + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+            + f'<Relationship Id="rId{spec.sheets + 2}" Type="{_REL_NS}/sharedStrings" Target="sharedStrings.xml"/>'
+            + '</Relationships>'
+        ))
+        zf.writestr("xl/styles.xml", _STYLES)
+
+        last_cell = f"{_column_letter(spec.columns)}{spec.rows}"
+        for sheet in range(1, spec.sheets + 1):
+            with zf.open(f"xl/worksheets/sheet{sheet}.xml", "w") as f:
+                f.write(
+                    f'{_XML_HEADER}<worksheet xmlns="{_MAIN_NS}"><dimension ref="A1:{last_cell}"/><sheetData>'.encode("utf-8")
+                )
+                for row in range(1, spec.rows + 1):
+                    cells = []
+                    for column in range(1, spec.columns + 1):
+                        ref = f"{_column_letter(column)}{row}"
+                        if rng.random() < spec.density:
+                            rich = rng.random() < spec.rich_ratio
+                            pattern = f"input{rng.randint(1, spec.placeholders)}"
+                            placeholder_items.append(_placeholder_item(rng, pattern, rich))
+                            index = len(pool) + len(placeholder_items) - 1
+                            cells.append(f'<c r="{ref}" s="1" t="s"><v>{index}</v></c>')
+                            stats["placeholder_cells"] += 1
+                            stats["rich_cells"] += rich
+                        elif rng.random() < spec.text_ratio:
+                            cells.append(f'<c r="{ref}" t="s"><v>{rng.randrange(len(pool))}</v></c>')
+                            stats["text_cells"] += 1
+                        else:
+                            cells.append(f'<c r="{ref}"><v>{rng.randint(0, 100000) / 100}</v></c>')
+                            stats["number_cells"] += 1
+                    f.write(f'<row r="{row}">{"".join(cells)}</row>'.encode("utf-8"))
+                f.write(b"</sheetData></worksheet>")
+
+        count = len(pool) + len(placeholder_items)
+        with zf.open("xl/sharedStrings.xml", "w") as f:
+            f.write(f'{_XML_HEADER}<sst xmlns="{_MAIN_NS}" count="{count}" uniqueCount="{count}">'.encode("utf-8"))
+            for text in pool:
+                f.write(f"<si>{_text(text)}</si>".encode("utf-8"))
+            for item in placeholder_items:
+                f.write(item.encode("utf-8"))
+            f.write(b"</sst>")
+    return stats
+
+
+def _content_types(sheets: int) -> str:
+    main = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+    return (
+        f'{_XML_HEADER}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        f'<Override PartName="/xl/workbook.xml" ContentType="{main}.sheet.main+xml"/>'
+        + "".join(
+            f'<Override PartName="/xl/worksheets/sheet{index}.xml" ContentType="{main}.worksheet+xml"/>'
+            for index in range(1, sheets + 1)
+        )
+        + f'<Override PartName="/xl/styles.xml" ContentType="{main}.styles+xml"/>'
+        + f'<Override PartName="/xl/sharedStrings.xml" ContentType="{main}.sharedStrings+xml"/>'
+        + '</Types>'
+    )
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    """WorkbookSpec 의 각 항목을 명령행 옵션으로 추가합니다."""
+    defaults = WorkbookSpec()
+    for name, value in defaults._asdict().items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+
+
+def spec_from_args(args: argparse.Namespace) -> WorkbookSpec:
+    return WorkbookSpec(**{name: getattr(args, name) for name in WorkbookSpec._fields})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    spec = spec_from_args(args)
+    stats = write_workbook(args.path, spec)
+    print(f"{args.path}: {spec.cells:,} cells, " + ", ".join(f"{name}={value:,}" for name, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
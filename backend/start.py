@@ -1,12 +1,65 @@
-import uvicorn
+"""API 서버 실행
+
+    python start.py                         # 개발: 코드가 바뀌면 자동 재시작
+    python start.py --production --workers 4  # 운영: 자동 재시작 없이 여러 서버 프로세스로 실행
+                                              # (2 이상은 JOB_BACKEND=redis, STORAGE_BACKEND 가 memory 가 아닐 때만)
+"""
+import argparse
 import os
+import sys
 
-if __name__ == "__main__":
+import uvicorn
+
+
+def main():
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    from app import config
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--production", action="store_true", help="자동 재시작 없이 여러 서버 프로세스로 실행")
+    parser.add_argument("--workers", type=int, default=config.SERVER_WORKERS, help="서버 프로세스 수 (0 이면 CPU 코어 수, --production 에서만). "
+                        "2 이상은 JOB_BACKEND=redis 이고 STORAGE_BACKEND 가 memory 가 아닐 때만")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    args = parser.parse_args()
+
+    if not args.production:
+        os.environ["SERVER_WORKERS"] = "1"
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            reload=True,
+            reload_dirs=["app"]
+        )
+        return
+
+    # 작업 대기열과 저장소가 프로세스 안에만 있으면 프로세스마다 따로 보게 되므로 서버 프로세스는 하나만
+    workers = args.workers or os.cpu_count() or 1
+    shared = config.JOB_BACKEND == "redis" and config.STORAGE_BACKEND != "memory"
+    if workers > 1 and not shared:
+        if args.workers:
+            parser.error(
+                f"서버 프로세스 {workers}개는 작업과 파일을 나누어 보게 됩니다. "
+                "JOB_BACKEND=redis 와 memory 가 아닌 STORAGE_BACKEND 를 쓰거나 --workers 1 로 실행하세요"
+            )
+        print(f"JOB_BACKEND={config.JOB_BACKEND}, STORAGE_BACKEND={config.STORAGE_BACKEND} 이므로 서버 프로세스 1개로 실행합니다", file=sys.stderr)
+        workers = 1
+    # 서버 프로세스들이 프로세스 풀 크기를 나누어 정하도록 (config.per_server_process)
+    os.environ["SERVER_WORKERS"] = str(workers)
+
+    # 부모 프로세스가 소켓을 열어 두고 서버 프로세스들을 미리 띄움. 각 프로세스는 WARMUP_TEMPLATES 를
+    # 분석/컴파일한 뒤에 요청을 받기 시작하며, 분석 결과와 placeholder 색인은 UPLOAD_DIR 에 저장되므로
+    # 먼저 끝난 프로세스의 결과를 나머지가 읽어 씀
     uvicorn.run(
         "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        reload_dirs=["app"]
-    )
\ No newline at end of file
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        lifespan="on",
+        timeout_graceful_shutdown=30
+    )
+
+
+if __name__ == "__main__":
+    main()
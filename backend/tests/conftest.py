@@ -0,0 +1,121 @@
+import atexit
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+
+import openpyxl
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 라우터 모듈을 불러올 때 만들어지는 서비스가 backend/uploads 에 쓰거나 정리 스레드를 띄우지 않도록
+if "UPLOAD_DIR" not in os.environ:
+    os.environ["UPLOAD_DIR"] = tempfile.mkdtemp(prefix="excel-tests-")
+    atexit.register(shutil.rmtree, os.environ["UPLOAD_DIR"], True)
+os.environ.setdefault("STORAGE_SWEEP_INTERVAL", "0")
+
+from app.services.excel_service import ExcelService  # noqa: E402
+from app.services.template_plan import CompiledTemplate  # noqa: E402
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = ExcelService(upload_dir=str(tmp_path / "uploads"), batch_workers=1, analysis_workers=1)
+    yield service
+    service.storage_janitor.stop()
+
+
+_INLINE_STRING_CELL = re.compile(rb'<c ([^>]*?) t="inlineStr"><is>(.*?)</is></c>', re.DOTALL)
+
+
+def share_strings(path):
+    """openpyxl 이 인라인 문자열로 쓴 셀을 Excel 처럼 sharedStrings.xml 의 공유 문자열로 바꿉니다."""
+    with zipfile.ZipFile(path) as source:
+        parts = {info.filename: source.read(info) for info in source.infolist()}
+
+    items = {}
+
+    def shared(match):
+        index = items.setdefault(match.group(2), len(items))
+        return b'<c %s t="s"><v>%d</v></c>' % (match.group(1), index)
+
+    for name in [name for name in parts if name.startswith("xl/worksheets/")]:
+        parts[name] = _INLINE_STRING_CELL.sub(shared, parts[name])
+    parts["xl/sharedStrings.xml"] = (
+        b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="%d" uniqueCount="%d">' % (len(items), len(items))
+        + b"".join(b"<si>%s</si>" % item for item in items)
+        + b"</sst>"
+    )
+    parts["[Content_Types].xml"] = parts["[Content_Types].xml"].replace(
+        b"</Types>",
+        b'<Override PartName="/xl/sharedStrings.xml" '
+        b'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>',
+    )
+    parts["xl/_rels/workbook.xml.rels"] = parts["xl/_rels/workbook.xml.rels"].replace(
+        b"</Relationships>",
+        b'<Relationship Id="rIdShared" Target="sharedStrings.xml" '
+        b'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/></Relationships>',
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as target:
+        for name, content in parts.items():
+            target.writestr(name, content)
+
+
+@pytest.fixture
+def make_template(tmp_path):
+    """{시트 이름: {셀 주소: 값}} 으로 템플릿 xlsx 를 만들고 경로를 반환하는 함수.
+    shared_strings 이면 문자열을 공유 문자열 테이블에 둡니다."""
+    def make(sheets, name="template.xlsx", shared_strings=False):
+        workbook = openpyxl.Workbook()
+        workbook.remove(workbook.active)
+        for sheet_name, cells in sheets.items():
+            sheet = workbook.create_sheet(sheet_name)
+            for ref, value in cells.items():
+                sheet[ref] = value
+        path = str(tmp_path / name)
+        workbook.save(path)
+        if shared_strings:
+            share_strings(path)
+        return path
+    return make
+
+
+def load_values(content: bytes, sheet: str):
+    """xlsx 바이트의 시트 값을 {셀 주소: 값} 으로 읽습니다 (서식 있는 텍스트는 평문으로)."""
+    workbook = openpyxl.load_workbook(io.BytesIO(content))
+    return {
+        cell.coordinate: str(cell.value) if isinstance(cell.value, openpyxl.cell.rich_text.CellRichText) else cell.value
+        for row in workbook[sheet].iter_rows()
+        for cell in row
+        if cell.value is not None
+    }
+
+
+def read_parts(content: bytes):
+    with zipfile.ZipFile(io.BytesIO(content)) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def fill_plan(service, path, input_values):
+    """컴파일된 템플릿 경로로 채운 xlsx 바이트"""
+    buffer = io.BytesIO()
+    CompiledTemplate.compile(path).fill(input_values, buffer)
+    return buffer.getvalue()
+
+
+def fill_xml(service, path, input_values):
+    """XML 스트리밍 경로로 채운 xlsx 바이트"""
+    return b"".join(service._iter_xlsx_via_xml(path, input_values))
+
+
+def fill_openpyxl(service, path, input_values):
+    """openpyxl 폴백 경로로 채운 xlsx 바이트"""
+    buffer = io.BytesIO()
+    service._write_excel_via_openpyxl(path, input_values, buffer)
+    return buffer.getvalue()
+
+
+FILL_PATHS = [fill_plan, fill_xml, fill_openpyxl]
@@ -0,0 +1,74 @@
+import io
+import zipfile
+from concurrent.futures import Future
+
+import pytest
+
+from app.models.excel_models import InputValue
+from app.services.batch_fill import BatchFiller, parse_value_rows
+from app.services.template_plan import TemplatePlanCache
+
+from conftest import load_values
+
+
+def test_parses_csv_from_a_file_object():
+    upload = io.BytesIO("﻿filename,input1,input2\na,1,x\nb,2,\n".encode("utf-8"))
+
+    rows = list(parse_value_rows(upload, "values.csv"))
+
+    assert rows == [("a", {"input1": "1", "input2": "x"}), ("b", {"input1": "2", "input2": ""})]
+    # 업로드 파일은 닫지 않음
+    assert not upload.closed
+
+
+def test_parses_jsonl_and_json_arrays():
+    jsonl = b'{"filename": "a", "input1": 1}\n\n{"input1": "two"}\n'
+    json_array = b'[{"filename": "a", "input1": 1}, {"input1": "two"}]'
+    expected = [("a", {"input1": "1"}), (None, {"input1": "two"})]
+
+    assert list(parse_value_rows(io.BytesIO(jsonl), "values.jsonl")) == expected
+    assert list(parse_value_rows(json_array, "values.json")) == expected
+
+
+def test_rejects_json_that_is_not_an_array():
+    with pytest.raises(ValueError, match="배열"):
+        list(parse_value_rows(b'{"input1": "1"}', "values.json"))
+
+
+class _RecordingExecutor:
+    """제출한 작업을 결과를 요청할 때 실행하며 동시에 대기 중인 작업 수의 최댓값을 기록"""
+
+    def __init__(self):
+        self.pending = 0
+        self.max_pending = 0
+
+    def submit(self, fn, *args):
+        executor = self
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+
+        class _Lazy(Future):
+            def result(self, timeout=None):
+                executor.pending -= 1
+                return fn(*args)
+
+        return _Lazy()
+
+
+def test_parallel_fill_keeps_a_bounded_number_of_chunks_in_flight(make_template, tmp_path):
+    path = make_template({"Sheet": {"A1": "input1"}})
+    filler = BatchFiller(TemplatePlanCache(), max_workers=2, parallel_threshold=1)
+    executor = _RecordingExecutor()
+    filler._get_executor = lambda: executor
+    rows = [(None, [InputValue(pattern="input1", value=str(index), cell="A1", sheet="Sheet")]) for index in range(40)]
+
+    output = str(tmp_path / "batch.zip")
+    count = filler.fill(path, rows, output)
+
+    assert count == 40
+    assert executor.max_pending <= 4
+    with zipfile.ZipFile(output) as archive:
+        names = archive.namelist()
+        assert len(names) == 40
+        assert load_values(archive.read(names[-1]), "Sheet") == {"A1": "39"}
+
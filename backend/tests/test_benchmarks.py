@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+
+import openpyxl
+import pytest
+
+from benchmarks.bench_service import CASES, find_regressions, run_case
+from benchmarks.workbook_gen import WorkbookSpec, write_workbook
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPEC = WorkbookSpec(sheets=2, rows=30, columns=6, density=0.2, rich_ratio=0.5, shared_strings=10, placeholders=5)
+
+
+@pytest.fixture(scope="module")
+def workbook(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("bench") / "synthetic.xlsx")
+    return path, write_workbook(path, SPEC)
+
+
+def test_generated_workbook_matches_its_stats(workbook, service):
+    path, stats = workbook
+
+    assert len(openpyxl.load_workbook(path).sheetnames) == SPEC.sheets
+    assert stats["placeholder_cells"] + stats["text_cells"] + stats["number_cells"] == SPEC.cells
+    assert stats["rich_cells"] and stats["rich_cells"] <= stats["placeholder_cells"]
+
+    # run 경계에 걸친 placeholder 까지 모두 분석되어야 함
+    table = service.analyze_excel_table(path, engine="stream")
+    assert len({(field["sheet"], field["cell"]) for field in table.fields()[1]}) == stats["placeholder_cells"]
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_every_case_runs_on_a_small_workbook(workbook, case):
+    path, _ = workbook
+    options = {"batch_rows": 2, "batch_workers": 1, "analysis_workers": 1}
+
+    result = run_case(case, path, SPEC, 1, options)
+
+    assert 0 < result["wall_best"] <= result["wall_median"]
+    assert result["throughput"] > 0 and result["unit"].endswith("/s")
+
+
+def _run(wall_median, rss_delta_mb=10.0, spec_key="shape", regressions=None):
+    return {
+        "spec_key": spec_key,
+        "results": {"fill-plan": {"wall_median": wall_median, "rss_delta_mb": rss_delta_mb}},
+        "regressions": regressions or [],
+    }
+
+
+def test_find_regressions_compares_against_recent_median():
+    history = [_run(1.0), _run(1.2), _run(0.8), _run(10.0, spec_key="other"), _run(0.1, regressions=["x"])]
+
+    assert find_regressions(history, _run(1.2), 0.25, 0.25, 5) == []
+    assert find_regressions(history, _run(1.3), 0.25, 0.25, 5) == ["fill-plan wall_median: 1.3000 > 1.0000 (+25%)"]
+    # 1MB 미만의 RSS 증가량 차이는 무시
+    assert find_regressions(history, _run(1.0, rss_delta_mb=10.9), 0.25, 0.01, 5) == []
+    assert find_regressions([], _run(100.0), 0.25, 0.25, 5) == []
+
+
+def test_cli_records_history_and_fails_on_regression(tmp_path):
+    history = tmp_path / "history.json"
+    command = [
+        sys.executable, "-m", "benchmarks.bench_service", "--rows", "20", "--columns", "4",
+        "--cases", "compile", "--repeat", "1", "--history", str(history),
+    ]
+
+    first = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, timeout=300)
+    assert first.returncode == 0, first.stderr
+    assert "compile" in first.stdout
+    [run] = json.loads(history.read_text(encoding="utf-8"))
+    assert run["results"]["compile"]["wall_median"] > 0 and run["regressions"] == []
+
+    # 기준 기록을 아주 빠르게 바꾸면 다음 실행은 회귀로 판정되어 종료 코드 1
+    run["results"]["compile"]["wall_median"] = 1e-9
+    history.write_text(json.dumps([run]), encoding="utf-8")
+    second = subprocess.run(command + ["--no-save"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=300)
+    assert second.returncode == 1
+    assert "REGRESSION compile wall_median" in second.stdout
+    assert len(json.loads(history.read_text(encoding="utf-8"))) == 1
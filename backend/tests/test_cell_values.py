@@ -0,0 +1,78 @@
+import datetime
+import io
+import zipfile
+
+import openpyxl
+import pytest
+
+from app.models.excel_models import InputValue
+from app.services.cell_values import DATE_FORMAT, DATETIME_FORMAT, DateStyles
+
+from conftest import FILL_PATHS, fill_openpyxl, fill_plan, fill_xml
+
+DATE_VALUES = [
+    InputValue(pattern="input1", value="2024-02-29", cell="A1", sheet="Sheet", type="date"),
+    InputValue(pattern="input2", value="2024-02-29 13:45:00", cell="A2", sheet="Sheet", type="date"),
+]
+
+
+@pytest.mark.parametrize("fill", FILL_PATHS)
+def test_date_cells_get_a_date_format(service, make_template, fill):
+    path = make_template({"Sheet": {"A1": "input1", "A2": "input2"}})
+
+    sheet = openpyxl.load_workbook(io.BytesIO(fill(service, path, DATE_VALUES)))["Sheet"]
+
+    assert sheet["A1"].is_date and sheet["A1"].number_format == DATE_FORMAT
+    assert sheet["A1"].value == datetime.datetime(2024, 2, 29)
+    assert sheet["A2"].is_date and sheet["A2"].number_format == DATETIME_FORMAT
+    assert sheet["A2"].value == datetime.datetime(2024, 2, 29, 13, 45)
+
+
+@pytest.mark.parametrize("fill", [fill_plan, fill_xml])
+def test_date_cells_keep_an_existing_date_format(service, tmp_path, fill):
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "Sheet"
+    workbook.active["A1"] = "input1"
+    workbook.active["A1"].number_format = "dd/mm/yyyy"
+    path = str(tmp_path / "dated.xlsx")
+    workbook.save(path)
+
+    sheet = openpyxl.load_workbook(io.BytesIO(fill(service, path, DATE_VALUES[:1])))["Sheet"]
+
+    assert sheet["A1"].number_format == "dd/mm/yyyy"
+    assert sheet["A1"].value == datetime.datetime(2024, 2, 29)
+
+
+def test_date_styles_reuse_added_formats():
+    styles = DateStyles(
+        '<styleSheet><cellXfs count="2"><xf numFmtId="0" fontId="0"/><xf numFmtId="0" fontId="1"/></cellXfs></styleSheet>'
+    )
+
+    assert styles.style_for(0, False) == styles.style_for(0, False) == 2
+    assert styles.style_for(1, False) == 3
+    assert styles.style_for(0, True) == 4
+
+    rendered = styles.render()
+    assert '<numFmts count="2"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>' in rendered
+    assert '<cellXfs count="5">' in rendered
+    assert '<xf numFmtId="164" fontId="1" applyNumberFormat="1"/>' in rendered
+
+
+def test_openpyxl_fill_without_calc_properties(service, make_template, tmp_path):
+    path = make_template({"Sheet": {"A1": "input1"}})
+    # calcPr 가 없는 통합 문서 (openpyxl 로 읽으면 calculation 이 None)
+    stripped = str(tmp_path / "no_calc.xlsx")
+    with zipfile.ZipFile(path) as source, zipfile.ZipFile(stripped, "w", zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            content = source.read(info)
+            if info.filename == "xl/workbook.xml":
+                start = content.index(b"<calcPr")
+                content = content[:start] + content[content.index(b"/>", start) + 2:]
+            target.writestr(info, content)
+    assert openpyxl.load_workbook(stripped).calculation is None
+
+    content = fill_openpyxl(service, stripped, [InputValue(pattern="input1", value="42", cell="A1", sheet="Sheet", type="number")])
+
+    workbook = openpyxl.load_workbook(io.BytesIO(content))
+    assert workbook["Sheet"]["A1"].value == 42
+    assert workbook.calculation.fullCalcOnLoad
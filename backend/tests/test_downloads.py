@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.models.excel_models import InputValue, ProcessExcelRequest
+from app.routers import excel
+
+from conftest import load_values
+
+
+def _request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "query_string": b"",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def _download(file_id, **headers):
+    async def run():
+        response = await excel.download_file(_request(**headers), file_id)
+        body = b""
+        if hasattr(response, "body_iterator"):
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        return response, body
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def processed(service, make_template, monkeypatch):
+    monkeypatch.setattr(excel, "excel_service", service)
+    path = make_template({"Sheet": {"A1": "input1"}})
+    processed_id = service.process_excel_with_inputs(path, [InputValue(pattern="input1", value="x", cell="A1", sheet="Sheet")])
+    with open(service.get_file_path(processed_id, "processed_"), "rb") as f:
+        return processed_id, f.read()
+
+
+def test_full_download_has_validators(processed):
+    file_id, content = processed
+
+    response, body = _download(file_id)
+
+    assert response.status_code == 200 and body == content
+    assert response.headers["content-length"] == str(len(content))
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"].startswith('"') and response.headers["last-modified"]
+
+
+def test_if_none_match_returns_not_modified(processed):
+    file_id, _ = processed
+    etag = _download(file_id)[0].headers["etag"]
+
+    for header in (etag, f'"other", W/{etag}', "*"):
+        response, body = _download(file_id, if_none_match=header)
+        assert response.status_code == 304 and body == b""
+        assert response.headers["etag"] == etag
+
+    assert _download(file_id, if_none_match='"other"')[0].status_code == 200
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-9", 0, 9),
+    ("bytes=10-", 10, None),
+    ("bytes=-20", -20, None),
+    ("bytes=5-100000000", 5, None),
+])
+def test_range_returns_partial_content(processed, header, start, end):
+    file_id, content = processed
+    expected = content[start:] if end is None else content[start:end + 1]
+    first = start % len(content)
+
+    response, body = _download(file_id, range=header)
+
+    assert response.status_code == 206 and body == expected
+    assert response.headers["content-range"] == f"bytes {first}-{first + len(expected) - 1}/{len(content)}"
+    assert response.headers["content-length"] == str(len(expected))
+
+
+def test_unsatisfiable_and_ignored_ranges(processed):
+    file_id, content = processed
+
+    response, _ = _download(file_id, range=f"bytes={len(content)}-")
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(content)}"
+
+    # 여러 구간과 해석할 수 없는 값은 전체 전송
+    for header in ("bytes=0-1,4-5", "items=0-1", "bytes=a-b"):
+        response, body = _download(file_id, range=header)
+        assert response.status_code == 200 and body == content
+
+
+def test_if_range_sends_everything_when_the_file_changed(processed):
+    file_id, content = processed
+    etag = _download(file_id)[0].headers["etag"]
+
+    response, body = _download(file_id, range="bytes=0-9", if_range=etag)
+    assert response.status_code == 206 and body == content[:10]
+
+    response, body = _download(file_id, range="bytes=0-9", if_range='"stale"')
+    assert response.status_code == 200 and body == content
+
+
+def test_missing_file_is_not_found(processed):
+    with pytest.raises(HTTPException) as error:
+        _download("0" * 32)
+    assert error.value.status_code == 404
+
+
+def test_streamed_process_matches_the_stored_result(service, make_template, monkeypatch):
+    monkeypatch.setattr(excel, "excel_service", service)
+    with open(make_template({"Sheet": {"A1": "input1", "A2": "input1"}}), "rb") as f:
+        file_id = service.save_uploaded_file(f.read(), "a.xlsx")
+    request = ProcessExcelRequest(
+        file_id=file_id, input_values=[InputValue(pattern="input1", value="x", cell="A1", sheet="Sheet")]
+    )
+
+    async def run():
+        response = await excel.process_excel(request, stream=True)
+        return response, b"".join([chunk async for chunk in response.body_iterator])
+
+    response, body = asyncio.run(run())
+
+    assert response.media_type == excel.XLSX_MEDIA_TYPE
+    assert load_values(body, "Sheet") == {"A1": "x", "A2": "input1"}
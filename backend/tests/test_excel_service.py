@@ -0,0 +1,22 @@
+import os
+
+from app.models.excel_models import InputValue
+
+
+def test_delete_keeps_shared_uploads(service, make_template):
+    with open(make_template({"Sheet": {"A1": "input1"}}), "rb") as f:
+        content = f.read()
+    # 같은 내용을 두 사용자가 올리면 같은 file_id
+    file_id = service.save_uploaded_file(content, "a.xlsx")
+    assert service.save_uploaded_file(content, "b.xlsx") == file_id
+
+    processed_id = service.process_excel_with_inputs(
+        service.get_template_path(file_id), [InputValue(pattern="input1", value="x", cell="A1", sheet="Sheet")]
+    )
+
+    assert service.delete_file(file_id) == []
+    assert service.has_upload(file_id)
+    assert os.path.exists(service.get_template_path(file_id))
+
+    assert service.delete_file(processed_id) == ["processed"]
+    assert service.delete_file(processed_id) == []
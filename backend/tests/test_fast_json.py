@@ -0,0 +1,17 @@
+import json
+
+import pytest
+
+from app.services import fast_json
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_non_string_keys_like_json(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(fast_json, "orjson", None)
+    elif fast_json.orjson is None:
+        pytest.skip("orjson 이 설치되어 있지 않음")
+    # pandas 프로필의 열 이름은 숫자일 수 있음
+    value = {"columns": {1.5: {"count": 2}, 3: "x", None: [], "이름": "값"}}
+
+    assert fast_json.loads(fast_json.dumps(value)) == json.loads(json.dumps(value))
@@ -0,0 +1,138 @@
+import datetime
+import io
+
+import openpyxl
+import pytest
+from openpyxl.cell.rich_text import CellRichText, TextBlock
+from openpyxl.cell.text import InlineFont
+
+from app.models.excel_models import InputValue
+from app.services.incremental_fill import BLOCK_BYTES, IncrementalFillCache
+from app.services.template_plan import CompiledTemplate
+
+from conftest import FILL_PATHS, fill_openpyxl, fill_plan, fill_xml, load_values, read_parts
+
+
+def _values(*items, sheet="Sheet"):
+    """(패턴, 값, 셀[, 형식]) 목록을 InputValue 목록으로"""
+    return [
+        InputValue(pattern=pattern, value=value, cell=cell, sheet=sheet, type=value_type[0] if value_type else "string")
+        for pattern, value, cell, *value_type in items
+    ]
+
+
+@pytest.mark.parametrize("shared_strings", [False, True])
+@pytest.mark.parametrize("fill", [fill_plan, fill_xml])
+def test_fill_paths_match_openpyxl(service, make_template, fill, shared_strings):
+    path = make_template({
+        "Sheet": {
+            "A1": "name: input1, age: input2",
+            "A2": "input2",
+            "A3": "input3",
+            "A4": "input4",
+            "A5": "input5",
+            "A6": "input6",
+            "A7": "total input8 / input7",
+            "B1": "input7 is untouched",
+            # 같은 패턴이 여러 셀에 있으면 값을 받은 셀만 채움
+            "C1": "input10",
+            "C2": "input10",
+            "C3": "input10",
+        },
+        "Other": {"A1": "input9 input1", "A2": "input1"},
+    }, shared_strings=shared_strings)
+    input_values = _values(
+        ("input1", "A & <B>", "A1"),
+        ("input2", "30", "A2"),
+        ("input3", "1234.5", "A3", "number"),
+        ("input4", "true", "A4", "bool"),
+        ("input5", "2024-03-01", "A5", "date"),
+        ("input6", "=SUM(A3:A3)", "A6", "formula"),
+        # 셀 전체가 placeholder 가 아니면 형식과 관계없이 텍스트로 치환
+        ("input8", "99", "A7", "number"),
+        ("input10", "kim", "C1"),
+        ("input10", "lee", "C2"),
+    ) + _values(("input9", "x", "A1"), sheet="Other")
+
+    expected = fill_openpyxl(service, path, input_values)
+    actual = fill(service, path, input_values)
+
+    for sheet in ("Sheet", "Other"):
+        assert load_values(actual, sheet) == load_values(expected, sheet)
+    values = load_values(actual, "Sheet")
+    assert values["A1"] == "name: A & <B>, age: 30"
+    assert values["A3"] == 1234.5
+    assert values["A4"] is True
+    assert values["A5"] == datetime.datetime(2024, 3, 1)
+    assert values["A6"] == "=SUM(A3:A3)"
+    assert values["A7"] == "total 99 / input7"
+    assert values["B1"] == "input7 is untouched"
+    assert (values["C1"], values["C2"], values["C3"]) == ("kim", "lee", "input10")
+    assert load_values(actual, "Other") == {"A1": "x A & <B>", "A2": "input1"}
+
+
+@pytest.mark.parametrize("fill", [fill_plan, fill_openpyxl])
+def test_cell_values_take_precedence_over_other_cells(service, make_template, fill):
+    path = make_template({"Sheet": {"A1": "input1 input2", "A2": "input2 input1"}})
+    input_values = _values(("input1", "a1", "A1"), ("input2", "a2", "A2"))
+
+    assert load_values(fill(service, path, input_values), "Sheet") == {"A1": "a1 a2", "A2": "a2 a1"}
+
+    input_values = _values(("input1", "first", "A1"), ("input1", "second", "A2"))
+    assert load_values(fill(service, path, input_values), "Sheet") == {"A1": "first input2", "A2": "input2 second"}
+
+
+@pytest.mark.parametrize("fill", FILL_PATHS)
+def test_placeholder_split_across_rich_text_runs(service, tmp_path, fill):
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "Sheet"
+    workbook.active["A1"] = CellRichText([TextBlock(InlineFont(b=True), "inp"), TextBlock(InlineFont(i=True), "ut1 tail")])
+    path = str(tmp_path / "rich.xlsx")
+    workbook.save(path)
+
+    content = fill(service, path, _values(("input1", "Alice", "A1")))
+
+    assert load_values(content, "Sheet") == {"A1": "Alice tail"}
+    if fill is not fill_openpyxl:
+        # 나뉜 패턴은 시작 run 의 서식으로 교체되고 뒤 run 의 나머지 텍스트는 서식을 유지
+        runs = openpyxl.load_workbook(io.BytesIO(content), rich_text=True)["Sheet"]["A1"].value
+        assert [(run.text, bool(run.font.b), bool(run.font.i)) for run in runs] == [("Alice", True, False), (" tail", False, True)]
+
+
+def test_incremental_refill_matches_a_full_refill(make_template):
+    # 여러 블록에 걸친 시트에서 값 일부만 바꿔 다시 채움
+    rows = {f"A{row}": f"row {row} input{row}" for row in range(1, 3001)}
+    rows.update({"B1": "input1", "B2": "input2"})
+    path = make_template({"Sheet": rows})
+    plan = CompiledTemplate.compile(path)
+    assert plan.parts[plan.sheets["Sheet"].part].size > 2 * BLOCK_BYTES
+
+    first = _values(*[(f"input{row}", f"v{row}", f"A{row}") for row in range(1, 3001)], ("input1", "7", "B1", "number"))
+    second = [
+        InputValue(**dict(value.model_dump(), value="changed")) if value.cell in ("A5", "A2900") else value
+        for value in first
+    ] + _values(("input2", "2024-01-02", "B2", "date"))
+
+    cache = IncrementalFillCache()
+    b"".join(cache.iter_fill(plan, first, session_id="s"))
+    incremental = b"".join(cache.iter_fill(plan, second, session_id="s"))
+    full = b"".join(plan.iter_fill(second))
+
+    assert read_parts(incremental) == read_parts(full)
+    values = load_values(incremental, "Sheet")
+    assert values["A5"] == "row 5 changed" and values["A6"] == "row 6 v6"
+    assert values["B1"] == 7 and values["B2"] == datetime.datetime(2024, 1, 2)
+
+
+def test_incremental_refill_members_are_valid_deflate_streams(make_template):
+    path = make_template({"Sheet": {f"A{row}": f"input{row}" for row in range(1, 2001)}})
+    plan = CompiledTemplate.compile(path)
+    cache = IncrementalFillCache()
+    input_values = _values(*[(f"input{row}", "x" * 20, f"A{row}") for row in range(1, 2001)])
+
+    b"".join(cache.iter_fill(plan, input_values, session_id="s"))
+    content = b"".join(cache.iter_fill(plan, input_values[:-1] + _values(("input2000", "y", "A2000")), session_id="s"))
+
+    # zipfile 이 읽으면서 CRC 를 검사하므로 이어 붙인 압축 스트림과 CRC 가 맞는지 확인됨
+    assert read_parts(content)[plan.sheets["Sheet"].part].endswith(b"</worksheet>")
+    assert load_values(content, "Sheet")["A2000"] == "y"
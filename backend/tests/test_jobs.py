@@ -0,0 +1,176 @@
+import threading
+import time
+
+import pytest
+
+from app.services.jobs import JOB_LANES, JobBroker, JobRunner, LocalRedisClient
+
+
+def _wait_for(predicate, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = predicate()
+        if value:
+            return value
+        time.sleep(0.02)
+    raise AssertionError("시간 안에 조건을 만족하지 않았습니다")
+
+
+def _finished(broker, job_id):
+    return lambda: (broker.get(job_id) or {}).get("status") in ("succeeded", "failed") and broker.get(job_id)
+
+
+@pytest.fixture
+def uploaded(service, make_template):
+    with open(make_template({"Sheet": {"A1": "input1", "A2": "input2"}}), "rb") as f:
+        return service.save_uploaded_file(f.read(), "template.xlsx")
+
+
+def _rows(count):
+    return [[{"pattern": "input1", "value": f"v{row}", "cell": "A1", "sheet": "Sheet"}] for row in range(count)]
+
+
+def test_local_client_expires_values():
+    client = LocalRedisClient()
+    client.set("short", "a", ex=1)
+    client.set("kept", "b")
+
+    assert client.get("short") == b"a"
+    time.sleep(1.05)
+    assert client.get("short") is None
+    assert client.get("kept") == b"b"
+
+
+def test_expired_jobs_are_skipped_by_pop():
+    broker = JobBroker(LocalRedisClient(), ttl=1)
+    job = broker.submit("analyze", {"file_id": "x"}, "interactive")
+
+    time.sleep(1.05)
+
+    assert broker.get(job["job_id"]) is None
+    assert broker.pop(JOB_LANES, timeout=0.01) is None
+
+
+def test_interactive_lane_is_popped_first():
+    broker = JobBroker(LocalRedisClient())
+    batch = broker.submit("batch", {"file_id": "x"}, "batch")
+    interactive = broker.submit("analyze", {"file_id": "x"}, "interactive")
+
+    assert broker.queue_lengths() == {"interactive": 1, "batch": 1}
+    assert broker.pop(JOB_LANES)["job_id"] == interactive["job_id"]
+    assert broker.pop(JOB_LANES)["job_id"] == batch["job_id"]
+    assert broker.pop(JOB_LANES, timeout=0.01) is None
+
+    with pytest.raises(ValueError):
+        broker.submit("analyze", {"file_id": "x"}, "urgent")
+
+
+def test_interactive_reserved_is_capped_below_workers():
+    broker = JobBroker(LocalRedisClient())
+
+    assert JobRunner(broker, workers=1, interactive_reserved=1, use_processes=False).interactive_reserved == 0
+    assert JobRunner(broker, workers=3, interactive_reserved=5, use_processes=False).interactive_reserved == 2
+
+
+def test_reserved_worker_runs_interactive_jobs_while_batches_wait(service, uploaded):
+    release = threading.Event()
+    process_batch = service.process_excel_batch
+
+    def blocking_batch(*args, **kwargs):
+        release.wait(30)
+        return process_batch(*args, **kwargs)
+
+    service.process_excel_batch = blocking_batch
+    broker = JobBroker(LocalRedisClient())
+    runner = JobRunner(broker, workers=2, interactive_reserved=1, use_processes=False, service=service)
+    runner.start()
+    try:
+        first = broker.submit("batch", {"file_id": uploaded, "rows": _rows(2)}, "batch")
+        _wait_for(lambda: broker.get(first["job_id"])["status"] == "running")
+        second = broker.submit("batch", {"file_id": uploaded, "rows": _rows(2)}, "batch")
+        interactive = broker.submit("analyze", {"file_id": uploaded}, "interactive")
+
+        # 남은 작업자는 interactive 만 보므로 두 번째 일괄 작업은 대기열에 남음
+        assert _wait_for(_finished(broker, interactive["job_id"]))["status"] == "succeeded"
+        assert broker.get(second["job_id"])["status"] == "queued"
+        assert runner.stats()["running"] == {"interactive": 0, "batch": 1}
+        assert runner.stats()["queued"] == {"interactive": 0, "batch": 1}
+
+        release.set()
+        for job in (first, second):
+            assert _wait_for(_finished(broker, job["job_id"]))["status"] == "succeeded"
+    finally:
+        release.set()
+        runner.stop()
+
+
+def test_status_and_progress_transitions(service, uploaded, monkeypatch):
+    monkeypatch.setattr("app.services.jobs._PROGRESS_INTERVAL", 0)
+    broker = JobBroker(LocalRedisClient())
+    seen = []
+    update = broker.update
+
+    def recording_update(job_id, **fields):
+        seen.append(fields)
+        return update(job_id, **fields)
+
+    broker.update = recording_update
+    process_batch = service.process_excel_batch
+
+    def relayed_batch(template_path, rows, progress):
+        # 완료 뒤에 도착한 진행률은 버려지므로 첫 진행률이 기록될 때까지 기다림
+        def waiting_progress(done, total):
+            progress(done, total)
+            if done == 1:
+                _wait_for(lambda: any(set(fields) == {"progress"} for fields in seen))
+
+        return process_batch(template_path, rows, progress=waiting_progress)
+
+    service.process_excel_batch = relayed_batch
+    runner = JobRunner(broker, workers=1, use_processes=False, service=service)
+    job = broker.submit("batch", {"file_id": uploaded, "rows": _rows(3)}, "batch")
+    missing = broker.submit("analyze", {"file_id": "0" * 32}, "interactive")
+    assert job["status"] == "queued" and job["progress"] == 0.0
+
+    runner.start()
+    try:
+        done = _wait_for(_finished(broker, job["job_id"]))
+        failed = _wait_for(_finished(broker, missing["job_id"]))
+    finally:
+        runner.stop()
+
+    assert done["status"] == "succeeded" and done["progress"] == 1.0
+    assert done["started_at"] <= done["finished_at"]
+    assert done["result"]["total_files"] == 3
+    assert done["download_url"] == f"/api/download/batch/{done['result']['batch_id']}"
+    assert failed["status"] == "failed" and failed["error"]
+    assert runner.stats()["succeeded"] == 1 and runner.stats()["failed"] == 1
+
+    statuses = [fields["status"] for fields in seen if "status" in fields]
+    assert statuses.index("running") < statuses.index("succeeded")
+    # 일괄 작업이 행을 처리하는 동안 0 초과 1 이하의 진행률을 기록
+    progress = [fields["progress"] for fields in seen if set(fields) == {"progress"}]
+    assert progress and all(0 < value <= 1 for value in progress)
+
+
+def test_spawned_worker_process_runs_jobs(service, uploaded, tmp_path, monkeypatch):
+    # 작업 프로세스는 설정(UPLOAD_DIR)으로 서비스를 새로 만들어 같은 저장소를 읽음
+    monkeypatch.setenv("UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    broker = JobBroker(LocalRedisClient())
+    runner = JobRunner(broker, workers=1, use_processes=True)
+    job = broker.submit("process", {
+        "file_id": uploaded,
+        "input_values": [{"pattern": "input1", "value": "x", "cell": "A1", "sheet": "Sheet"}],
+    }, "interactive")
+
+    runner.start()
+    try:
+        done = _wait_for(_finished(broker, job["job_id"]), timeout=120)
+    finally:
+        runner.stop()
+
+    assert done["status"] == "succeeded", done["error"]
+    processed_id = done["result"]["processed_file_id"]
+    assert done["download_url"] == f"/api/download/{processed_id}"
+    assert service.fetch_file(processed_id, "processed_") is not None
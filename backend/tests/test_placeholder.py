@@ -0,0 +1,21 @@
+from app.services.placeholder import PlaceholderSubstituter
+
+
+def test_matches_whole_placeholders_only():
+    substituter = PlaceholderSubstituter([("input1", "A"), ("input12", "B")])
+
+    assert substituter.sub("input1 input12 input123") == "A B input123"
+    assert substituter.sub("myinput1 xinput12 _input1") == "myinput1 xinput12 _input1"
+    assert substituter.sub("(input1)-INPUT12,") == "(A)-B,"
+
+
+def test_leading_guard_only_applies_to_word_patterns():
+    substituter = PlaceholderSubstituter([("{name}", "A")])
+
+    assert substituter.sub("x{name}") == "xA"
+
+
+def test_xml_text_substitution_respects_the_guard():
+    substituter = PlaceholderSubstituter([("input1", "A&B")])
+
+    assert substituter.sub_xml_text("<t>input1 myinput1</t>") == "<t>A&amp;B myinput1</t>"
@@ -0,0 +1,125 @@
+import openpyxl
+import pytest
+
+from app.models.excel_models import InputValue
+from app.services import sheet_preview
+from app.services.sheet_preview import render_csv, render_html
+
+from conftest import fill_plan, load_values
+
+TEMPLATE = {
+    "Sheet": {
+        "A1": "name: input1, age: input2",
+        "A2": "input2",
+        "A3": "input3",
+        "A4": "input4",
+        "A5": "input5",
+        "B1": "input1",
+        "B2": "input1",
+        "C3": "plain",
+    },
+    "Other": {"A1": "input1"},
+}
+
+
+def _values(*items):
+    return [
+        InputValue(pattern=pattern, value=value, cell=cell, sheet="Sheet", type=value_type[0] if value_type else "string")
+        for pattern, value, cell, *value_type in items
+    ]
+
+
+@pytest.mark.parametrize("shared_strings", [False, True])
+def test_preview_matches_the_filled_workbook(service, make_template, shared_strings):
+    path = make_template(TEMPLATE, shared_strings=shared_strings)
+    input_values = _values(
+        ("input1", "Kim", "A1"),
+        ("input2", "30", "A2"),
+        ("input3", "1234.5", "A3", "number"),
+        ("input4", "true", "A4", "bool"),
+        ("input5", "2024-03-01", "A5", "date"),
+        ("input1", "Lee", "B2"),
+    )
+
+    preview = service.preview_excel(path, "Sheet", "A1:C5", input_values)
+    filled = load_values(fill_plan(service, path, input_values), "Sheet")
+
+    cells = {
+        f"{column}{row}": value
+        for row, values in zip(range(1, 6), preview.rows)
+        for column, value in zip("ABC", values)
+        if value is not None
+    }
+    assert cells == {
+        "A1": filled["A1"], "A2": filled["A2"], "B1": filled["B1"], "B2": filled["B2"], "C3": "plain",
+        "A3": "1234.5", "A4": "TRUE", "A5": "2024-03-01",
+    }
+    assert cells["A1"] == "name: Kim, age: 30" and cells["B1"] == "input1" and cells["B2"] == "Lee"
+    assert preview.to_dict()["filled"] == ["A1", "A2", "B2", "A3", "A4", "A5"]
+
+
+def test_pattern_values_apply_to_every_cell(service, make_template):
+    path = make_template(TEMPLATE)
+
+    preview = service.preview_excel(path, None, "A1:B2", {"input1": "X"})
+
+    assert preview.sheet == "Sheet"
+    assert preview.rows == [["name: X, age: input2", "X"], ["input2", "X"]]
+    html = render_html(preview)
+    assert '<td class="filled">X</td>' in html
+    assert '<td class="placeholder">input2</td>' in html
+
+
+def test_default_range_is_trimmed_to_content(service, make_template):
+    path = make_template(TEMPLATE)
+
+    preview = service.preview_excel(path, "1")
+
+    assert preview.sheet == "Other" and preview.range_ref == "A1:A1"
+    assert render_csv(preview) == "input1\n"
+
+
+def test_merged_cells_and_rows_far_below(service, tmp_path):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Sheet"
+    for row in range(1, 2001):
+        sheet.cell(row, 1, f"row {row}")
+    sheet["B1500"] = "input1"
+    sheet.merge_cells("B1500:C1501")
+    path = str(tmp_path / "tall.xlsx")
+    workbook.save(path)
+
+    preview = service.preview_excel(path, "Sheet", "A1500:C1502", {"input1": "<x>"})
+
+    assert preview.rows == [["row 1500", "<x>", None], ["row 1501", None, None], ["row 1502", None, None]]
+    assert preview.to_dict()["merges"] == ["B1500:C1501"]
+    html = render_html(preview)
+    assert '<td rowspan="2" colspan="2" class="filled">&lt;x&gt;</td>' in html
+    assert "<tr><th>1501</th><td>row 1501</td></tr>" in html
+
+
+def test_viewports_are_cached_per_range(service, make_template, monkeypatch):
+    path = make_template(TEMPLATE)
+    reads = []
+    read_viewport = sheet_preview.read_viewport
+    monkeypatch.setattr(sheet_preview, "read_viewport", lambda *args: reads.append(args[2]) or read_viewport(*args))
+
+    service.preview_excel(path, "Sheet", "A1:B2", {"input1": "a"})
+    service.preview_excel(path, "Sheet", "A1:B2", {"input1": "b"})
+    service.preview_excel(path, "Sheet", "B2:A1", [])
+    service.preview_excel(path, "Sheet", "A1:C3", [])
+
+    assert reads == [(1, 1, 2, 2), (1, 1, 3, 3)]
+
+
+def test_invalid_requests(service, make_template):
+    path = make_template(TEMPLATE)
+    service.preview_max_cells = 26 * 50
+
+    with pytest.raises(ValueError):
+        service.preview_excel(path, "Sheet", "A1:Z51")
+    with pytest.raises(KeyError):
+        service.preview_excel(path, "Missing")
+    with pytest.raises(ValueError):
+        service.preview_excel(path, "Sheet", "A1:B2", _values(("input1", "not a number", "A1", "number")))
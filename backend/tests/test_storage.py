@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+from app.models.excel_models import InputValue
+from app.services.excel_service import ExcelService
+from app.services.storage import (
+    LocalObjectStoreClient,
+    LocalStorage,
+    MemoryStorage,
+    S3Storage,
+    create_storage,
+)
+
+
+@pytest.fixture(params=["local", "memory", "s3"])
+def storage(request, tmp_path):
+    if request.param == "s3":
+        return S3Storage(LocalObjectStoreClient(str(tmp_path / "objects")), "bucket", prefix="/files/")
+    return create_storage(request.param, str(tmp_path / "local"))
+
+
+def test_round_trip_and_ranges(storage, tmp_path):
+    source = tmp_path / "source.bin"
+    content = bytes(range(256)) * 40
+    source.write_bytes(content)
+
+    assert storage.stat("ab/upload_x.xlsx") is None
+    storage.put_file("ab/upload_x.xlsx", str(source))
+
+    stored = storage.stat("ab/upload_x.xlsx")
+    assert stored.size == len(content) and stored.etag.startswith('"')
+    assert storage.exists("ab/upload_x.xlsx")
+    assert b"".join(storage.iter_chunks("ab/upload_x.xlsx", chunk_size=1000)) == content
+    assert b"".join(storage.iter_chunks("ab/upload_x.xlsx", 100, 2500, chunk_size=1000)) == content[100:2600]
+    assert b"".join(storage.iter_chunks("ab/upload_x.xlsx", len(content) - 10)) == content[-10:]
+
+    target = tmp_path / "copy.bin"
+    storage.download_to("ab/upload_x.xlsx", str(target))
+    assert target.read_bytes() == content
+    assert not list(tmp_path.glob("copy.bin.*.tmp"))
+
+    assert storage.delete("ab/upload_x.xlsx")
+    assert not storage.delete("ab/upload_x.xlsx")
+    assert storage.stat("ab/upload_x.xlsx") is None
+    with pytest.raises(FileNotFoundError):
+        storage.open_read("ab/upload_x.xlsx")
+
+
+def test_etag_changes_with_content(storage, tmp_path):
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"first")
+    storage.put_file("ab/processed_x.xlsx", str(source))
+    first = storage.stat("ab/processed_x.xlsx").etag
+
+    source.write_bytes(b"second version")
+    storage.put_file("ab/processed_x.xlsx", str(source))
+
+    assert storage.stat("ab/processed_x.xlsx").etag != first
+
+
+def test_s3_keys_are_prefixed_and_confined_to_the_bucket(tmp_path):
+    client = LocalObjectStoreClient(str(tmp_path))
+    storage = S3Storage(client, "bucket", prefix="files")
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"x")
+
+    storage.put_file("ab/upload_x.xlsx", str(source))
+
+    assert (tmp_path / "bucket" / "files" / "ab" / "upload_x.xlsx").exists()
+    with pytest.raises(Exception) as error:
+        client.head_object(Bucket="bucket", Key="../outside")
+    assert error.value.response["Error"]["Code"] == "InvalidKey"
+
+
+def test_create_storage_choices(tmp_path):
+    assert isinstance(create_storage("local", str(tmp_path)), LocalStorage)
+    assert isinstance(create_storage("memory", str(tmp_path)), MemoryStorage)
+    assert isinstance(create_storage("s3", str(tmp_path), bucket="b", endpoint_url=f"file://{tmp_path}"), S3Storage)
+    with pytest.raises(ValueError):
+        create_storage("s3", str(tmp_path))
+    with pytest.raises(ValueError):
+        create_storage("ftp", str(tmp_path))
+
+
+@pytest.mark.parametrize("backend", ["memory", "s3"])
+def test_service_reads_templates_back_from_remote_storage(tmp_path, make_template, backend):
+    storage = create_storage(backend, str(tmp_path / "uploads"), bucket="b", endpoint_url=f"file://{tmp_path / 'objects'}")
+    service = ExcelService(upload_dir=str(tmp_path / "uploads"), batch_workers=1, analysis_workers=1, storage=storage)
+    try:
+        with open(make_template({"Sheet": {"A1": "input1"}}), "rb") as f:
+            file_id = service.save_uploaded_file(f.read(), "a.xlsx")
+        # 로컬 사본이 지워져도 저장소에서 다시 내려받음
+        os.remove(service.get_file_path(file_id, "upload_"))
+        template_path = service.get_template_path(file_id)
+        assert template_path == service.get_file_path(file_id, "upload_") and os.path.exists(template_path)
+        processed_id = service.process_excel_with_inputs(
+            template_path, [InputValue(pattern="input1", value="x", cell="A1", sheet="Sheet")]
+        )
+
+        assert storage.exists(service.storage_key(processed_id, "processed_"))
+        assert service.delete_file(processed_id) == ["processed"]
+        assert not storage.exists(service.storage_key(processed_id, "processed_"))
+    finally:
+        service.storage_janitor.stop()
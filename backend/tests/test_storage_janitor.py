@@ -0,0 +1,90 @@
+import os
+import time
+
+from app.services.storage_janitor import StorageJanitor, shard_name
+
+
+def _write(janitor, filename, file_id, size, used_at):
+    path = janitor.path_for(filename, file_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (used_at, used_at))
+    return path
+
+
+def test_ttl_expires_each_file_class(tmp_path):
+    now = time.time()
+    evicted = []
+    janitor = StorageJanitor(
+        str(tmp_path), ttls={"upload_": 100, "processed_": 10}, on_evict=lambda path, prefix: evicted.append(prefix)
+    )
+    upload = _write(janitor, "upload_aa11.xlsx", "aa11", 5, now - 50)
+    processed = _write(janitor, "processed_bb22.xlsx", "bb22", 7, now - 50)
+    # TTL 이 없는 종류는 만료되지 않음
+    batch = _write(janitor, "batch_cc33.zip", "cc33", 3, now - 10 ** 6)
+
+    assert janitor.sweep(now) == {"files": 1, "bytes": 7}
+
+    assert os.path.exists(upload) and os.path.exists(batch)
+    assert not os.path.exists(processed)
+    assert evicted == ["processed_"]
+    assert janitor.stats()["reclaimed"]["ttl"] == {"files": 1, "bytes": 7}
+    assert janitor.stats()["files"] == 2 and janitor.stats()["bytes"] == 8
+
+
+def test_touch_keeps_recently_used_files(tmp_path):
+    now = time.time()
+    janitor = StorageJanitor(str(tmp_path), ttls={"upload_": 100})
+    path = _write(janitor, "upload_aa11.xlsx", "aa11", 5, now - 500)
+    mtime = os.stat(path).st_mtime_ns
+
+    janitor.touch(path)
+
+    assert janitor.sweep(time.time()) == {"files": 0, "bytes": 0}
+    # 내용 해시 캐시가 무효화되지 않도록 mtime 은 그대로
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_quota_evicts_least_recently_used_first(tmp_path):
+    now = time.time()
+    janitor = StorageJanitor(str(tmp_path), quota_bytes=25)
+    oldest = _write(janitor, "processed_aa11.xlsx", "aa11", 10, now - 300)
+    older = _write(janitor, "upload_bb22.xlsx", "bb22", 10, now - 200)
+    newest = _write(janitor, "upload_cc33.xlsx", "cc33", 10, now - 100)
+
+    assert janitor.sweep(now) == {"files": 1, "bytes": 10}
+
+    assert not os.path.exists(oldest)
+    assert os.path.exists(older) and os.path.exists(newest)
+    assert janitor.stats()["reclaimed"]["quota"] == {"files": 1, "bytes": 10}
+    assert janitor.stats()["bytes"] == 20
+
+
+def test_orphaned_temp_files_are_removed_after_grace(tmp_path):
+    now = time.time()
+    janitor = StorageJanitor(str(tmp_path), temp_grace=60)
+    stale = _write(janitor, "upload_aa11.xlsx.tmp", "aa11", 4, now - 120)
+    fresh = _write(janitor, "upload_bb22.xlsx.tmp", "bb22", 4, now - 10)
+    legacy = tmp_path / "temp_cc33"
+    legacy.mkdir()
+    (legacy / "part.xml").write_bytes(b"xx")
+    os.utime(legacy, (now - 120, now - 120))
+
+    assert janitor.sweep(now) == {"files": 2, "bytes": 6}
+
+    assert not os.path.exists(stale) and not legacy.exists()
+    assert os.path.exists(fresh)
+    assert janitor.stats()["reclaimed"]["orphan"] == {"files": 2, "bytes": 6}
+
+
+def test_flat_files_are_moved_into_shards(tmp_path):
+    (tmp_path / "upload_ab12.xlsx").write_bytes(b"x")
+    (tmp_path / "notes.txt").write_bytes(b"x")
+    janitor = StorageJanitor(str(tmp_path), interval=0)
+
+    janitor.start()
+
+    assert (tmp_path / shard_name("ab12") / "upload_ab12.xlsx").exists()
+    assert (tmp_path / "notes.txt").exists()
+    assert shard_name("..") == "__"
@@ -0,0 +1,59 @@
+import io
+import zipfile
+
+from app.models.excel_models import InputValue
+from app.services.template_plan import CompiledTemplate
+
+from conftest import fill_plan, load_values
+
+
+def test_fills_every_placeholder_in_a_targeted_cell(service, make_template):
+    path = make_template({"Sheet": {"A1": "name: input1, age: input2", "B2": "input2"}})
+    # 분석 결과처럼 셀마다 첫 패턴만 담은 입력값
+    input_values = [
+        InputValue(pattern="input1", value="Alice", cell="A1", sheet="Sheet"),
+        InputValue(pattern="input2", value="30", cell="B2", sheet="Sheet"),
+    ]
+
+    values = load_values(fill_plan(service, path, input_values), "Sheet")
+
+    assert values["A1"] == "name: Alice, age: 30"
+    assert values["B2"] == "30"
+
+
+def test_leaves_placeholders_without_values(service, make_template):
+    path = make_template({"Sheet": {"A1": "input1 / input3"}})
+
+    values = load_values(fill_plan(service, path, [InputValue(pattern="INPUT1", value="x", cell="A1", sheet="Sheet")]), "Sheet")
+
+    assert values["A1"] == "x / input3"
+
+
+def test_ignores_placeholders_inside_words(service, make_template):
+    path = make_template({"Sheet": {"A1": "myinput1 input1", "A2": "xinput12"}})
+    input_values = [
+        InputValue(pattern="input1", value="v", cell="A1", sheet="Sheet"),
+        InputValue(pattern="input12", value="w", cell="A2", sheet="Sheet"),
+    ]
+
+    expected = {"A1": "myinput1 v", "A2": "xinput12"}
+    assert load_values(fill_plan(service, path, input_values[:1]), "Sheet") == expected
+    # A2 에는 placeholder 가 없으므로 컴파일된 템플릿 대신 XML 경로로 처리됨
+    assert load_values(b"".join(service.stream_excel_with_inputs(path, input_values)), "Sheet") == expected
+    for engine in ("stream", "openpyxl"):
+        assert [field["pattern"] for field in service.analyze_excel_table(path, engine).fields()[1]] == ["input1"]
+
+
+def test_workbook_part_uses_the_requested_compression_level(make_template):
+    plan = CompiledTemplate.compile(make_template({"Sheet": {"A1": "input1"}}))
+    input_values = [InputValue(pattern="input1", value="7", cell="A1", sheet="Sheet", type="number")]
+
+    sizes = {}
+    for level in (0, 9):
+        with zipfile.ZipFile(io.BytesIO(b"".join(plan.iter_fill(input_values, compression_level=level)))) as zf:
+            info = zf.getinfo(plan.workbook_part)
+            assert b'fullCalcOnLoad="1"' in zf.read(info)
+        sizes[level] = (info.compress_size, info.file_size)
+
+    # 0 이면 압축하지 않은 블록으로 기록
+    assert sizes[0][0] > sizes[0][1] > sizes[9][0]
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+
+from app.services.upload_spool import FORM_OVERHEAD_BYTES, RequestSizeLimitMiddleware, UploadTooLarge, spool_upload
+
+
+def test_spool_upload_hashes_and_counts(tmp_path):
+    content = os.urandom(300 * 1024)
+
+    file_id, size = spool_upload(io.BytesIO(content), str(tmp_path / "upload.tmp"), max_size=len(content))
+
+    assert (file_id, size) == (hashlib.sha256(content).hexdigest(), len(content))
+    assert (tmp_path / "upload.tmp").read_bytes() == content
+
+
+def test_spool_upload_stops_at_the_limit(tmp_path):
+    with pytest.raises(UploadTooLarge) as error:
+        spool_upload(io.BytesIO(b"x" * 1001), str(tmp_path / "upload.tmp"), max_size=1000)
+
+    assert error.value.status_code == 413 and error.value.max_size == 1000
+    assert not (tmp_path / "upload.tmp").exists()
+
+
+def test_service_leaves_no_partial_upload(service):
+    with pytest.raises(UploadTooLarge):
+        service.save_uploaded_stream(io.BytesIO(b"x" * 2048), "big.xlsx", max_size=1024)
+
+    assert [name for _, _, names in os.walk(service.upload_dir) for name in names] == []
+
+
+def _app(max_file_size):
+    app = FastAPI()
+    received = []
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        body = await request.body()
+        received.append(len(body))
+        return {"size": len(body)}
+
+    app.add_middleware(RequestSizeLimitMiddleware, max_file_size=max_file_size)
+    return app, received
+
+
+def _post(app, chunks, content_length=None):
+    headers = [] if content_length is None else [(b"content-length", str(content_length).encode())]
+    scope = {
+        "type": "http", "method": "POST", "path": "/upload", "raw_path": b"/upload", "root_path": "",
+        "scheme": "http", "query_string": b"", "headers": headers, "http_version": "1.1",
+        "server": ("test", 80), "client": ("test", 1),
+    }
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = next(message for message in sent if message["type"] == "http.response.start")
+    body = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+    return start["status"], dict(start["headers"]), json.loads(body)
+
+
+def test_content_length_over_the_limit_is_rejected_before_reading():
+    app, received = _app(max_file_size=1000)
+    limit = 1000 + FORM_OVERHEAD_BYTES
+
+    status, headers, body = _post(app, [b"x"], content_length=limit + 1)
+
+    assert status == 413 and "최대" in body["detail"]
+    assert headers[b"connection"] == b"close"
+    assert received == []
+
+
+def test_chunked_body_over_the_limit_is_rejected_while_reading():
+    app, received = _app(max_file_size=1000)
+    chunk = b"x" * (32 * 1024)
+
+    status, _, _ = _post(app, [chunk, chunk, chunk])
+
+    assert status == 413
+    assert received == []
+
+
+def test_bodies_within_the_limit_pass_through():
+    app, received = _app(max_file_size=1000)
+    chunks = [b"x" * 1000, b"y" * FORM_OVERHEAD_BYTES]
+
+    status, _, body = _post(app, chunks, content_length=sum(map(len, chunks)))
+
+    assert status == 200 and body == {"size": 1000 + FORM_OVERHEAD_BYTES}
+    assert received == [1000 + FORM_OVERHEAD_BYTES]
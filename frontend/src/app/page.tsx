@@ -22,6 +22,8 @@ export default function Home() {
   const [isProcessing, setIsProcessing] = useState(false);
   const [downloadUrl, setDownloadUrl] = useState<string>("");
   const [error, setError] = useState<string>("");
+  // 값을 고쳐 다시 처리하면 서버가 바뀐 부분만 다시 만들도록 화면마다 고정된 식별자를 보냄
+  const [sessionId] = useState(() => crypto.randomUUID());
 
   const loadSampleExcel = useCallback(async () => {
     setIsAnalyzing(true);
@@ -90,6 +92,7 @@ export default function Home() {
       const response = await excelApi.processExcel({
         file_id: analysisResult.file_id,
         input_values: inputValues,
+        session_id: sessionId,
       });
 
       if (response.success && response.download_url) {
@@ -27,16 +27,21 @@ export interface ExcelAnalysisResult {
   file_id?: string;
 }
 
+export type InputValueType = 'string' | 'number' | 'date' | 'bool' | 'formula';
+
 export interface InputValue {
   pattern: string;
   value: string;
   cell: string;
   sheet: string;
+  type?: InputValueType;
 }
 
 export interface ProcessExcelRequest {
   file_id: string;
   input_values: InputValue[];
+  // 같은 화면에서 반복 처리할 때 이전 결과를 재사용하도록 보내는 식별자
+  session_id?: string;
 }
 
 export interface ProcessExcelResponse {